@@ -1,81 +1,340 @@
 # ATLAS/atlas_client/client.py
 import os
 import json
-import subprocess
 import sys
+import time
+import threading
 import asyncio
 from typing import Any
 
-from openai import OpenAI
+from openai import AsyncOpenAI
 from dotenv import load_dotenv
-from atlas_server.tools import initialize_db_schema # <--- Importar la función
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from atlas_server.tools import crear_tarea, actualizar_estado_tarea, crear_recordatorio, crear_proyecto_y_tareas, listar_tareas, listar_proyectos, eliminar_proyecto, eliminar_tarea   
+from atlas_client.mcp_session import get_session, SERVER_PATH
+from atlas_client.history import ConversationHistory
+from atlas_client.router import IntentRouter
+from atlas_client.tool_selector import ToolSelector
+# El manifiesto evita importar atlas_server.tools (pydantic, psycopg2) en el cliente
+from atlas_server.manifest import load_tool_descriptions
+from atlas_server.results import render, es_error, FORMATS
+from atlas_server.tracing import span, set_service
+
+TOOL_DESCRIPTIONS = load_tool_descriptions()
 TOOLS_LIST = [
     {
         "type": "function", 
         "function": {
             # Los nombres de las propiedades ahora son los que definimos en el decorador
-            "name": func.tool_name, 
-            "description": func.tool_description, 
-            # ACCESO CRÍTICO: Leer el esquema directamente de la función
-            "parameters": func.input_schema 
+            "name": tool["name"], 
+            "description": tool["description"], 
+            # ACCESO CRÍTICO: Leer el esquema generado a partir del modelo Pydantic de la herramienta
+            "parameters": tool["parameters"] 
         }
     }
-    for func in [crear_tarea, actualizar_estado_tarea, crear_recordatorio, crear_proyecto_y_tareas, listar_tareas, listar_proyectos, eliminar_proyecto, eliminar_tarea]
+    for tool in TOOL_DESCRIPTIONS
 ]
 
 load_dotenv()
+set_service("client")
 
 # Configuración del LLM
 token = os.getenv("GIT_TOKEN")
-endpoint = "https://models.github.ai/inference"
-model_name = "openai/gpt-4.1-nano"
+# ATLAS_LLM_ENDPOINT / ATLAS_LLM_MODEL permiten apuntar a otro servidor compatible con OpenAI
+endpoint = os.getenv("ATLAS_LLM_ENDPOINT", "https://models.github.ai/inference")
+model_name = os.getenv("ATLAS_LLM_MODEL", "openai/gpt-4.1-nano")
 
-client = OpenAI(
+client = AsyncOpenAI(
     base_url=endpoint,
     api_key=token,
 )
 
 # --- 1. Definición de la Función de Ejecución del Servidor MCP ---
-def run_mcp_command(command: str) -> str:
+_timings_lock = threading.Lock()
+
+# Formato de los resultados estructurados de las herramientas (ver atlas_server/results.py):
+# el que recibe el LLM (y se guarda en el historial) y el que se muestra en el terminal
+RESULT_FORMAT = os.getenv("ATLAS_RESULT_FORMAT", "tsv")
+DISPLAY_FORMAT = os.getenv("ATLAS_DISPLAY_FORMAT", "text")
+if RESULT_FORMAT not in FORMATS or DISPLAY_FORMAT not in FORMATS:
+    raise ValueError(f"ATLAS_RESULT_FORMAT y ATLAS_DISPLAY_FORMAT admiten: {', '.join(FORMATS)}.")
+
+def add_timing(timings: dict | None, key: str, ms: float):
+    """Acumula `ms` en timings[key] (las llamadas a herramientas se ejecutan en varios hilos)."""
+    if timings is None:
+        return
+    with _timings_lock:
+        timings[key] = timings.get(key, 0.0) + ms
+
+def call_mcp_tool(command: str, timeout: float | None = None, timings: dict | None = None) -> str | dict:
     """
-    Ejecuta el servidor MCP de ATLAS como un subprocesso 
-    para procesar una llamada a herramienta y devuelve el resultado.
+    Envía una llamada a herramienta al servidor MCP persistente de ATLAS
+    (un único subproceso por sesión) y devuelve el resultado tal cual: texto o un
+    resultado estructurado (dict). Si se pasa `timings`, acumula en él el tiempo de
+    ida y vuelta ('mcp_ms') y el de base de datos ('db_ms').
     """
     try:
-        
-        server_dir = os.path.join(os.path.dirname(__file__), '..', 'atlas_server')
-        server_path = os.path.join(server_dir, 'server.py')
-
         #print(f"   [COMANDO MCP ENVIADO]: {command[:80]}...") 
 
-        env = os.environ.copy()
-        env['PYTHONPATH'] = server_dir + os.pathsep + env.get('PYTHONPATH', '')
-
-        process = subprocess.run(
-            ['python', server_path],
-            input=command,
-            capture_output=True,
-            text=True,
-            timeout=10,
-            env=env 
-        )
-        
-        if   process.stderr:
-            return f"Error del Servidor MCP (código {process.returncode}): \n{process.stderr.strip()}"
-        
+        tool_call_data = json.loads(command)
+        start = time.perf_counter()
+        with span("tool.dispatch", tool=tool_call_data.get("function")) as current:
+            response = get_session().call(
+                tool_call_data.get("function"),
+                tool_call_data.get("arguments", {}),
+                timeout=timeout,
+            )
+            if "error" in response:
+                current.status = "error"
+        add_timing(timings, "mcp_ms", (time.perf_counter() - start) * 1000)
+        add_timing(timings, "db_ms", response.get("timing", {}).get("db_ms", 0.0))
+
+        if "error" in response:
+            return f"❌ Error del Servidor MCP: {response['error']}"
+
         # El Servidor MCP devolverá la respuesta de la herramienta
-        return process.stdout.strip()
-        
-    except subprocess.TimeoutExpired:
-        return "Error: La ejecución del comando MCP ha agotado el tiempo de espera (10s)."
+        result = response.get("result")
+        return result.strip() if isinstance(result, str) else result
+
+    except TimeoutError as e:
+        return f"❌ Error: {e}"
     except FileNotFoundError:
-        return f"Error: No se encontró el servidor en la ruta: {server_path}"
+        return f"❌ Error: No se encontró el servidor en la ruta: {SERVER_PATH}"
     except Exception as e:
-        return f"Error desconocido al ejecutar MCP: {e}"
+        return f"❌ Error desconocido al ejecutar MCP: {e}"
+
+def run_mcp_command(command: str, timeout: float | None = None, timings: dict | None = None) -> str:
+    """Como call_mcp_tool, pero devuelve el resultado como texto en el formato del LLM."""
+    return render(call_mcp_tool(command, timeout, timings), RESULT_FORMAT)
+
+
+# Número máximo de llamadas a herramientas de una misma respuesta que se ejecutan a la vez
+MAX_PARALLEL_TOOL_CALLS = int(os.getenv("ATLAS_MAX_PARALLEL_TOOLS", "4"))
+
+# Herramientas de solo lectura: esperan a que terminen las escrituras anteriores del mismo lote
+READ_ONLY_TOOLS = {tool["name"] for tool in TOOL_DESCRIPTIONS if tool["reads"] and not tool["writes"]}
+
+# Herramientas cuyo resultado ya es la respuesta final (política `direct_return` de tools.py)
+DIRECT_RETURN_ENABLED = os.getenv("ATLAS_DIRECT_RETURN", "1") not in ("0", "false", "no")
+DIRECT_RETURN_TOOLS = {tool["name"] for tool in TOOL_DESCRIPTIONS if tool["direct_return"]}
+
+def direct_answer(tool_messages: list[dict], outputs: dict) -> str | None:
+    """
+    Si todas las herramientas del turno devuelven su resultado directamente y ninguna
+    falló (según su resultado original en `outputs`, por tool_call_id), devuelve la
+    respuesta final para el usuario; si no, None (el LLM redacta la respuesta, por
+    ejemplo para explicar un error).
+    """
+    if not DIRECT_RETURN_ENABLED or not tool_messages:
+        return None
+    for message in tool_messages:
+        if message["name"] not in DIRECT_RETURN_TOOLS:
+            return None
+        if es_error(outputs[message["tool_call_id"]]):
+            return None
+    return "\n\n".join(message["content"] for message in tool_messages)
+
+def display_output(output) -> str:
+    """Texto de un resultado de herramienta para el terminal."""
+    return render(output, DISPLAY_FORMAT)
+
+class ToolCallDispatcher:
+    """
+    Ejecuta llamadas a herramientas a medida que se van conociendo (por ejemplo,
+    mientras el LLM aún está generando la respuesta en streaming), como máximo
+    `max_parallel` a la vez. El fallo de una llamada no cancela las demás.
+
+    Las llamadas respetan el orden de envío salvo entre lecturas: cada llamada espera
+    a las escrituras enviadas antes que ella, y cada escritura espera además a las
+    lecturas enviadas desde la escritura anterior. Así las escrituras se aplican de
+    una en una y en orden (actualizar y luego borrar la misma tarea), una lectura ve
+    los cambios anteriores ("marca la tarea 4 como Hecha y lista el proyecto X") y
+    una escritura no se adelanta a una lectura previa ("lista las tareas de X y
+    elimina la 4"). Solo las lecturas consecutivas se ejecutan en paralelo.
+    Las llamadas son dicts con el formato de la API: {"id", "function": {"name", "arguments"}}.
+    """
+
+    def __init__(self, max_parallel: int = MAX_PARALLEL_TOOL_CALLS, timings: dict | None = None):
+        self.timings = timings
+        self._semaphore = asyncio.Semaphore(max(1, max_parallel))
+        self._previous_writes: list[asyncio.Task] = []
+        # Lecturas enviadas desde la última escritura (la siguiente escritura las espera)
+        self._reads_since_write: list[asyncio.Task] = []
+        self._tool_calls: list[dict] = []
+        self._tasks: list[asyncio.Task] = []
+        # Resultado original (texto o estructurado) de cada llamada, por tool_call_id
+        self.outputs: dict[str, str | dict] = {}
+
+    def __len__(self) -> int:
+        return len(self._tool_calls)
+
+    async def _run_one(self, function_name: str, raw_arguments: str, wait_for: list[asyncio.Task]) -> str | dict:
+        try:
+            function_args = json.loads(raw_arguments or "{}")
+        except json.JSONDecodeError:
+            error = f"❌ Error al decodificar argumentos JSON para {function_name}: {raw_arguments}"
+            print(error)
+            return error
+
+        if wait_for:
+            await asyncio.gather(*wait_for, return_exceptions=True)
+
+        # El Servidor MCP necesita el comando en formato JSON string
+        mcp_command = json.dumps({
+            "function": function_name,
+            "arguments": function_args
+        })
+        async with self._semaphore:
+            return await asyncio.to_thread(call_mcp_tool, mcp_command, None, self.timings)
+
+    def submit(self, tool_call: dict):
+        """Lanza la llamada en segundo plano; el resultado se recoge con results()."""
+        function_name = tool_call["function"]["name"]
+        raw_arguments = tool_call["function"]["arguments"]
+        if function_name in READ_ONLY_TOOLS:
+            task = asyncio.create_task(self._run_one(function_name, raw_arguments, list(self._previous_writes)))
+            self._reads_since_write.append(task)
+        else:
+            wait_for = self._previous_writes + self._reads_since_write
+            task = asyncio.create_task(self._run_one(function_name, raw_arguments, wait_for))
+            self._previous_writes.append(task)
+            self._reads_since_write = []
+        self._tool_calls.append(tool_call)
+        self._tasks.append(task)
+
+    async def results(self) -> list[dict]:
+        """
+        Espera a todas las llamadas y devuelve los mensajes 'tool' en el orden de envío,
+        con el resultado en el formato del LLM (el original queda en `outputs`).
+        """
+        outputs = await asyncio.gather(*self._tasks, return_exceptions=True)
+
+        # Añadir las respuestas de las herramientas en el orden original de tool_call_id
+        tool_messages = []
+        for tool_call, tool_output in zip(self._tool_calls, outputs):
+            if isinstance(tool_output, BaseException):
+                tool_output = f"❌ Error desconocido al ejecutar MCP: {tool_output}"
+            #if not tool_output.startswith("❌ Error Crítico"):
+            #    print(f"🛠️ Resultado de la Herramienta ({tool_call['function']['name']}): {tool_output}")
+            self.outputs[tool_call["id"]] = tool_output
+            tool_messages.append(
+                {
+                    "tool_call_id": tool_call["id"],
+                    "role": "tool",
+                    "name": tool_call["function"]["name"],
+                    "content": render(tool_output, RESULT_FORMAT),
+                }
+            )
+        return tool_messages
+
+
+async def execute_tool_calls(tool_calls, max_parallel: int = MAX_PARALLEL_TOOL_CALLS) -> list[dict]:
+    """
+    Ejecuta de forma concurrente las llamadas a herramientas de una respuesta ya
+    completa del LLM y devuelve los mensajes 'tool' en el mismo orden que `tool_calls`.
+    """
+    dispatcher = ToolCallDispatcher(max_parallel)
+    for tool_call in tool_calls:
+        dispatcher.submit(tool_call if isinstance(tool_call, dict) else tool_call.model_dump())
+    return await dispatcher.results()
+
+
+def _arguments_complete(arguments: str) -> bool:
+    """Los argumentos llegan por fragmentos; están completos cuando forman un objeto JSON válido."""
+    if not arguments.rstrip().endswith("}"):
+        return False
+    try:
+        return isinstance(json.loads(arguments), dict)
+    except json.JSONDecodeError:
+        return False
+
+
+async def stream_completion(messages: list[dict], dispatcher: ToolCallDispatcher | None = None,
+                            timings: dict | None = None, tools: list[dict] | None = None) -> dict:
+    """
+    Pide una respuesta al LLM en streaming. El texto se imprime según llega y las
+    llamadas a herramientas se reconstruyen a partir de sus fragmentos; cada una se
+    envía a `dispatcher` en cuanto sus argumentos están completos, sin esperar al
+    final de la respuesta. Devuelve el mensaje del asistente como dict.
+
+    En `timings["first_token"]` se guarda el instante (time.perf_counter) del primer
+    texto impreso, si aún no había uno, y en `timings["llm_ms"]` se acumula la duración.
+    Con dispatcher se ofrecen `tools` (por defecto, TOOLS_LIST completa).
+    """
+    request = {"model": model_name, "messages": messages, "stream": True}
+    if dispatcher is not None:
+        tools = tools or TOOLS_LIST
+        request["tools"] = tools
+        request["tool_choice"] = "auto"
+
+    content_parts: list[str] = []
+    tool_calls: dict[int, dict] = {}
+    submitted: set[int] = set()
+
+    def submit(index: int):
+        if dispatcher is not None and index not in submitted:
+            submitted.add(index)
+            dispatcher.submit(tool_calls[index])
+
+    start = time.perf_counter()
+    with span("llm.completion", model=model_name, messages=len(messages),
+              tools=len(tools) if dispatcher is not None else 0) as current:
+        stream = await client.chat.completions.create(**request)
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta
+
+            if delta.content:
+                if not content_parts:
+                    if timings is not None:
+                        timings.setdefault("first_token", time.perf_counter())
+                    print("🌐 ATLAS: ", end="", flush=True)
+                content_parts.append(delta.content)
+                print(delta.content, end="", flush=True)
+
+            for fragment in delta.tool_calls or []:
+                tool_call = tool_calls.setdefault(fragment.index, {
+                    "id": "", "type": "function", "function": {"name": "", "arguments": ""}
+                })
+                if fragment.id:
+                    tool_call["id"] = fragment.id
+                if fragment.function:
+                    tool_call["function"]["name"] += fragment.function.name or ""
+                    tool_call["function"]["arguments"] += fragment.function.arguments or ""
+                # Al empezar una llamada nueva, las anteriores ya están completas
+                for index in tool_calls:
+                    if index < fragment.index:
+                        submit(index)
+                if tool_call["id"] and tool_call["function"]["name"] and _arguments_complete(tool_call["function"]["arguments"]):
+                    submit(fragment.index)
+        current.set("tool_calls", len(tool_calls))
+
+    for index in sorted(tool_calls):
+        submit(index)
+    if content_parts:
+        print()
+    if timings is not None:
+        add_timing(timings, "llm_ms", (time.perf_counter() - start) * 1000)
+
+    message = {"role": "assistant", "content": "".join(content_parts) or None}
+    if tool_calls:
+        message["tool_calls"] = [tool_calls[index] for index in sorted(tool_calls)]
+    return message
+
+
+# Enrutador local: las órdenes inequívocas se ejecutan sin pasar por el LLM
+router = IntentRouter(TOOLS_LIST)
+
+async def run_routed_command(route: dict, history: ConversationHistory, call_id: str, timings: dict | None = None):
+    """Ejecuta la herramienta elegida por el enrutador local y la registra en el historial."""
+    output = await asyncio.to_thread(call_mcp_tool, json.dumps(route), None, timings)
+    print("🌐 ATLAS:", display_output(output))
+    history.add_tool_exchange(call_id, route["function"], route["arguments"], render(output, RESULT_FORMAT))
+
+# Selector local: cada llamada al LLM lleva solo las herramientas relevantes para la frase
+tool_selector = ToolSelector(TOOLS_LIST)
 
 
 # --- 2. Instrucciones para ATLAS (System Prompt) ---
@@ -86,92 +345,149 @@ No respondas con texto conversacional sobre el estado o la creación si la solic
 **INSTRUCCIÓN ESPECÍFICA:** Para "Listar proyectos", "Ver proyectos" o "Mostrar todos los proyectos", **DEBES USAR LA HERRAMIENTA 'listar_proyectos' sin excepción**.
 """
 
+def report_timings(turn: dict):
+    """Muestra el tiempo hasta el primer token y la latencia total del turno."""
+    if "first_token_ms" in turn:
+        print(f"⏱️ Primer token: {turn['first_token_ms']:.0f} ms · Turno completo: {turn['total_ms']:.0f} ms")
+    else:
+        print(f"⏱️ Turno completo: {turn['total_ms']:.0f} ms")
+
+def report_router_stats():
+    """Resumen de la sesión: cuántas órdenes resolvió el enrutador local y cuánto tiempo ahorró."""
+    stats = router.stats()
+    if not stats["hits"]:
+        return
+    saved = f", ~{stats['saved_ms'] / 1000:.1f} s ahorrados" if stats["saved_ms"] is not None else ""
+    print(f"📊 Enrutador local: {stats['hits']}/{stats['attempts']} órdenes sin LLM "
+          f"({stats['hit_rate']:.0%}){saved}.")
+
+def report_tool_selection_stats():
+    """Resumen de la sesión: tokens de definiciones de herramientas que no se enviaron al LLM."""
+    stats = tool_selector.stats()
+    if not stats["saved_tokens"]:
+        return
+    print(f"📊 Selector de herramientas: ~{stats['saved_tokens']} tokens ahorrados en {stats['requests']} "
+          f"llamadas ({stats['saved_ratio']:.0%}; {stats['fallbacks']} con la lista completa).")
+
+def report_compaction(history: ConversationHistory):
+    """Compacta el historial antes de enviarlo al LLM e informa de los tokens ahorrados."""
+    saved = history.compact()
+    if saved:
+        print(f"🧹 Historial compactado: ~{saved} tokens ahorrados (~{history.token_count()} de {history.token_budget}).")
+
 # --- 3. Bucle de Conversación Principal ---
+async def process_turn(user_input: str, history: ConversationHistory) -> dict:
+    """
+    Procesa un turno completo del usuario y devuelve sus tiempos (ms): 'total_ms',
+    'first_token_ms' (si hubo texto), 'llm_ms', 'mcp_ms' y 'db_ms', además de
+    'route' ('local', 'llm' o 'error'). Las llamadas a herramientas pueden solaparse
+    entre sí y con el streaming del LLM, por lo que las partes no suman el total.
+    """
+    # Un span 'turn' por turno: todos los spans del cliente y del servidor cuelgan de él
+    with span("turn") as current:
+        turn = await _process_turn(user_input, history)
+        current.set("route", turn["route"])
+        if turn["route"] == "error":
+            current.status = "error"
+        return turn
+
+async def _process_turn(user_input: str, history: ConversationHistory) -> dict:
+    history.add({"role": "user", "content": user_input})
+    report_compaction(history)
+
+    turn_start = time.perf_counter()
+    timings: dict[str, float] = {}
+
+    # Atajo local: órdenes fijas como "listar proyectos" no necesitan el LLM
+    route = router.match(user_input)
+    if route:
+        await run_routed_command(route, history, f"local-{router.attempts + 1}", timings)
+        router.record_hit((time.perf_counter() - turn_start) * 1000)
+        return _turn_timings(turn_start, timings, "local")
+
+    # Los turnos del LLM cuentan como fallo del enrutador aunque la llamada falle
+    try:
+        return await _llm_turn(user_input, history, turn_start, timings)
+    finally:
+        router.record_miss((time.perf_counter() - turn_start) * 1000)
+
+async def _llm_turn(user_input: str, history: ConversationHistory, turn_start: float, timings: dict) -> dict:
+    dispatcher = ToolCallDispatcher(timings=timings)
+    tools = tool_selector.select(user_input, history.previous_tool_names())
+
+    # Llamada a la API de OpenAI (en streaming: las herramientas arrancan en cuanto
+    # sus argumentos están completos, antes de que termine la respuesta)
+    try:
+        response_message = await stream_completion(history.messages, dispatcher, timings, tools)
+    except Exception as e:
+        print(f"❌ ERROR: Falló la llamada a la API de OpenAI. Error: {e}")
+        # Las herramientas ya lanzadas terminan igualmente; esperamos antes de reintentar
+        await dispatcher.results()
+        history.discard_last_turn() # Eliminar el último mensaje del usuario para que pueda reintentar
+        return _turn_timings(turn_start, timings, "error")
+
+    history.add(response_message)
+
+    # --- 4. Procesamiento de Llamada a Herramienta ---
+    if len(dispatcher):
+        # print("Llamada  a herramienta...\n")
+
+        # Recoger los resultados de las llamadas (ya en marcha, en paralelo cuando son independientes)
+        tool_messages = await dispatcher.results()
+        for tool_message in tool_messages:
+            history.add(tool_message)
+        report_compaction(history)
+
+        # 5. Si el resultado ya es la respuesta, se muestra tal cual (sin segunda llamada al LLM);
+        # se guarda como respuesta del asistente (en el formato compacto del LLM) para que
+        # el historial quede completo
+        answer = direct_answer(tool_messages, dispatcher.outputs)
+        if answer is not None:
+            timings.setdefault("first_token", time.perf_counter())
+            print("🌐 ATLAS:", "\n\n".join(display_output(dispatcher.outputs[message["tool_call_id"]])
+                                            for message in tool_messages))
+            history.add({"role": "assistant", "content": answer})
+        else:
+            # Volver a llamar al LLM con la respuesta de la herramienta para obtener la respuesta final
+            #print("🤖 ATLAS: Generando respuesta final...")
+            try:
+                final_message = await stream_completion(history.messages, timings=timings)
+            except Exception as e:
+                print(f"❌ ERROR: Falló la llamada a la API de OpenAI. Error: {e}")
+                final_message = {"role": "assistant", "content": "(Sin respuesta final: falló la llamada al LLM.)"}
+            history.add(final_message)
+
+    return _turn_timings(turn_start, timings, "llm")
+
+def _turn_timings(turn_start: float, timings: dict, route: str) -> dict:
+    result = {
+        "route": route,
+        "total_ms": (time.perf_counter() - turn_start) * 1000,
+        "llm_ms": timings.get("llm_ms", 0.0),
+        "mcp_ms": timings.get("mcp_ms", 0.0),
+        "db_ms": timings.get("db_ms", 0.0),
+    }
+    if "first_token" in timings:
+        result["first_token_ms"] = (timings["first_token"] - turn_start) * 1000
+    return result
+
 async def chat_with_atlas():
-    initialize_db_schema()
+    # Arranca el servidor MCP (que aplica las migraciones pendientes) mientras el usuario escribe
+    get_session().start()
     print("🌐 ATLAS: ¡Hola! Soy ATLAS, tu gestor de proyectos. ¿Cómo puedo ayudarte hoy?")
-    messages : list[dict[str, Any]] = [{"role": "system", "content": SYSTEM_PROMPT}]
+    # Historial con presupuesto de tokens (ver atlas_client/history.py)
+    history = ConversationHistory(SYSTEM_PROMPT)
 
     while True:
         user_input = input("\nTú: ")
         if user_input.lower() in ["salir", "adios", "exit", "q", "adiós", "bye", "hasta luego"]:
             print("🌐 ATLAS: ¡Hasta pronto!")
+            report_router_stats()
+            report_tool_selection_stats()
             break
 
-        messages.append({"role": "user", "content": user_input})
-        
         print("Procesando...\n")
-
-        # Llamada a la API de OpenAI
-        try:
-            response = client.chat.completions.create(
-                model=model_name, 
-                messages=messages,
-                tools=TOOLS_LIST,
-                tool_choice="auto",
-            )
-        except Exception as e:
-            print(f"❌ ERROR: Falló la llamada a la API de OpenAI. Error: {e}")
-            messages.pop() # Eliminar el último mensaje del usuario para que pueda reintentar
-            continue
-
-        response_message = response.choices[0].message
-        
-        # --- 4. Procesamiento de Llamada a Herramienta ---
-        if response_message.tool_calls:
-            messages.append(response_message)
-            # print("Llamada  a herramienta...\n")
-
-            tool_output=""
-            
-            # Recorrer todas las llamadas que el modelo sugiere
-            for tool_call in response_message.tool_calls:
-                function_name = tool_call.function.name
-                try:
-                    function_args = json.loads(tool_call.function.arguments)
-                except json.JSONDecodeError:
-                    error = f"❌ Error al decodificar argumentos JSON para {function_name}: {tool_call.function.arguments}"
-                    print(error)
-                    tool_output = error
-                    function_args = {}
-
-                # El Servidor MCP necesita el comando en formato JSON string
-                mcp_command = json.dumps({
-                    "function": function_name,
-                    "arguments": function_args
-                })
-                
-                # Ejecutar el comando en el Servidor MCP
-                if not tool_output.startswith("❌ Error al decodificar"):
-                    tool_output = run_mcp_command(mcp_command)   
-
-                #if not tool_output.startswith("❌ Error Crítico"):
-                #    print(f"🛠️ Resultado de la Herramienta ({function_name}): {tool_output}")
-
-                # Añadir la respuesta de la herramienta al historial de mensajes
-                messages.append(
-                    {
-                        "tool_call_id": tool_call.id,
-                        "role": "tool",
-                        "name": function_name,
-                        "content": tool_output,
-                    }
-                )
-            
-            # 5. Volver a llamar al LLM con la respuesta de la herramienta para obtener la respuesta final
-            #print("🤖 ATLAS: Generando respuesta final...")
-            final_response = client.chat.completions.create(
-                model=model_name,
-                messages=messages
-            )
-            print("🌐 ATLAS:", final_response.choices[0].message.content)
-            messages.append(final_response.choices[0].message)
-        
-        else:
-            # Respuesta simple del modelo sin usar herramientas
-            # print("⚠️ ADVERTENCIA: El LLM no generó una llamada a herramienta. Respondió con texto conversacional.")
-            print("🌐 ATLAS:", response_message.content)
-            messages.append(response_message)
+        report_timings(await process_turn(user_input, history))
 
 if __name__ == '__main__':
     try:
@@ -0,0 +1,138 @@
+# ATLAS/atlas_client/history.py
+
+import os
+import json
+
+# Presupuesto de tokens del historial que se envía al LLM en cada llamada
+HISTORY_TOKEN_BUDGET = int(os.getenv("ATLAS_HISTORY_TOKEN_BUDGET", "4000"))
+# Turnos más recientes que siempre se conservan literalmente
+HISTORY_KEEP_TURNS = int(os.getenv("ATLAS_HISTORY_KEEP_TURNS", "3"))
+# Longitud máxima del resumen de una respuesta de herramienta antigua
+TOOL_SUMMARY_CHARS = 160
+
+
+def estimate_tokens(message: dict) -> int:
+    """
+    Estimación barata de tokens de un mensaje (~4 caracteres por token más un
+    coste fijo por mensaje). Suficiente para aplicar el presupuesto sin tokenizador.
+    """
+    text = message.get("content") or ""
+    if message.get("tool_calls"):
+        text += json.dumps(message["tool_calls"], ensure_ascii=False)
+    return 4 + len(text) // 4
+
+
+def summarize_tool_output(content: str) -> str:
+    """Resume la salida de una herramienta: primera línea y número de líneas omitidas."""
+    lines = content.splitlines() or [""]
+    summary = lines[0][:TOOL_SUMMARY_CHARS]
+    omitted = len(lines) - 1
+    if omitted > 0:
+        summary += f" (… {omitted} líneas omitidas)"
+    return summary
+
+
+def message_to_dict(message) -> dict:
+    """Convierte un mensaje de la API de OpenAI (o un dict) en un dict serializable."""
+    if isinstance(message, dict):
+        return message
+    data = {"role": message.role, "content": message.content}
+    if getattr(message, "tool_calls", None):
+        data["tool_calls"] = [tool_call.model_dump() for tool_call in message.tool_calls]
+    return data
+
+
+class ConversationHistory:
+    """
+    Historial de la conversación con presupuesto de tokens.
+
+    Los mensajes se agrupan en turnos (un mensaje 'user' y todo lo que le sigue).
+    Al compactar se conservan siempre el System Prompt y los últimos turnos tal
+    cual; en los turnos antiguos las salidas de herramientas se sustituyen por un
+    resumen y, si aún se supera el presupuesto, se descartan los turnos más
+    antiguos completos. Un tool_call nunca se separa de su respuesta 'tool'.
+    """
+
+    def __init__(self, system_prompt: str, token_budget: int = HISTORY_TOKEN_BUDGET,
+                 keep_turns: int = HISTORY_KEEP_TURNS):
+        self.system_message = {"role": "system", "content": system_prompt}
+        self.token_budget = token_budget
+        self.keep_turns = max(1, keep_turns)
+        self.turns: list[list[dict]] = []
+        self.dropped_turns = 0
+        # tool_call_id de las respuestas ya resumidas (no se añaden campos extra a los mensajes)
+        self._summarized: set[str] = set()
+
+    @property
+    def messages(self) -> list[dict]:
+        """Lista plana de mensajes lista para enviar al LLM."""
+        return [self.system_message] + [message for turn in self.turns for message in turn]
+
+    def add(self, message):
+        """Añade un mensaje; cada mensaje 'user' abre un turno nuevo."""
+        message = message_to_dict(message)
+        if message["role"] == "user" or not self.turns:
+            self.turns.append([])
+        self.turns[-1].append(message)
+
+    def add_tool_exchange(self, call_id: str, function_name: str, arguments: dict, output: str):
+        """
+        Registra una llamada a herramienta resuelta sin el LLM (tool_call del asistente,
+        su respuesta 'tool' y el resultado como respuesta final), para que el historial
+        quede igual que si el LLM hubiera hecho la llamada.
+        """
+        self.add({
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [{
+                "id": call_id,
+                "type": "function",
+                "function": {"name": function_name, "arguments": json.dumps(arguments, ensure_ascii=False)},
+            }],
+        })
+        self.add({"tool_call_id": call_id, "role": "tool", "name": function_name, "content": output})
+        self.add({"role": "assistant", "content": output})
+
+    def discard_last_turn(self):
+        """Elimina el último turno (ej. si la llamada al LLM falló y el usuario reintentará)."""
+        if self.turns:
+            self.turns.pop()
+
+    def previous_tool_names(self) -> set[str]:
+        """Herramientas llamadas en el turno anterior al actual (para continuaciones)."""
+        if len(self.turns) < 2:
+            return set()
+        return {
+            tool_call["function"]["name"]
+            for message in self.turns[-2] for tool_call in message.get("tool_calls") or []
+        }
+
+    def token_count(self) -> int:
+        return sum(estimate_tokens(message) for message in self.messages)
+
+    def compact(self) -> int:
+        """Aplica el presupuesto de tokens y devuelve cuántos tokens se ahorraron."""
+        before = self.token_count()
+        if before <= self.token_budget:
+            return 0
+
+        old_turns = self.turns[:-self.keep_turns]
+
+        # 1. Resumir las salidas de herramientas de los turnos antiguos
+        for turn in old_turns:
+            for message in turn:
+                if message["role"] == "tool" and message["tool_call_id"] not in self._summarized:
+                    message["content"] = summarize_tool_output(message["content"] or "")
+                    self._summarized.add(message["tool_call_id"])
+
+        # 2. Si aún no cabe, descartar los turnos antiguos completos, del más viejo al más reciente
+        total = self.token_count()
+        while total > self.token_budget and len(self.turns) > self.keep_turns:
+            dropped = self.turns.pop(0)
+            total -= sum(estimate_tokens(message) for message in dropped)
+            self._summarized.difference_update(
+                message["tool_call_id"] for message in dropped if message["role"] == "tool"
+            )
+            self.dropped_turns += 1
+
+        return before - total
@@ -0,0 +1,261 @@
+# ATLAS/atlas_client/mcp_session.py
+
+import os
+import sys
+import json
+import socket
+import atexit
+import itertools
+import threading
+import subprocess
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+from atlas_server.tracing import current_traceparent
+
+SERVER_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'atlas_server'))
+SERVER_PATH = os.path.join(SERVER_DIR, 'server.py')
+PROJECT_ROOT = os.path.dirname(SERVER_DIR)
+
+# Tiempo máximo de espera por petición (no por proceso), en segundos
+MCP_REQUEST_TIMEOUT = float(os.getenv("MCP_REQUEST_TIMEOUT", "10"))
+# 'host:puerto' de un Servidor MCP en modo --tcp; si no se define, se lanza un proceso propio
+MCP_SERVER_ADDRESS = os.getenv("ATLAS_SERVER_ADDRESS")
+
+
+class MCPSession:
+    """
+    Mantiene vivo un único proceso del Servidor MCP (modo --persistent) durante
+    toda la sesión del cliente y le envía peticiones JSON delimitadas por líneas.
+
+    Cada petición lleva un 'id' que el servidor devuelve en su respuesta, de modo
+    que varias llamadas pueden estar en vuelo a la vez. Si el proceso muere, las
+    peticiones pendientes fallan con un error y la siguiente llamada lo relanza.
+    """
+
+    def __init__(self, server_path: str = SERVER_PATH, request_timeout: float = MCP_REQUEST_TIMEOUT):
+        self.server_path = server_path
+        self.request_timeout = request_timeout
+        self.restarts = 0
+        self._process = None
+        self._pending: dict[int, Future] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    # --- Ciclo de vida del proceso ---
+
+    def _spawn(self):
+        """Lanza un nuevo proceso del servidor y su hilo lector de respuestas."""
+        env = os.environ.copy()
+        # server.py importa todo como 'atlas_server.*', desde la raíz del proyecto
+        env['PYTHONPATH'] = os.pathsep.join([PROJECT_ROOT, env.get('PYTHONPATH', '')])
+
+        process = subprocess.Popen(
+            [sys.executable, self.server_path, '--persistent'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            encoding='utf-8',
+            bufsize=1,
+            env=env,
+        )
+        # Cada proceso tiene su propio registro de peticiones pendientes
+        pending: dict[int, Future] = {}
+        reader = threading.Thread(target=self._read_responses, args=(process, pending), daemon=True)
+        reader.start()
+
+        self._process = process
+        self._pending = pending
+
+    def _ensure_running(self):
+        """Relanza el servidor si todavía no existe o si ha terminado (debe llamarse con el lock)."""
+        if self._process is not None and self._process.poll() is None:
+            return
+        if self._process is not None:
+            self.restarts += 1
+            print(f"⚠️ El Servidor MCP terminó inesperadamente (código {self._process.returncode}). Relanzando...", file=sys.stderr)
+        self._spawn()
+
+    def _read_responses(self, process: subprocess.Popen, pending: dict[int, Future]):
+        """Hilo lector: entrega cada respuesta a la petición con el mismo 'id'."""
+        for line in process.stdout:
+            try:
+                response = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            with self._lock:
+                future = pending.pop(response.get("id"), None)
+            if future is not None and not future.done():
+                future.set_result(response)
+
+        # EOF: el proceso ha muerto; fallan todas las peticiones que esperaban respuesta
+        self._fail_pending(pending, "El Servidor MCP terminó antes de responder.")
+
+    def _fail_pending(self, pending: dict[int, Future], message: str):
+        """Hace fallar con ConnectionError las peticiones que ya no recibirán respuesta."""
+        with self._lock:
+            orphans = list(pending.values())
+            pending.clear()
+        for future in orphans:
+            if not future.done():
+                future.set_exception(ConnectionError(message))
+
+    def start(self):
+        """Lanza el servidor por adelantado para no pagar su arranque en la primera llamada."""
+        with self._lock:
+            self._ensure_running()
+
+    def close(self):
+        """Cierra STDIN del servidor para que termine limpiamente."""
+        with self._lock:
+            process, self._process = self._process, None
+        if process is None or process.poll() is not None:
+            return
+        try:
+            process.stdin.close()
+            process.wait(timeout=2)
+        except (OSError, subprocess.TimeoutExpired):
+            process.kill()
+
+    # --- Peticiones ---
+
+    def _send(self, message: dict) -> tuple[int, Future]:
+        """Escribe la petición en STDIN del servidor y registra su Future por 'id'."""
+        future: Future = Future()
+        with self._lock:
+            self._ensure_running()
+            request_id = next(self._ids)
+            self._pending[request_id] = future
+            try:
+                self._process.stdin.write(json.dumps({"id": request_id, **message}) + "\n")
+                self._process.stdin.flush()
+            except OSError as e:
+                # Tubería rota: damos el proceso por muerto para que se relance
+                self._pending.pop(request_id, None)
+                self._process.kill()
+                self._process.wait()
+                raise ConnectionError(f"No se pudo enviar la petición al Servidor MCP: {e}") from e
+        return request_id, future
+
+    def request(self, message: dict, timeout: float | None = None) -> dict:
+        """
+        Envía un mensaje del protocolo y espera su respuesta ({"id", "result"} o {"id", "error"}).
+        Un fallo de escritura (proceso caído) se reintenta una vez con un proceso nuevo.
+        """
+        timeout = self.request_timeout if timeout is None else timeout
+
+        try:
+            request_id, future = self._send(message)
+        except ConnectionError:
+            request_id, future = self._send(message)
+
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            with self._lock:
+                self._pending.pop(request_id, None)
+            label = message.get("function") or message.get("control")
+            raise TimeoutError(f"La petición '{label}' agotó el tiempo de espera ({timeout:g}s).")
+
+    def call(self, function_name: str, arguments: dict, timeout: float | None = None) -> dict:
+        """Envía una llamada a herramienta y espera su respuesta (con el contexto de trazado actual)."""
+        message = {"function": function_name, "arguments": arguments}
+        traceparent = current_traceparent()
+        if traceparent:
+            message["trace"] = traceparent
+        return self.request(message, timeout)
+
+    def stats(self) -> dict:
+        """Contadores del servidor: aciertos/fallos de la caché y estado del pool de conexiones."""
+        return self.request({"control": "stats"}).get("result", {})
+
+    def metrics(self) -> str:
+        """Métricas del servidor en formato de texto de Prometheus."""
+        return self.request({"control": "metrics"}).get("result", "")
+
+class _TCPConnection:
+    """
+    Conexión TCP con la parte de la interfaz de subprocess.Popen que usa MCPSession
+    (stdin, stdout, poll, kill, wait y returncode).
+    """
+
+    def __init__(self, address: str):
+        host, _, port = address.rpartition(":")
+        self._socket = socket.create_connection((host or "127.0.0.1", int(port)))
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.stdin = self._socket.makefile("w", encoding="utf-8", newline="\n")
+        self.stdout = self._socket.makefile("r", encoding="utf-8", newline="\n")
+        self.returncode = None
+
+    def poll(self):
+        return self.returncode
+
+    def kill(self):
+        if self.returncode is None:
+            self.returncode = -1
+            try:
+                self._socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._socket.close()
+
+    def wait(self, timeout=None):
+        return self.returncode
+
+
+class TCPSession(MCPSession):
+    """
+    Variante de MCPSession que se conecta a un Servidor MCP ya en marcha en modo --tcp
+    (compartido con otros clientes) en lugar de lanzar un proceso propio. Si la
+    conexión se pierde, la siguiente llamada vuelve a conectar.
+    """
+
+    def __init__(self, address: str, request_timeout: float = MCP_REQUEST_TIMEOUT):
+        super().__init__(request_timeout=request_timeout)
+        self.address = address
+
+    def _spawn(self):
+        connection = _TCPConnection(self.address)
+        pending: dict[int, Future] = {}
+        reader = threading.Thread(target=self._read_connection, args=(connection, pending), daemon=True)
+        reader.start()
+        self._process = connection
+        self._pending = pending
+
+    def _read_connection(self, connection: _TCPConnection, pending: dict[int, Future]):
+        try:
+            self._read_responses(connection, pending)
+        except (OSError, ValueError) as e:
+            # Conexión reiniciada o socket cerrado: nadie responderá a las peticiones en vuelo
+            self._fail_pending(pending, f"Se perdió la conexión con el Servidor MCP en {self.address}: {e}")
+        # El servidor cerró la conexión: la siguiente llamada reconecta
+        connection.kill()
+
+    def _ensure_running(self):
+        if self._process is not None and self._process.poll() is None:
+            return
+        if self._process is not None:
+            self.restarts += 1
+            print(f"⚠️ Se perdió la conexión con el Servidor MCP en {self.address}. Reconectando...", file=sys.stderr)
+        try:
+            self._spawn()
+        except OSError as e:
+            raise ConnectionError(f"No se pudo conectar con el Servidor MCP en {self.address}: {e}") from e
+
+    def close(self):
+        with self._lock:
+            connection, self._process = self._process, None
+        if connection is not None:
+            connection.kill()
+
+
+_session: MCPSession | None = None
+_session_lock = threading.Lock()
+
+def get_session() -> MCPSession:
+    """Devuelve la sesión MCP compartida del proceso, creándola la primera vez."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = TCPSession(MCP_SERVER_ADDRESS) if MCP_SERVER_ADDRESS else MCPSession()
+            atexit.register(_session.close)
+        return _session
@@ -0,0 +1,171 @@
+# ATLAS/atlas_client/router.py
+
+import os
+import re
+
+# Permite desactivar el enrutado local (todo pasa por el LLM)
+ROUTER_ENABLED = os.getenv("ATLAS_ROUTER", "1") not in ("0", "false", "no")
+
+# Estados reconocidos por el enrutador (forma escrita por el usuario -> valor guardado)
+KNOWN_STATES = {
+    "pendiente": "Pendiente",
+    "en progreso": "En Progreso",
+    "bloqueada": "Bloqueada",
+    "hecha": "Hecha",
+}
+_STATE = "|".join(sorted(KNOWN_STATES, key=len, reverse=True))
+_LIST_VERB = r"(?:lista|listar|listame|lístame|ver|mostrar|muestra|muestrame|muéstrame|dame)"
+
+# --- 1. Patrones de alta confianza ---
+# Cada regla es (herramienta, expresión, constructor de argumentos). Las expresiones
+# están ancladas al principio y al final: cualquier texto adicional ("...y luego
+# crea otra") hace que la frase no encaje y se envíe al LLM.
+RULES = [
+    (
+        "listar_proyectos",
+        re.compile(rf"^{_LIST_VERB}\s+(?:todos\s+)?(?:los\s+|mis\s+)?proyectos$", re.IGNORECASE),
+        lambda m: {},
+    ),
+    (
+        "listar_tareas",
+        re.compile(
+            rf"^{_LIST_VERB}\s+(?:todas\s+)?(?:las\s+|mis\s+)?tareas"
+            rf"(?:\s+(?:del|en\s+el)\s+proyecto\s+(?P<project>'[^']+'|\"[^\"]+\"|[\w-]+))?"
+            # El estado puede ir tras "en estado", "que están"... o directamente ("ver tareas en progreso")
+            rf"(?:\s+(?:(?:en\s+estado|con\s+estado|que\s+est[aá]n|en)\s+)?(?P<status>{_STATE}))?$",
+            re.IGNORECASE,
+        ),
+        lambda m: {
+            key: value for key, value in {
+                "project_name": _unquote(m.group("project")),
+                "status": _state(m.group("status")),
+            }.items() if value is not None
+        },
+    ),
+    (
+        "actualizar_estado_tarea",
+        re.compile(
+            rf"^(?:marca|marcar|pon|poner|cambia|cambiar)\s+(?:el\s+estado\s+de\s+)?(?:la\s+)?tarea\s+(?:id\s+)?#?(?P<id>\d+)"
+            rf"\s+(?:(?:como|a|en)\s+)?(?P<status>{_STATE})$",
+            re.IGNORECASE,
+        ),
+        lambda m: {"tarea_id": int(m.group("id")), "nuevo_estado": _state(m.group("status"))},
+    ),
+    (
+        "eliminar_tarea",
+        re.compile(r"^(?:elimina|eliminar|borra|borrar)\s+(?:la\s+)?tarea\s+(?:id\s+)?#?(?P<id>\d+)$", re.IGNORECASE),
+        lambda m: {"tarea_id": int(m.group("id"))},
+    ),
+    (
+        "crear_tarea",
+        re.compile(
+            r"^(?:crea|crear|añade|añadir|agrega|agregar)\s+(?:la\s+|una\s+)?tarea\s+(?P<desc>'[^']+'|\"[^\"]+\")"
+            r"\s+en\s+el\s+proyecto\s+(?:(?:id\s+)?#?(?P<id>\d+)|(?P<project>'[^']+'|\"[^\"]+\"|[\w-]+))$",
+            re.IGNORECASE,
+        ),
+        # El servidor acepta el ID o el nombre del proyecto (índice de proyectos en memoria)
+        lambda m: {"project_id": int(m.group("id")) if m.group("id") else _unquote(m.group("project")),
+                   "description": _unquote(m.group("desc"))},
+    ),
+]
+
+
+def _unquote(value: str | None) -> str | None:
+    if value and value[0] in "'\"" and value[-1] == value[0]:
+        return value[1:-1].strip()
+    return value
+
+
+def _state(value: str | None) -> str | None:
+    return KNOWN_STATES[value.lower()] if value else None
+
+
+def normalize(text: str) -> str:
+    """Quita espacios sobrantes y la puntuación final ("Listar proyectos." -> "Listar proyectos")."""
+    text = re.sub(r"\s+", " ", text.strip())
+    return text.rstrip(".!¡¿?").strip()
+
+
+# --- 2. Validación contra los esquemas de TOOLS_LIST ---
+_JSON_TYPES = {"integer": int, "string": str, "number": (int, float), "boolean": bool}
+
+
+def _accepts(schema: dict, value) -> bool:
+    """Subconjunto de JSON Schema usado por los modelos Pydantic de tools.py: 'type' y 'anyOf'."""
+    if "anyOf" in schema:
+        return any(_accepts(option, value) for option in schema["anyOf"])
+    if schema.get("type") == "null":
+        return value is None
+    expected = _JSON_TYPES.get(schema.get("type"))
+    if expected is None:
+        return True
+    if isinstance(value, bool) and schema["type"] != "boolean":
+        return False
+    return isinstance(value, expected)
+
+
+def validate_against_schema(parameters: dict, arguments: dict) -> bool:
+    properties = parameters.get("properties", {})
+    if any(name not in properties for name in arguments):
+        return False
+    if any(name not in arguments for name in parameters.get("required", [])):
+        return False
+    return all(_accepts(properties[name], value) for name, value in arguments.items())
+
+
+class IntentRouter:
+    """
+    Enrutador local determinista delante del LLM: si la frase del usuario encaja con
+    un patrón de alta confianza y los argumentos extraídos cumplen el esquema de la
+    herramienta en TOOLS_LIST, devuelve la llamada para ejecutarla directamente. En
+    cualquier otro caso devuelve None y la frase sigue el camino normal del LLM.
+
+    Lleva la cuenta de aciertos y de la latencia ahorrada: cada acierto ahorra, en
+    promedio, lo que tarda un turno resuelto por el LLM menos lo que tardó el local.
+    """
+
+    def __init__(self, tools_list: list[dict], enabled: bool = ROUTER_ENABLED):
+        self.schemas = {tool["function"]["name"]: tool["function"]["parameters"] for tool in tools_list}
+        self.enabled = enabled
+        self.attempts = 0
+        self.hits = 0
+        self.local_ms = 0.0
+        self.llm_turns = 0
+        self.llm_ms = 0.0
+
+    def match(self, text: str) -> dict | None:
+        """Devuelve {"function", "arguments"} o None si la frase es ambigua o no se reconoce."""
+        if not self.enabled:
+            return None
+        text = normalize(text)
+        for function_name, pattern, build in RULES:
+            m = pattern.match(text)
+            if m is None or function_name not in self.schemas:
+                continue
+            arguments = build(m)
+            if validate_against_schema(self.schemas[function_name], arguments):
+                return {"function": function_name, "arguments": arguments}
+        return None
+
+    def record_hit(self, elapsed_ms: float):
+        self.attempts += 1
+        self.hits += 1
+        self.local_ms += elapsed_ms
+
+    def record_miss(self, llm_turn_ms: float):
+        """Turno que tuvo que resolver el LLM (sirve de referencia para la latencia ahorrada)."""
+        self.attempts += 1
+        self.llm_turns += 1
+        self.llm_ms += llm_turn_ms
+
+    def stats(self) -> dict:
+        avg_llm = self.llm_ms / self.llm_turns if self.llm_turns else None
+        avg_local = self.local_ms / self.hits if self.hits else 0.0
+        return {
+            "attempts": self.attempts,
+            "hits": self.hits,
+            "hit_rate": round(self.hits / self.attempts, 3) if self.attempts else 0.0,
+            "avg_local_ms": round(avg_local, 1),
+            "avg_llm_turn_ms": round(avg_llm, 1) if avg_llm is not None else None,
+            "saved_ms": round((avg_llm - avg_local) * self.hits, 1) if avg_llm is not None else None,
+        }
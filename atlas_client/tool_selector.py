@@ -0,0 +1,206 @@
+# ATLAS/atlas_client/tool_selector.py
+
+import json
+import math
+import os
+import re
+import unicodedata
+
+# Permite desactivar la selección (se envían siempre todas las herramientas)
+TOOL_SELECTION_ENABLED = os.getenv("ATLAS_TOOL_SELECTION", "1") not in ("0", "false", "no")
+# Máximo de herramientas elegidas por puntuación (sin contar las relacionadas ni las del turno anterior)
+TOOL_SELECTION_MAX = int(os.getenv("ATLAS_TOOL_SELECTION_MAX", "4"))
+# Puntuación mínima de la mejor herramienta para confiar en la selección; por debajo se envían todas
+MIN_SCORE = 1.0
+# Se eligen las herramientas con al menos esta fracción de la puntuación de la mejor
+RELATIVE_SCORE = 0.4
+# Peso de las palabras de la descripción frente a las palabras clave de cada herramienta
+DESCRIPTION_WEIGHT = 0.3
+
+# --- 1. Vocabulario ---
+# Raíces (sin tildes, en minúsculas) con las que el usuario suele pedir cada herramienta.
+# Una palabra de la frase coincide con una raíz si empieza por ella ("elimínala" -> "elimin").
+# Las raíces con espacio se buscan como expresión dentro de la frase.
+KEYWORDS = {
+    "crear_tarea": ("cre", "añad", "agreg", "nueva", "apunt", "tarea"),
+    "actualizar_estado_tarea": ("marc", "cambi", "pon", "estado", "hech", "termin", "complet", "cierr",
+                                "bloque", "progreso", "pendient", "acab"),
+    "crear_recordatorio": ("recorda", "recuerd", "acuerd", "avis", "olvid", "urgent"),
+    "crear_proyecto_y_tareas": ("cre", "nuevo", "proyecto", "arranc", "mont", "inici", "con las tareas"),
+    "listar_tareas": ("list", "ver", "mostr", "muestr", "ensen", "dame", "tareas", "pendient", "que tareas",
+                      "pagina", "siguient"),
+    "buscar_tareas": ("busc", "encuentr", "habl", "mencion", "relacionad", "conteng", "sobre", "aparec",
+                      "palabra", "dond"),
+    "listar_proyectos": ("list", "ver", "mostr", "muestr", "dame", "proyectos", "que proyectos", "cuales", "ids",
+                         "id del", "pagina", "siguient"),
+    "resumen_proyectos": ("resum", "como va", "como van", "avance", "progres", "porcentaj", "cuant", "estadistic",
+                          "complet", "bloquead", "activid", "estado del proyecto", "situacion"),
+    "eliminar_tarea": ("elimin", "borr", "quit", "suprim", "tarea"),
+    "actualizar_estado_tareas": ("marc", "cambi", "pon", "hech", "termin", "complet", "cierr", "todas", "varias",
+                                 "bloque", "progreso", "pendient"),
+    "eliminar_tareas": ("elimin", "borr", "quit", "suprim", "todas", "varias", "limpi"),
+    "eliminar_proyecto": ("elimin", "borr", "quit", "suprim", "proyecto"),
+    "mover_tareas": ("muev", "mover", "pas", "trasl", "reasign", "llev", "otro proyecto", "cambia de proyecto"),
+    "ejecutar_plan": ("plan", "transacc", "y luego", "despues", "ademas", "a la vez", "y tambien"),
+}
+
+# Herramientas que se envían junto a otra elegida: el LLM elige entre la versión de una
+# tarea y la de muchas, o entre listar y buscar, con la misma información que antes
+RELATED = {
+    "actualizar_estado_tarea": ("actualizar_estado_tareas",),
+    "actualizar_estado_tareas": ("actualizar_estado_tarea",),
+    "eliminar_tarea": ("eliminar_tareas",),
+    "eliminar_tareas": ("eliminar_tarea",),
+    "listar_tareas": ("buscar_tareas",),
+    "buscar_tareas": ("listar_tareas",),
+}
+
+# Acciones de escritura: una frase con dos o más es una petición compuesta y se añade
+# la herramienta de planes (una sola transacción en lugar de varias llamadas)
+ACTIONS = {
+    "crear": ("cre", "añad", "agreg"),
+    "estado": ("marc", "cambi", "pon", "complet", "termin", "cierr"),
+    "eliminar": ("elimin", "borr", "quit", "suprim"),
+    "mover": ("muev", "mover", "trasl", "reasign"),
+}
+PLAN_TOOL = "ejecutar_plan"
+
+_STOPWORDS = {
+    "para", "como", "esta", "este", "estos", "estas", "cada", "todos", "sobre", "entre", "desde", "hasta",
+    "donde", "usar", "usala", "lugar", "llamar", "veces", "indicado", "admite", "existente", "especifico",
+    "operacion", "operaciones", "sola", "solo", "ejemplo", "tambien", "debe", "cadena", "lista",
+}
+_WORD = re.compile(r"[a-z0-9ñ]+")
+
+
+def normalize(text: str) -> str:
+    """Minúsculas y sin tildes (la ñ se conserva): 'Elimínala' -> 'eliminala'."""
+    text = text.lower().replace("ñ", "\0")
+    text = "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+    return text.replace("\0", "ñ")
+
+
+def _tokens(text: str) -> list[str]:
+    return _WORD.findall(normalize(text))
+
+
+def _description_stems(tool: dict) -> set[str]:
+    """Raíces (5 letras) del nombre y de la descripción de la herramienta."""
+    function = tool["function"]
+    words = function["name"].split("_") + _tokens(function.get("description") or "")
+    return {word[:5] for word in words if len(word) >= 4 and word not in _STOPWORDS}
+
+
+def tool_tokens(tool: dict) -> int:
+    """Tokens aproximados de la definición de una herramienta (~4 caracteres por token)."""
+    return len(json.dumps(tool, ensure_ascii=False)) // 4
+
+
+# --- 2. Selector ---
+
+class ToolSelector:
+    """
+    Selector local del subconjunto de TOOLS_LIST que se envía al LLM en cada llamada.
+
+    Puntúa la frase del usuario contra las palabras clave de cada herramienta y contra
+    su nombre y descripción (con más peso las palabras que distinguen a pocas
+    herramientas) y envía las mejores, sus relacionadas, las usadas en el turno anterior
+    (para continuaciones como "la siguiente página") y la de planes si la petición es
+    compuesta. Si ninguna herramienta alcanza MIN_SCORE, la selección no es fiable y se
+    envía la lista completa: el selector solo quita herramientas cuando está seguro.
+
+    Lleva la cuenta de los tokens de definiciones de herramientas ahorrados.
+    """
+
+    def __init__(self, tools_list: list[dict], enabled: bool = TOOL_SELECTION_ENABLED,
+                 max_selected: int = TOOL_SELECTION_MAX):
+        self.tools_list = tools_list
+        self.enabled = enabled
+        self.max_selected = max(1, max_selected)
+        self.names = [tool["function"]["name"] for tool in tools_list]
+        self.tokens = {name: tool_tokens(tool) for name, tool in zip(self.names, tools_list)}
+        self.full_tokens = sum(self.tokens.values())
+
+        # Pesos tipo IDF: una raíz presente en muchas herramientas apenas discrimina
+        n = len(self.names)
+        keywords = {name: KEYWORDS.get(name, ()) for name in self.names}
+        stems = {name: _description_stems(tool) for name, tool in zip(self.names, tools_list)}
+
+        def idf(count: int) -> float:
+            return math.log((n + 1) / (count + 1)) + 0.1
+
+        keyword_df: dict[str, int] = {}
+        stem_df: dict[str, int] = {}
+        for name in self.names:
+            for keyword in set(keywords[name]):
+                keyword_df[keyword] = keyword_df.get(keyword, 0) + 1
+            for stem in stems[name]:
+                stem_df[stem] = stem_df.get(stem, 0) + 1
+        self.keywords = {name: [(k, idf(keyword_df[k])) for k in keywords[name]] for name in self.names}
+        self.stems = {name: {s: DESCRIPTION_WEIGHT * idf(stem_df[s]) for s in stems[name]} for name in self.names}
+
+        self.requests = 0
+        self.fallbacks = 0
+        self.sent_tokens = 0
+
+    def scores(self, text: str) -> dict[str, float]:
+        """Puntuación de cada herramienta para la frase (0 si no comparte ninguna palabra)."""
+        phrase = " " + " ".join(_tokens(text)) + " "
+        tokens = set(phrase.split())
+        prefixes = {token[:5] for token in tokens}
+        scores = {}
+        for name in self.names:
+            score = 0.0
+            for keyword, weight in self.keywords[name]:
+                if " " in keyword:
+                    score += weight if f" {keyword} " in phrase else 0.0
+                elif any(token.startswith(keyword) for token in tokens):
+                    score += weight
+            score += sum(weight for stem, weight in self.stems[name].items() if stem in prefixes)
+            scores[name] = score
+        return scores
+
+    def select_names(self, text: str, previous: set[str] | frozenset = frozenset()) -> list[str] | None:
+        """Nombres de las herramientas elegidas, o None si hay que enviar la lista completa."""
+        if not self.enabled:
+            return None
+        scores = self.scores(text)
+        best = max(scores.values(), default=0.0)
+        if best < MIN_SCORE:
+            return None
+
+        ranked = sorted((name for name in self.names if scores[name] >= best * RELATIVE_SCORE),
+                        key=lambda name: scores[name], reverse=True)
+        chosen = set(ranked[:self.max_selected])
+        for name in list(chosen):
+            chosen.update(RELATED.get(name, ()))
+        chosen.update(previous)
+
+        tokens = set(_tokens(text))
+        actions = {action for action, verbs in ACTIONS.items()
+                   if any(token.startswith(verb) for token in tokens for verb in verbs)}
+        if len(actions) >= 2:
+            chosen.add(PLAN_TOOL)
+        return [name for name in self.names if name in chosen]
+
+    def select(self, text: str, previous: set[str] | frozenset = frozenset()) -> list[dict]:
+        """Subconjunto de tools_list (en su orden) para la frase, y registra los tokens enviados."""
+        names = self.select_names(text, previous)
+        self.requests += 1
+        if names is None:
+            self.fallbacks += 1
+            self.sent_tokens += self.full_tokens
+            return self.tools_list
+        self.sent_tokens += sum(self.tokens[name] for name in names)
+        return [tool for tool, name in zip(self.tools_list, self.names) if name in names]
+
+    def stats(self) -> dict:
+        full = self.full_tokens * self.requests
+        return {
+            "requests": self.requests,
+            "fallbacks": self.fallbacks,
+            "full_tokens": full,
+            "sent_tokens": self.sent_tokens,
+            "saved_tokens": full - self.sent_tokens,
+            "saved_ratio": round(1 - self.sent_tokens / full, 3) if full else 0.0,
+        }
@@ -0,0 +1,178 @@
+# ATLAS/atlas_server/cache.py
+
+import os
+import json
+import time
+import select
+import inspect
+import threading
+from collections import OrderedDict
+
+import psycopg2
+
+from atlas_server.db_connector import DB_CONFIG, get_pool
+
+# Configuración de la caché de resultados de las herramientas de listado
+CACHE_MAX_ENTRIES = int(os.getenv("ATLAS_CACHE_SIZE", "256"))
+CACHE_TTL = float(os.getenv("ATLAS_CACHE_TTL", "30"))
+CACHE_LISTEN = os.getenv("ATLAS_CACHE_LISTEN", "1") not in ("0", "false", "no")
+
+# Canal de PostgreSQL en el que los triggers publican la tabla modificada
+NOTIFY_CHANNEL = "atlas_changes"
+
+
+class ResultCache:
+    """
+    Caché LRU en memoria con caducidad (TTL) para los resultados de las herramientas
+    de solo lectura. Cada entrada recuerda qué tablas leyó su herramienta; una
+    escritura sobre una tabla invalida solo las entradas que dependen de ella.
+
+    Para evitar guardar un resultado obsoleto cuando una escritura termina mientras
+    la lectura estaba en curso, cada tabla lleva un contador de generación: el
+    resultado solo se guarda si ninguna de sus tablas cambió desde que empezó.
+    clear() incrementa además una época global, así que tampoco se guarda ninguna
+    lectura que empezara antes de vaciar la caché.
+    """
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, ttl: float = CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries: OrderedDict[str, tuple[float, frozenset, object]] = OrderedDict()
+        self._generations: dict[str, int] = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(func, arguments: dict) -> str:
+        """
+        Clave normalizada: nombre de la herramienta + argumentos con sus valores por
+        defecto aplicados, sin los nulos y con los textos en minúsculas y sin espacios
+        sobrantes (los filtros de listado son ILIKE, insensibles a mayúsculas).
+        """
+        bound = inspect.signature(func).bind(**arguments)
+        bound.apply_defaults()
+        normalized = {
+            name: value.strip().lower() if isinstance(value, str) else value
+            for name, value in bound.arguments.items()
+            if value is not None
+        }
+        return f"{func.tool_name}:{json.dumps(normalized, sort_keys=True)}"
+
+    def _generation(self, tables) -> tuple:
+        return (self._epoch, *(self._generations.get(table, 0) for table in sorted(tables)))
+
+    def generation(self, tables) -> tuple:
+        with self._lock:
+            return self._generation(tables)
+
+    def get(self, key: str):
+        """Devuelve el valor guardado o None si no existe o ha caducado."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key: str, value, tables, generation: tuple):
+        """Guarda el valor salvo que alguna de sus tablas haya cambiado desde `generation`."""
+        tables = frozenset(tables)
+        with self._lock:
+            if self._generation(tables) != generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, tables, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, tables) -> int:
+        """Elimina las entradas que leen alguna de `tables`; devuelve cuántas se eliminaron."""
+        tables = set(tables)
+        with self._lock:
+            for table in tables:
+                self._generations[table] = self._generations.get(table, 0) + 1
+            stale = [key for key, (_, deps, _) in self._entries.items() if deps & tables]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+            return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "invalidations": self.invalidations,
+            }
+
+
+class ChangeListener(threading.Thread):
+    """
+    Hilo que escucha (LISTEN) el canal NOTIFY_CHANNEL con una conexión dedicada e
+    invalida en la caché las tablas modificadas por otros procesos. Las
+    notificaciones emitidas por conexiones del propio pool se ignoran, porque esas
+    escrituras ya invalidan la caché de forma síncrona. `extra_caches` son otras
+    estructuras con la misma interfaz (invalidate y clear), como el índice de proyectos.
+    """
+
+    def __init__(self, cache: ResultCache, poll_interval: float = 5.0, extra_caches=()):
+        super().__init__(name="atlas-cache-listener", daemon=True)
+        self.cache = cache
+        self.caches = (cache, *extra_caches)
+        self.poll_interval = poll_interval
+        self._shutdown = threading.Event()
+
+    def stop(self):
+        self._shutdown.set()
+
+    def run(self):
+        delay = 1.0
+        while not self._shutdown.is_set():
+            try:
+                self._listen()
+                delay = 1.0
+            except psycopg2.Error as e:
+                print(f"⚠️ Escucha de cambios de la BD interrumpida ({e}). Reintentando en {delay:g}s...")
+                # Mientras no escuchamos, no podemos fiarnos de lo que hay en caché
+                for cache in self.caches:
+                    cache.clear()
+                self._shutdown.wait(delay)
+                delay = min(delay * 2, 30.0)
+
+    def _listen(self):
+        conn = psycopg2.connect(**DB_CONFIG)
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+            while not self._shutdown.is_set():
+                if select.select([conn], [], [], self.poll_interval) == ([], [], []):
+                    continue
+                conn.poll()
+                tables = set()
+                while conn.notifies:
+                    notify = conn.notifies.pop(0)
+                    if not get_pool().owns_backend(notify.pid):
+                        tables.add(notify.payload)
+                if tables:
+                    for cache in self.caches:
+                        cache.invalidate(tables)
+        finally:
+            conn.close()
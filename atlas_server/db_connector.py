@@ -2,9 +2,19 @@
 
 import psycopg2
 import os
-import sys
 from dotenv import load_dotenv
 import time
+import asyncio
+import threading
+import functools
+import contextvars
+from collections import deque
+from contextvars import ContextVar
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, asynccontextmanager
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, cursor as PgCursor
+
+from atlas_server.tracing import span
 
 load_dotenv()
 
@@ -16,21 +26,349 @@ DB_CONFIG = {
     "port"        :os.getenv("DB_PORT")
 }
 
-def get_db_connection(max_retries=5):
-    #print(f"DEBUG: Intentando conectar a HOST={DB_CONFIG['host']}:PORT={DB_CONFIG['port']} con USER={DB_CONFIG['user']}")
+# Configuración del pool de conexiones (ver ConnectionPool)
+DB_POOL_CONFIG = {
+    "minconn"         :int(os.getenv("DB_POOL_MIN", "1")),
+    "maxconn"         :int(os.getenv("DB_POOL_MAX", "10")),
+    "idle_timeout"    :float(os.getenv("DB_POOL_IDLE_TIMEOUT", "300")),
+    "acquire_timeout" :float(os.getenv("DB_POOL_ACQUIRE_TIMEOUT", "5")),
+    "validate_after"  :float(os.getenv("DB_POOL_VALIDATE_AFTER", "30")),
+}
+
+# Hilos dedicados a ejecutar trabajo de BD (por defecto, uno por conexión del pool)
+DB_EXECUTOR_WORKERS = int(os.getenv("DB_EXECUTOR_WORKERS", DB_POOL_CONFIG["maxconn"]))
+
+def _sql_label(query) -> str:
+    """Sentencia SQL abreviada para los spans (una línea, como máximo 200 caracteres)."""
+    if isinstance(query, bytes):
+        query = query.decode("utf-8", "replace")
+    return " ".join(str(query).split())[:200]
+
+class TracingCursor(PgCursor):
+    """Cursor de psycopg2 que registra cada sentencia ejecutada como un span 'sql'."""
+
+    def execute(self, query, vars=None):
+        with span("sql", statement=_sql_label(query)) as current:
+            result = super().execute(query, vars)
+            current.set("rows", self.rowcount)
+            return result
+
+    def executemany(self, query, vars_list):
+        with span("sql", statement=_sql_label(query), many=True):
+            return super().executemany(query, vars_list)
+
+    def copy_expert(self, sql, file, size=8192):
+        with span("sql", statement=_sql_label(sql), copy=True) as current:
+            result = super().copy_expert(sql, file, size)
+            current.set("rows", self.rowcount)
+            return result
+
+class PoolTimeoutError(psycopg2.OperationalError):
+    """No se pudo obtener una conexión del pool dentro del tiempo límite."""
+
+
+class ConnectionPool:
+    """
+    Pool de conexiones PostgreSQL seguro entre hilos.
+
+    - Mantiene entre 'minconn' y 'maxconn' conexiones abiertas.
+    - Cierra las conexiones ociosas más de 'idle_timeout' segundos (sin bajar de 'minconn').
+    - Valida cada conexión al entregarla: descarta las cerradas o rotas y, si lleva
+      más de 'validate_after' segundos sin usarse, comprueba que siga viva con SELECT 1.
+    - Si el pool está lleno, la petición espera hasta 'acquire_timeout' segundos.
+    """
+
+    def __init__(self, minconn=1, maxconn=10, idle_timeout=300.0, acquire_timeout=5.0,
+                 validate_after=30.0, connect_retries=3, **connect_kwargs):
+        if maxconn < 1 or minconn > maxconn:
+            raise ValueError(f"Configuración de pool inválida: min={minconn}, max={maxconn}.")
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+        self.validate_after = validate_after
+        self.connect_retries = connect_retries
+        self.connect_kwargs = connect_kwargs
+
+        self._idle = deque()          # (conexión, instante del último uso)
+        self._size = 0                # conexiones abiertas (ociosas + en uso)
+        self._cond = threading.Condition()
+        self._closed = False
+        self._backend_pids = set()    # PID del backend de cada conexión abierta
+
+    # --- Conexiones físicas ---
+
+    def connect(self):
+        """
+        Abre una conexión nueva con reintentos breves (backoff exponencial). No cuenta
+        como conexión del pool: quien la pide la cierra (ver get_db_connection).
+        """
+        delay = 0.1
+        for attempt in range(self.connect_retries):
+            try:
+                with span("db.connect", attempt=attempt + 1):
+                    return psycopg2.connect(**self.connect_kwargs)
+            except psycopg2.OperationalError:
+                if attempt == self.connect_retries - 1:
+                    raise
+                time.sleep(delay)
+                delay *= 2
+
+    def _connect(self):
+        conn = self.connect()
+        self._backend_pids.add(conn.info.backend_pid)
+        return conn
+
+    def _is_usable(self, conn, last_used: float) -> bool:
+        if conn.closed:
+            return False
+        if time.monotonic() - last_used < self.validate_after:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _close_quietly(self, conn):
+        try:
+            self._backend_pids.discard(conn.info.backend_pid)
+        except psycopg2.Error:
+            pass
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+    def _evict_idle(self) -> list:
+        """Retira las conexiones ociosas caducadas (debe llamarse con el lock)."""
+        now = time.monotonic()
+        expired = []
+        # Las más antiguas están al principio de la cola
+        while self._idle and self._size > self.minconn and now - self._idle[0][1] > self.idle_timeout:
+            expired.append(self._idle.popleft()[0])
+            self._size -= 1
+        return expired
+
+    # --- API síncrona ---
+
+    def getconn(self, timeout: float | None = None):
+        """Entrega una conexión validada, reutilizando primero la más reciente."""
+        timeout = self.acquire_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        while True:
+            candidate = None
+            with self._cond:
+                if self._closed:
+                    raise psycopg2.InterfaceError("El pool de conexiones está cerrado.")
+                expired = self._evict_idle()
+                if self._idle:
+                    candidate = self._idle.pop()
+                elif self._size < self.maxconn:
+                    self._size += 1   # reservamos el hueco y conectamos fuera del lock
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeoutError(
+                            f"No hay conexiones libres en el pool (máximo {self.maxconn}) tras {timeout:g}s."
+                        )
+                    self._cond.wait(remaining)
+                    continue
 
-    """Establece y devuelve una conexión a la base de datos PostgreSQL con reintentos."""
-    for attempt in range(max_retries):
+            for conn in expired:
+                self._close_quietly(conn)
+
+            if candidate is None:
+                try:
+                    return self._connect()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+
+            conn, last_used = candidate
+            if self._is_usable(conn, last_used):
+                return conn
+            self._discard(conn)
+
+    def putconn(self, conn, discard: bool = False):
+        """Devuelve una conexión al pool (o la descarta si está rota o en mal estado)."""
+        if not discard and not conn.closed:
+            try:
+                if conn.info.transaction_status != TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except psycopg2.Error:
+                discard = True
+
+        if discard or conn.closed or self._closed:
+            self._discard(conn)
+            return
+
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def _discard(self, conn):
+        self._close_quietly(conn)
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def warm(self):
+        """Abre conexiones hasta alcanzar 'minconn' (útil al arrancar el servidor)."""
+        while True:
+            with self._cond:
+                if self._size >= self.minconn:
+                    return
+                self._size += 1
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._idle.append((conn, time.monotonic()))
+                self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """Context manager síncrono: `with pool.connection() as conn: ...`"""
+        with span("db.acquire"):
+            conn = self.getconn()
+        broken = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            self.putconn(conn, discard=broken)
+
+    # --- API asíncrona ---
+
+    @asynccontextmanager
+    async def acquire(self):
+        """
+        Context manager asíncrono: `async with pool.acquire() as conn: ...`
+        La espera por una conexión libre (y su apertura) ocurre en un hilo, sin
+        bloquear el bucle de eventos.
+        """
+        conn = await asyncio.to_thread(self.getconn)
+        broken = False
         try:
-            conn = psycopg2.connect(**DB_CONFIG)
-            return conn
-        except psycopg2.OperationalError as e:
-            if attempt < max_retries - 1:
-                print(f"⚠️ Intento {attempt + 1} de {max_retries}: Error de conexión a la BD. Reintentando en 1 segundo...")
-                time.sleep(1)
-            else:
-                print(f"❌ ERROR: No se pudo conectar a la base de datos después de {max_retries} intentos.")
-                print(f"Asegúrese de que el servidor PostgreSQL esté corriendo en {DB_CONFIG['host']}:{DB_CONFIG['port']} con las credenciales correctas.")
-                return None
-    return None
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            await asyncio.to_thread(self.putconn, conn, broken)
+
+    def closeall(self):
+        """Cierra todas las conexiones ociosas y rechaza nuevas peticiones."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn, _ in idle:
+            self._close_quietly(conn)
+
+    def owns_backend(self, pid: int) -> bool:
+        """Indica si el backend de PostgreSQL con este PID pertenece a una conexión del pool."""
+        return pid in self._backend_pids
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {"size": self._size, "idle": len(self._idle), "max": self.maxconn}
+
+
+_pool: ConnectionPool | None = None
+_pool_lock = threading.Lock()
+
+def get_pool() -> ConnectionPool:
+    """Devuelve el pool de conexiones compartido del proceso, creándolo la primera vez."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(**DB_POOL_CONFIG, **DB_CONFIG, cursor_factory=TracingCursor)
+        return _pool
+
+def close_pool():
+    """Cierra el pool compartido; el siguiente get_pool() crea uno nuevo."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.closeall()
+
+def acquire_connection():
+    """Atajo para `get_pool().acquire()`: `async with acquire_connection() as conn: ...`"""
+    return get_pool().acquire()
+
+def get_db_connection():
+    """
+    Conexión propia, fuera del pool, para los scripts que cambian el estado de la sesión
+    (p. ej. SET search_path en los benchmarks) y la cierran al terminar: no debe volver
+    al pool. Usa los mismos parámetros y reintentos que el pool; None si no se puede conectar.
+    """
+    try:
+        return get_pool().connect()
+    except psycopg2.OperationalError as e:
+        print(f"❌ ERROR: No se pudo conectar a la base de datos ({str(e).strip()}).")
+        print(f"Asegúrese de que el servidor PostgreSQL esté corriendo en {DB_CONFIG['host']}:{DB_CONFIG['port']} con las credenciales correctas.")
+        return None
+
+
+_executor: ThreadPoolExecutor | None = None
+
+def get_executor() -> ThreadPoolExecutor:
+    """Pool de hilos acotado en el que se ejecutan las llamadas bloqueantes de psycopg2."""
+    global _executor
+    with _pool_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=DB_EXECUTOR_WORKERS, thread_name_prefix="atlas-db")
+        return _executor
+
+# Tiempos (ms) de las transacciones de la petición en curso; el servidor lo activa por
+# petición para informar al cliente de cuánto tiempo se pasó en la base de datos
+DB_TIMINGS: ContextVar[list | None] = ContextVar("atlas_db_timings", default=None)
+
+def _run_in_transaction(func, *args, **kwargs):
+    with span("db.transaction", function=func.__name__):
+        with get_pool().connection() as conn:
+            result = func(conn, *args, **kwargs)
+            conn.commit()
+            return result
+
+async def run_db_call(executor, func, *args, **kwargs):
+    """
+    Ejecuta la llamada bloqueante `func(*args, **kwargs)` en `executor` sin bloquear el
+    bucle de eventos, propagando el contexto de trazado y anotando su duración en
+    DB_TIMINGS. La usan todos los backends de almacenamiento.
+    """
+    loop = asyncio.get_running_loop()
+    # run_in_executor no propaga los contextvars: copiamos el contexto para que los
+    # spans de la transacción cuelguen de la petición en curso
+    call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+    start = time.perf_counter()
+    try:
+        return await loop.run_in_executor(executor, call)
+    finally:
+        timings = DB_TIMINGS.get()
+        if timings is not None:
+            timings.append((time.perf_counter() - start) * 1000)
 
+async def run_in_transaction(func, *args, **kwargs):
+    """
+    Ejecuta `func(conn, *args, **kwargs)` en el pool de hilos de BD con una conexión
+    del pool y hace commit al terminar. Si `func` lanza una excepción, la transacción
+    se revierte al devolver la conexión. El bucle de eventos nunca se bloquea, así
+    que varias herramientas pueden solapar su E/S con la base de datos.
+    """
+    return await run_db_call(get_executor(), _run_in_transaction, func, *args, **kwargs)
@@ -0,0 +1,88 @@
+# ATLAS/atlas_server/manifest.py
+
+"""
+Manifiesto JSON estático de las herramientas de ATLAS.
+
+Contiene el nombre, la descripción, el esquema de parámetros y las tablas que lee
+o escribe cada herramienta, y si su resultado se devuelve directamente al usuario,
+de modo que el cliente puede construir TOOLS_LIST sin importar tools.py (ni
+pydantic ni psycopg2). Este módulo solo depende de la biblioteca estándar;
+tools.py se importa únicamente para generar el manifiesto.
+
+Generación (desde el directorio raíz):
+    python -m atlas_server.manifest
+"""
+
+import os
+import json
+import hashlib
+
+# Versión del formato: si cambian los campos de cada herramienta, los manifiestos antiguos se regeneran
+MANIFEST_FORMAT = 2
+MANIFEST_PATH = os.path.join(os.path.dirname(__file__), 'tool_manifest.json')
+TOOLS_SOURCE = os.path.join(os.path.dirname(__file__), 'tools.py')
+
+
+def _source_hash() -> str:
+    """Huella de tools.py: si cambia, el manifiesto se considera desactualizado."""
+    with open(TOOLS_SOURCE, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def describe_tool(func) -> dict:
+    """Entrada del manifiesto para una función decorada con @tool."""
+    return {
+        "name": func.tool_name,
+        "description": func.tool_description,
+        "parameters": func.input_model.model_json_schema(by_alias=True),
+        "reads": sorted(func.reads),
+        "writes": sorted(func.writes),
+        "direct_return": func.direct_return,
+    }
+
+
+def build_manifest(path: str = MANIFEST_PATH) -> dict:
+    """Importa tools.py, describe todas las herramientas registradas y escribe el manifiesto."""
+    from atlas_server.tools import TOOL_REGISTRY
+
+    manifest = {
+        "format": MANIFEST_FORMAT,
+        "source_hash": _source_hash(),
+        "tools": [describe_tool(func) for func in TOOL_REGISTRY.values()],
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+def load_manifest(path: str = MANIFEST_PATH) -> dict | None:
+    """Lee el manifiesto; devuelve None si no existe, está dañado o no corresponde al tools.py actual."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if manifest.get("format") != MANIFEST_FORMAT or manifest.get("source_hash") != _source_hash():
+        return None
+    return manifest
+
+
+def load_tool_descriptions() -> list[dict]:
+    """
+    Descripciones de todas las herramientas, leídas del manifiesto. Si no existe o
+    está desactualizado, se regenera (importando tools.py) para los próximos arranques.
+    """
+    manifest = load_manifest()
+    if manifest is None:
+        try:
+            manifest = build_manifest()
+        except OSError:
+            # Directorio de solo lectura: usamos las descripciones sin guardarlas
+            from atlas_server.tools import TOOL_REGISTRY
+            return [describe_tool(func) for func in TOOL_REGISTRY.values()]
+    return manifest["tools"]
+
+
+if __name__ == '__main__':
+    manifest = build_manifest()
+    print(f"✅ Manifiesto generado en {MANIFEST_PATH} con {len(manifest['tools'])} herramientas.")
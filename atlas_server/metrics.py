@@ -0,0 +1,153 @@
+# ATLAS/atlas_server/metrics.py
+
+"""
+Métricas en memoria (contadores e histogramas de latencia) con exportación en el
+formato de texto de Prometheus. Solo depende de la biblioteca estándar.
+
+El servidor persistente las publica en http://127.0.0.1:<ATLAS_METRICS_PORT>/metrics
+si la variable está definida, y también mediante el mensaje de control {"control": "metrics"}.
+"""
+
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_PORT = int(os.getenv("ATLAS_METRICS_PORT", "0"))
+
+# Límites (en segundos) de los histogramas de latencia
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"')
+        pairs.append(f'{name}="{escaped}"')
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, key)} {value:g}")
+        return lines
+
+
+class Gauge:
+    def __init__(self, name: str, help_text: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, key)} {value:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # Por combinación de etiquetas: [conteos por cubo..., suma, total]
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    series[index] += 1
+            series[-2] += seconds
+            series[-1] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series):
+                    le = 'le="%g"' % bound
+                    lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {count}")
+                le = 'le="+Inf"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {series[-1]}")
+                lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {series[-2]:.6f}")
+                lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {series[-1]}")
+        return lines
+
+
+# --- Métricas de ATLAS ---
+TOOL_CALLS = Counter("atlas_tool_calls_total", "Llamadas a herramientas por resultado.", ("tool", "status"))
+TOOL_DURATION = Histogram("atlas_tool_duration_seconds", "Duración de las llamadas a herramientas.", ("tool",))
+SPAN_DURATION = Histogram("atlas_span_duration_seconds", "Duración de los spans de trazado por tipo.", ("span",))
+TCP_SESSIONS = Gauge("atlas_tcp_sessions", "Sesiones TCP abiertas en el Servidor MCP.")
+TCP_REJECTED = Counter("atlas_tcp_rejected_total", "Conexiones TCP rechazadas por superar ATLAS_MAX_SESSIONS.")
+
+REGISTRY = [TOOL_CALLS, TOOL_DURATION, SPAN_DURATION, TCP_SESSIONS, TCP_REJECTED]
+
+
+def render() -> str:
+    """Todas las métricas en el formato de exposición de texto de Prometheus."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        data = render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def start_metrics_server(port: int = METRICS_PORT, host: str = "127.0.0.1") -> ThreadingHTTPServer | None:
+    """Publica /metrics en un hilo en segundo plano; no hace nada si `port` es 0."""
+    if not port:
+        return None
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="atlas-metrics", daemon=True).start()
+    return server
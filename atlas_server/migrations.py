@@ -0,0 +1,248 @@
+# ATLAS/atlas_server/migrations.py
+
+"""
+Migraciones versionadas del esquema de ATLAS.
+
+Cada migración tiene un número de versión creciente y se aplica una sola vez, en
+su propia transacción. Las versiones aplicadas se registran en 'schema_migrations', de
+modo que si el esquema ya está al día el arranque solo cuesta una consulta.
+
+Una migración escrita como función puede devolver False para indicar que no pudo
+aplicarse todavía (p. ej. falta una extensión): no se registra y se reintenta en el
+siguiente arranque, sin impedir que se apliquen las posteriores.
+"""
+
+from psycopg2.errors import InsufficientPrivilege, FeatureNotSupported
+
+# Identificador del advisory lock que serializa arranques concurrentes
+MIGRATIONS_LOCK_ID = 7410001
+
+
+def _migracion_trigramas(cursor) -> bool:
+    """
+    Índices GIN de trigramas para los filtros ILIKE '%...%' (requiere la extensión pg_trgm).
+    Devuelve False si la extensión no está disponible o no puede instalarse.
+    """
+    aviso = "⚠️ ADVERTENCIA: La extensión pg_trgm no está disponible; se omiten los índices de trigramas."
+    cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    if cursor.fetchone() is None:
+        print(aviso)
+        return False
+    # En PostgreSQL gestionados la extensión puede estar disponible sin que el rol pueda
+    # instalarla: el savepoint deja la transacción usable y las migraciones siguientes se aplican
+    cursor.execute("SAVEPOINT atlas_pg_trgm")
+    try:
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    except (InsufficientPrivilege, FeatureNotSupported) as e:
+        cursor.execute("ROLLBACK TO SAVEPOINT atlas_pg_trgm")
+        print(f"{aviso} ({type(e).__name__})")
+        return False
+    cursor.execute("RELEASE SAVEPOINT atlas_pg_trgm")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_projects_name_trgm ON projects USING gin (name gin_trgm_ops)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status_trgm ON tasks USING gin (status gin_trgm_ops)")
+    return True
+
+
+# (versión, descripción, lista de sentencias SQL o función que recibe un cursor)
+MIGRATIONS = [
+    (1, "Esquema base: tablas projects y tasks", [
+        """
+        CREATE TABLE IF NOT EXISTS projects (
+            id SERIAL PRIMARY KEY,
+            name VARCHAR(255) UNIQUE NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        """,
+        # Tabla de tareas (ESQUEMA SIMPLIFICADO: SIN assigned_to ni due_date)
+        """
+        CREATE TABLE IF NOT EXISTS tasks (
+            id SERIAL PRIMARY KEY,
+            project_id INTEGER NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+            description VARCHAR(255) NOT NULL,
+            status VARCHAR(50) DEFAULT 'Pendiente',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        """,
+    ]),
+    (2, "Índice compuesto (project_id, status) para el JOIN y el filtro por estado", [
+        "CREATE INDEX IF NOT EXISTS idx_tasks_project_status ON tasks (project_id, status)",
+    ]),
+    (3, "Índices de trigramas para búsquedas parciales por nombre y estado", _migracion_trigramas),
+    (4, "Triggers NOTIFY para invalidar cachés de otros procesos", [
+        """
+        CREATE OR REPLACE FUNCTION atlas_notify_change() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('atlas_changes', TG_TABLE_NAME);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """,
+        "DROP TRIGGER IF EXISTS projects_notify_change ON projects",
+        """
+        CREATE TRIGGER projects_notify_change
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON projects
+            FOR EACH STATEMENT EXECUTE FUNCTION atlas_notify_change();
+        """,
+        "DROP TRIGGER IF EXISTS tasks_notify_change ON tasks",
+        """
+        CREATE TRIGGER tasks_notify_change
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON tasks
+            FOR EACH STATEMENT EXECUTE FUNCTION atlas_notify_change();
+        """,
+    ]),
+    (5, "Búsqueda de texto completo en tasks.description (tsvector en español + índice GIN)", [
+        # Columna generada: PostgreSQL la recalcula en cada INSERT/UPDATE de description
+        """
+        ALTER TABLE tasks ADD COLUMN IF NOT EXISTS search_vector tsvector
+            GENERATED ALWAYS AS (to_tsvector('spanish', description)) STORED
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_tasks_search ON tasks USING gin (search_vector)",
+    ]),
+    (6, "Resumen por proyecto y estado (project_task_summary) mantenido por triggers", [
+        # Una fila por (proyecto, estado) con el número de tareas y la última modificación.
+        # Las filas que llegan a 0 se conservan para no perder la última actividad.
+        """
+        CREATE TABLE IF NOT EXISTS project_task_summary (
+            project_id INTEGER NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+            status VARCHAR(50) NOT NULL,
+            task_count INTEGER NOT NULL DEFAULT 0,
+            last_activity TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (project_id, status)
+        );
+        """,
+        # Triggers por sentencia con tablas de transición: una sentencia que toca miles de
+        # tareas actualiza una fila del resumen por (proyecto, estado), no una por tarea.
+        # El orden fijo de las filas evita interbloqueos entre escrituras concurrentes.
+        """
+        CREATE OR REPLACE FUNCTION atlas_project_summary() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'TRUNCATE' THEN
+                DELETE FROM project_task_summary;
+                RETURN NULL;
+            END IF;
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                -- Solo UPDATE: con el borrado en cascada de un proyecto su resumen ya no existe
+                UPDATE project_task_summary s
+                SET task_count = s.task_count - d.n, last_activity = CURRENT_TIMESTAMP
+                FROM (
+                    SELECT project_id, COALESCE(status, '') AS status, count(*) AS n
+                    FROM anteriores GROUP BY 1, 2
+                ) d
+                WHERE s.project_id = d.project_id AND s.status = d.status;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO project_task_summary AS s (project_id, status, task_count, last_activity)
+                SELECT project_id, COALESCE(status, ''), count(*), CURRENT_TIMESTAMP
+                FROM nuevas GROUP BY 1, 2 ORDER BY 1, 2
+                ON CONFLICT (project_id, status) DO UPDATE
+                SET task_count = s.task_count + EXCLUDED.task_count, last_activity = EXCLUDED.last_activity;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """,
+        # PostgreSQL no admite tablas de transición en triggers de varios eventos
+        "DROP TRIGGER IF EXISTS tasks_summary_insert ON tasks",
+        """
+        CREATE TRIGGER tasks_summary_insert AFTER INSERT ON tasks
+            REFERENCING NEW TABLE AS nuevas
+            FOR EACH STATEMENT EXECUTE FUNCTION atlas_project_summary();
+        """,
+        "DROP TRIGGER IF EXISTS tasks_summary_update ON tasks",
+        """
+        CREATE TRIGGER tasks_summary_update AFTER UPDATE ON tasks
+            REFERENCING OLD TABLE AS anteriores NEW TABLE AS nuevas
+            FOR EACH STATEMENT EXECUTE FUNCTION atlas_project_summary();
+        """,
+        "DROP TRIGGER IF EXISTS tasks_summary_delete ON tasks",
+        """
+        CREATE TRIGGER tasks_summary_delete AFTER DELETE ON tasks
+            REFERENCING OLD TABLE AS anteriores
+            FOR EACH STATEMENT EXECUTE FUNCTION atlas_project_summary();
+        """,
+        "DROP TRIGGER IF EXISTS tasks_summary_truncate ON tasks",
+        """
+        CREATE TRIGGER tasks_summary_truncate AFTER TRUNCATE ON tasks
+            FOR EACH STATEMENT EXECUTE FUNCTION atlas_project_summary();
+        """,
+        # Carga inicial con las tareas existentes. Crear los triggers bloquea las escrituras
+        # en tasks hasta el COMMIT, así que ninguna se pierde entre la carga y los triggers.
+        """
+        INSERT INTO project_task_summary (project_id, status, task_count, last_activity)
+        SELECT project_id, COALESCE(status, ''), count(*), COALESCE(max(created_at), CURRENT_TIMESTAMP)
+        FROM tasks GROUP BY 1, 2
+        ON CONFLICT (project_id, status) DO NOTHING
+        """,
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def applied_versions(conn) -> set[int]:
+    """Devuelve las versiones aplicadas en el esquema actual (vacío si no hay ninguna)."""
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(quote_ident(current_schema()) || '.schema_migrations') IS NOT NULL")
+        if not cursor.fetchone()[0]:
+            return set()
+        cursor.execute("SELECT version FROM schema_migrations")
+        return {row[0] for row in cursor.fetchall()}
+
+
+def current_version(conn) -> int:
+    """Devuelve la versión aplicada más alta del esquema actual (0 si está vacío)."""
+    return max(applied_versions(conn), default=0)
+
+
+def _pending(applied: set[int], target: int) -> list[tuple]:
+    return [migration for migration in MIGRATIONS if migration[0] <= target and migration[0] not in applied]
+
+
+def apply_migrations(conn, target: int = LATEST_VERSION) -> list[int]:
+    """
+    Aplica las migraciones pendientes hasta `target` y devuelve las versiones aplicadas.
+    Si el esquema ya está al día no ejecuta ningún DDL.
+    """
+    pending = _pending(applied_versions(conn), target)
+    conn.rollback()
+    if not pending:
+        return []
+
+    applied = []
+    with conn.cursor() as cursor:
+        # Evita que dos procesos que arrancan a la vez apliquen la misma migración
+        cursor.execute("SELECT pg_advisory_lock(%s)", (MIGRATIONS_LOCK_ID,))
+        try:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS schema_migrations (
+                    version INTEGER PRIMARY KEY,
+                    description VARCHAR(255) NOT NULL,
+                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                );
+            """)
+            conn.commit()
+
+            for number, description, steps in _pending(applied_versions(conn), target):
+                try:
+                    if callable(steps):
+                        done = steps(cursor) is not False
+                    else:
+                        for statement in steps:
+                            cursor.execute(statement)
+                        done = True
+                    if done:
+                        cursor.execute(
+                            "INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                            (number, description)
+                        )
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                if done:
+                    applied.append(number)
+        finally:
+            conn.rollback()
+            cursor.execute("SELECT pg_advisory_unlock(%s)", (MIGRATIONS_LOCK_ID,))
+            conn.commit()
+    return applied
@@ -0,0 +1,291 @@
+# ATLAS/atlas_server/project_index.py
+
+"""
+Índice en memoria nombre de proyecto -> ID, para que las herramientas que modifican
+datos acepten el nombre del proyecto en lugar de su ID numérico (sin una llamada
+previa a listar_proyectos ni un turno extra del LLM).
+
+Resolución de una referencia, de más a menos estricta:
+
+  1. Un número (o texto de dígitos) es directamente el ID.
+  2. Nombre normalizado exacto: sin distinguir mayúsculas, tildes ni separadores
+     ("diseno-web" == "Diseño Web").
+  3. Si no hay nombre exacto en memoria, se consulta la base de datos (trigramas con
+     pg_trgm si está instalada, si no búsqueda parcial) antes de aceptar nada
+     aproximado: un proyecto que el índice aún no conoce (creado por otro proceso)
+     con ese nombre exacto gana a cualquier nombre parecido.
+  4. Coincidencia aproximada: el único nombre que contiene la referencia (palabras
+     completas) o, si ninguno la contiene, el nombre más parecido por trigramas
+     (como pg_trgm) cuando aventaja claramente al segundo.
+
+El índice se carga entero la primera vez que se usa, las herramientas lo mantienen
+al día al crear y borrar proyectos, y se recarga cuando otro proceso modifica la
+tabla projects (ChangeListener, ver cache.py).
+"""
+
+import os
+import re
+import math
+import asyncio
+import threading
+import unicodedata
+
+from atlas_server.repository import get_repository
+
+# Similitud mínima de trigramas para considerar un nombre como candidato (pg_trgm usa 0.3)
+PROJECT_MATCH_THRESHOLD = float(os.getenv("ATLAS_PROJECT_MATCH_THRESHOLD", "0.4"))
+# Ventaja mínima del mejor candidato por trigramas sobre el segundo para aceptarlo
+PROJECT_MATCH_MARGIN = 0.15
+# Candidatos que se sugieren cuando la referencia es ambigua o no existe
+MAX_CANDIDATES = 5
+# Proyectos leídos por página al cargar el índice
+LOAD_PAGE_SIZE = 1000
+
+_NO_ALFANUMERICO = re.compile(r"[\W_]+")
+
+
+class ProjectNotFoundError(LookupError):
+    """Ningún proyecto corresponde a la referencia; `candidates` son [(id, name)] parecidos."""
+
+    def __init__(self, reference, candidates=()):
+        self.reference = reference
+        self.candidates = list(candidates)
+        super().__init__(f"no existe ningún proyecto '{reference}'")
+
+
+class AmbiguousProjectError(LookupError):
+    """Varios proyectos corresponden a la referencia; `candidates` son [(id, name)]."""
+
+    def __init__(self, reference, candidates):
+        self.reference = reference
+        self.candidates = list(candidates)
+        super().__init__(f"'{reference}' corresponde a {len(self.candidates)} proyectos")
+
+
+def normalizar_nombre(nombre: str) -> str:
+    """Minúsculas, sin tildes y con cualquier separador reducido a un espacio."""
+    sin_tildes = "".join(c for c in unicodedata.normalize("NFKD", nombre) if not unicodedata.combining(c))
+    return _NO_ALFANUMERICO.sub(" ", sin_tildes.casefold()).strip()
+
+
+def trigramas(normalizado: str) -> frozenset:
+    """Trigramas de cada palabra con el mismo relleno que pg_trgm ('  pal', ..., 'ra ')."""
+    resultado = set()
+    for palabra in normalizado.split():
+        relleno = f"  {palabra} "
+        resultado.update(relleno[i:i + 3] for i in range(len(relleno) - 2))
+    return frozenset(resultado)
+
+
+def similitud(a: frozenset, b: frozenset) -> float:
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+class ProjectIndex:
+    """
+    Índice de los proyectos de un repositorio (por defecto, el del backend activo).
+    Se usa desde el bucle de eventos del servidor; solo invalidate() y clear() se
+    llaman desde otros hilos.
+    """
+
+    def __init__(self, repository=None):
+        self.repository = repository
+        self._by_id: dict[int, tuple[str, str, frozenset]] = {}
+        self._by_normalized: dict[str, set[int]] = {}
+        # Índices invertidos: la búsqueda aproximada solo recorre los proyectos que
+        # comparten alguna palabra o algún trigrama con la referencia
+        self._by_word: dict[str, set[int]] = {}
+        self._by_trigram: dict[str, set[int]] = {}
+        self._loaded = False
+        # Como en ResultCache: una carga solo se da por buena si nadie invalidó el índice mientras tanto
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._load_lock = asyncio.Lock()
+        self.hits = 0
+        self.fallbacks = 0
+        self.loads = 0
+
+    def _repo(self):
+        return self.repository or get_repository()
+
+    # --- Mantenimiento ---
+
+    def add(self, project_id: int, name: str):
+        normalizado = normalizar_nombre(name)
+        tri = trigramas(normalizado)
+        with self._lock:
+            self._discard(project_id)
+            self._by_id[project_id] = (name, normalizado, tri)
+            for indice, claves in ((self._by_normalized, (normalizado,)),
+                                   (self._by_word, normalizado.split()), (self._by_trigram, tri)):
+                for clave in claves:
+                    indice.setdefault(clave, set()).add(project_id)
+
+    def remove(self, project_id: int):
+        with self._lock:
+            self._discard(project_id)
+
+    def _discard(self, project_id):
+        entry = self._by_id.pop(project_id, None)
+        if entry is None:
+            return
+        _, normalizado, tri = entry
+        for indice, claves in ((self._by_normalized, (normalizado,)),
+                               (self._by_word, normalizado.split()), (self._by_trigram, tri)):
+            for clave in claves:
+                ids = indice[clave]
+                ids.discard(project_id)
+                if not ids:
+                    del indice[clave]
+
+    def invalidate(self, tables) -> int:
+        """Interfaz de ResultCache: un cambio en projects hecho por otro proceso obliga a recargar."""
+        if "projects" not in tables:
+            return 0
+        self.clear()
+        return 1
+
+    def clear(self):
+        with self._lock:
+            self._loaded = False
+            self._generation += 1
+
+    async def _ensure_loaded(self):
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded:
+                return
+            with self._lock:
+                generation = self._generation
+            proyectos, after_id = [], None
+            while True:
+                filas, after_id = await self._repo().listar_proyectos(None, after_id, LOAD_PAGE_SIZE)
+                proyectos.extend((fila[0], fila[1]) for fila in filas)
+                if after_id is None:
+                    break
+            with self._lock:
+                for indice in (self._by_id, self._by_normalized, self._by_word, self._by_trigram):
+                    indice.clear()
+            for project_id, name in proyectos:
+                self.add(project_id, name)
+            with self._lock:
+                self._loaded = generation == self._generation
+                self.loads += 1
+
+    # --- Resolución ---
+
+    def _candidatos(self, normalizado: str) -> tuple[list, list]:
+        """
+        Candidatos (similitud, id, nombre) de más a menos parecidos: los nombres que
+        contienen la referencia como palabras completas y, si no hay ninguno, los
+        parecidos por trigramas.
+        """
+        buscados = trigramas(normalizado)
+        contienen, parecidos = [], []
+        with self._lock:
+            # Contener la referencia exige contener cada una de sus palabras
+            posting = sorted((self._by_word.get(palabra, set()) for palabra in normalizado.split()), key=len)
+            for project_id in set.intersection(*posting) if posting else ():
+                name, nombre_normalizado, tri = self._by_id[project_id]
+                if f" {normalizado} " in f" {nombre_normalizado} ":
+                    contienen.append((similitud(buscados, tri), project_id, name))
+            if not contienen and buscados:
+                # Filtro por prefijo: con similitud >= umbral, un nombre comparte al menos
+                # ceil(umbral * |buscados|) trigramas, así que tiene que aparecer en alguna
+                # de las listas de los |buscados| - mínimo + 1 trigramas menos frecuentes
+                minimo = max(1, math.ceil(PROJECT_MATCH_THRESHOLD * len(buscados)))
+                raros = sorted(buscados, key=lambda t: len(self._by_trigram.get(t, ())))
+                for project_id in set().union(*(self._by_trigram.get(t, ()) for t in raros[:len(raros) - minimo + 1])):
+                    name, _, tri = self._by_id[project_id]
+                    puntuacion = similitud(buscados, tri)
+                    if puntuacion >= PROJECT_MATCH_THRESHOLD:
+                        parecidos.append((puntuacion, project_id, name))
+        contienen.sort(key=lambda c: (-c[0], c[1]))
+        parecidos.sort(key=lambda c: (-c[0], c[1]))
+        return contienen, parecidos
+
+    def _exactos(self, reference: str, normalizado: str) -> list:
+        """[(id, nombre)] de los proyectos del índice con el mismo nombre normalizado."""
+        with self._lock:
+            exactos = [(project_id, self._by_id[project_id][0]) for project_id in self._by_normalized.get(normalizado, ())]
+        if len(exactos) > 1:
+            # Solo se distinguen por tildes o mayúsculas: vale el nombre tal cual
+            exactos = [c for c in exactos if c[1] == reference] or sorted(exactos)
+        return exactos
+
+    @staticmethod
+    def _elegir(contienen, parecidos):
+        """(candidato aceptado o None, candidatos a sugerir)."""
+        if contienen:
+            # Contener la referencia no dice cuál de varios nombres se quería
+            return (contienen[0] if len(contienen) == 1 else None), contienen
+        if parecidos and (len(parecidos) == 1 or parecidos[0][0] - parecidos[1][0] >= PROJECT_MATCH_MARGIN):
+            return parecidos[0], parecidos
+        return None, parecidos
+
+    async def resolve(self, reference, approximate: bool = True) -> tuple[int, str | None]:
+        """
+        Devuelve (project_id, nombre) para un ID o un nombre de proyecto. Con un ID el
+        nombre es None si el proyecto no está en el índice (el repositorio decide si
+        existe). Con approximate=False solo se aceptan coincidencias exactas (salvo
+        mayúsculas, tildes y separadores), como exige eliminar_proyecto.
+        Lanza ProjectNotFoundError o AmbiguousProjectError.
+        """
+        if isinstance(reference, int) or (isinstance(reference, str) and reference.strip().isdigit()):
+            project_id = int(reference)
+            with self._lock:
+                entry = self._by_id.get(project_id)
+            return project_id, entry[0] if entry else None
+
+        await self._ensure_loaded()
+        reference = reference.strip()
+        normalizado = normalizar_nombre(reference)
+
+        exactos = self._exactos(reference, normalizado)
+        filas = []
+        if not exactos:
+            # Fallo del índice: antes de aceptar un nombre parecido se comprueba en la base
+            # de datos que no haya un proyecto con ese nombre exacto que el índice no conoce
+            self.fallbacks += 1
+            filas = await self._repo().proyectos_similares(reference, MAX_CANDIDATES)
+            for project_id, name, _ in filas:
+                self.add(project_id, name)
+            exactos = self._exactos(reference, normalizado)
+        elif len(exactos) == 1:
+            self.hits += 1
+        if len(exactos) == 1:
+            return exactos[0]
+        if exactos:
+            raise AmbiguousProjectError(reference, exactos)
+
+        contienen, parecidos = self._candidatos(normalizado)
+        if not contienen and not parecidos:
+            # Coincidencias parciales dentro de una palabra ('finanz' -> 'Finanzas')
+            contienen = [(similitud_bd, project_id, name) for project_id, name, similitud_bd in filas]
+
+        elegido, candidatos = self._elegir(contienen, parecidos)
+        if approximate and elegido is not None:
+            self.hits += 1
+            return elegido[1], elegido[2]
+        sugerencias = [(project_id, name) for _, project_id, name in candidatos[:MAX_CANDIDATES]]
+        if approximate and len(sugerencias) > 1:
+            raise AmbiguousProjectError(reference, sugerencias)
+        raise ProjectNotFoundError(reference, sugerencias)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"projects": len(self._by_id), "loaded": self._loaded, "loads": self.loads,
+                    "hits": self.hits, "fallbacks": self.fallbacks}
+
+
+_project_index: ProjectIndex | None = None
+_project_index_lock = threading.Lock()
+
+def get_project_index() -> ProjectIndex:
+    """Devuelve el índice compartido del proceso, creándolo la primera vez."""
+    global _project_index
+    with _project_index_lock:
+        if _project_index is None:
+            _project_index = ProjectIndex()
+        return _project_index
@@ -0,0 +1,279 @@
+# ATLAS/atlas_server/repository.py
+
+"""
+Capa de acceso a datos de las herramientas de ATLAS.
+
+Las herramientas de tools.py no escriben SQL: llaman a los métodos del repositorio
+activo, que encapsula el motor de base de datos. Hay dos implementaciones con el
+mismo esquema y la misma semántica:
+
+  - 'postgres' (por defecto): PostgreSQL con pool de conexiones (repository_postgres.py).
+  - 'sqlite': base de datos embebida en un fichero, sin servidor (repository_sqlite.py),
+    pensada para instalaciones de un solo usuario.
+
+Se elige con ATLAS_DB_BACKEND. Cada método es asíncrono, se ejecuta en una única
+transacción y nunca bloquea el bucle de eventos.
+"""
+
+import os
+import re
+import itertools
+import threading
+
+DB_BACKEND = os.getenv("ATLAS_DB_BACKEND", "postgres").strip().lower()
+
+# Filas por sentencia INSERT multi-fila al crear tareas en bloque. Las listas más
+# largas se insertan por lotes a medida que se van leyendo (modo streaming).
+BULK_INSERT_BATCH_SIZE = 1000
+# Filas por bloque al exportar (las que se leen del cursor y se escriben de cada vez)
+EXPORT_BATCH_SIZE = int(os.getenv("ATLAS_EXPORT_BATCH_SIZE", "10000"))
+# Proyecto en el que crear_recordatorio guarda las tareas (se crea al primer recordatorio)
+PROYECTO_RECORDATORIOS = "Recordatorios"
+
+
+class DuplicateNameError(ValueError):
+    """Ya existe un proyecto con ese nombre (restricción UNIQUE de projects.name)."""
+
+
+class PlanStepError(RuntimeError):
+    """Un paso de un plan falló; la transacción de todo el plan se revierte."""
+
+    def __init__(self, paso: int, operacion: str, detalle: str):
+        self.paso = paso
+        self.operacion = operacion
+        self.detalle = detalle
+        super().__init__(f"paso {paso} ({operacion}): {detalle}")
+
+
+def en_lotes(iterable, size):
+    iterator = iter(iterable)
+    while lote := list(itertools.islice(iterator, size)):
+        yield lote
+
+
+# --- Planes de varias operaciones ---
+# Un plan es una lista de pasos (método del repositorio, argumentos) que se ejecutan
+# en orden, con una sola conexión y en una sola transacción. Un argumento '$N' es el
+# ID creado o afectado por el paso N; '$N.campo' es otro campo de su resultado (p. ej.
+# '$1.tareas', las tareas creadas por el paso 1). Dentro de una lista, una referencia
+# a una lista se expande: tarea_ids=['$1.tareas', 7].
+
+_REFERENCIA = re.compile(r"^\$(\d+)(?:\.(\w+))?$")
+
+def es_referencia(valor) -> bool:
+    return isinstance(valor, str) and _REFERENCIA.match(valor.strip()) is not None
+
+def _valor_referencia(texto, resultados):
+    numero, campo = _REFERENCIA.match(texto.strip()).groups()
+    numero, campo = int(numero), campo or "id"
+    if not 1 <= numero <= len(resultados):
+        raise ValueError(f"'{texto}' no se refiere a un paso anterior")
+    if campo not in resultados[numero - 1]:
+        raise ValueError(f"el paso {numero} no devuelve '{campo}' (disponible: {', '.join(resultados[numero - 1])})")
+    return resultados[numero - 1][campo]
+
+def resolver_referencias(argumentos: dict, resultados: list[dict]) -> dict:
+    """Sustituye las referencias '$N[.campo]' de los argumentos por los resultados de los pasos anteriores."""
+    resueltos = {}
+    for nombre, valor in argumentos.items():
+        if isinstance(valor, list):
+            lista = []
+            for item in valor:
+                item = _valor_referencia(item, resultados) if es_referencia(item) else item
+                lista.extend(item) if isinstance(item, list) else lista.append(item)
+            resueltos[nombre] = lista
+        else:
+            resueltos[nombre] = _valor_referencia(valor, resultados) if es_referencia(valor) else valor
+    return resueltos
+
+# Resultado de cada operación del plan a partir de lo que devuelve su función y de sus
+# argumentos; None significa que no encontró nada que modificar (el plan falla)
+RESULTADOS_PLAN = {
+    "crear_tarea": lambda valor, a: {"id": valor, "project_id": a["project_id"]},
+    "actualizar_estado": lambda valor, a: {"id": a["tarea_id"], "estado": a["nuevo_estado"]} if valor else None,
+    "crear_recordatorio": lambda valor, a: {"id": valor[0], "project_id": valor[1]},
+    "borrar_tarea": lambda valor, a: {"id": a["tarea_id"], "descripcion": valor} if valor is not None else None,
+    "actualizar_estados": lambda valor, a: {"tareas": [fila[0] for fila in valor], "estado": a["nuevo_estado"]} if valor else None,
+    "borrar_tareas": lambda valor, a: {"tareas": [fila[0] for fila in valor]} if valor else None,
+    "mover_tareas": lambda valor, a: {"tareas": [fila[0] for fila in valor], "project_id": a["project_id"]} if valor else None,
+    "crear_proyecto_y_tareas": lambda valor, a: {"id": valor[0], "nombre": a["nombre_proyecto"], "tareas": valor[1]},
+    "borrar_proyecto": lambda valor, a: {"id": a["proyecto_id"], "nombre": valor} if valor is not None else None,
+}
+
+ERRORES_PLAN = {
+    "actualizar_estado": "no existe la tarea {tarea_id}",
+    "borrar_tarea": "no existe la tarea {tarea_id}",
+    "actualizar_estados": "ninguna tarea coincide con la selección",
+    "borrar_tareas": "ninguna tarea coincide con la selección",
+    "mover_tareas": "ninguna de las tareas {tarea_ids} existe",
+    "borrar_proyecto": "no existe el proyecto {proyecto_id}",
+}
+
+def ejecutar_pasos(conn, pasos, funciones: dict) -> list[dict]:
+    """
+    Ejecuta los pasos con las funciones `_xxx(conn, ...)` del backend, todas sobre la
+    misma conexión (la transacción la abre y confirma quien llama). Cualquier fallo
+    se relanza como PlanStepError para que la transacción se revierta entera.
+    """
+    resultados = []
+    for numero, (operacion, argumentos) in enumerate(pasos, 1):
+        try:
+            argumentos = resolver_referencias(argumentos, resultados)
+            valor = funciones[operacion](conn, **argumentos)
+        except DuplicateNameError:
+            raise PlanStepError(numero, operacion, f"el proyecto '{argumentos['nombre_proyecto']}' ya existe") from None
+        except Exception as e:
+            raise PlanStepError(numero, operacion, str(e).strip() or type(e).__name__) from e
+        resultado = RESULTADOS_PLAN[operacion](valor, argumentos)
+        if resultado is None:
+            raise PlanStepError(numero, operacion, ERRORES_PLAN[operacion].format(**argumentos))
+        resultados.append(resultado)
+    return resultados
+
+
+class Repository:
+    """
+    Interfaz común de los backends de almacenamiento. Las filas de los listados se
+    devuelven como tuplas: tareas (id, description, status, project_name) y proyectos
+    (id, name, created_at); las páginas como (filas, after_id de la siguiente o None).
+    """
+
+    name = "base"
+    # El backend publica los cambios para otros procesos (LISTEN/NOTIFY)
+    supports_notify = False
+
+    def initialize(self) -> list[int]:
+        """Crea o actualiza el esquema; devuelve las versiones aplicadas."""
+        raise NotImplementedError
+
+    def close(self):
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        raise NotImplementedError
+
+    # --- Tareas ---
+
+    async def crear_tarea(self, project_id: int, description: str) -> int:
+        raise NotImplementedError
+
+    async def actualizar_estado(self, tarea_id: int, nuevo_estado: str) -> bool:
+        """True si la tarea existía."""
+        raise NotImplementedError
+
+    async def crear_recordatorio(self, description: str) -> tuple[int, int]:
+        """
+        Crea la tarea en el proyecto 'Recordatorios' (creándolo si no existe);
+        devuelve (ID de la tarea, ID del proyecto).
+        """
+        raise NotImplementedError
+
+    async def borrar_tarea(self, tarea_id: int) -> str | None:
+        """Descripción de la tarea eliminada, o None si no existía."""
+        raise NotImplementedError
+
+    async def actualizar_estados(self, nuevo_estado, tarea_ids, project_id, estado_actual) -> list[tuple]:
+        """Actualiza la selección; devuelve [(id, estado_anterior)] ordenado por ID."""
+        raise NotImplementedError
+
+    async def borrar_tareas(self, tarea_ids, project_id, estado_actual) -> list[tuple]:
+        """Elimina la selección; devuelve [(id, descripción)] ordenado por ID."""
+        raise NotImplementedError
+
+    async def mover_tareas(self, tarea_ids, project_id) -> list[tuple]:
+        """Pasa las tareas al proyecto `project_id`; devuelve [(id, proyecto_anterior)] ordenado por ID."""
+        raise NotImplementedError
+
+    async def listar_tareas(self, project_name, status, after_id=None, page_size=10) -> tuple[list, int | None]:
+        raise NotImplementedError
+
+    async def buscar_tareas(self, consulta, project_name=None, status=None, cursor=None, page_size=10) -> tuple[list, tuple | None]:
+        """
+        Búsqueda de texto completo en la descripción de las tareas, de más a menos
+        relevante. Filas (id, description, status, project_name, relevancia, fragmento
+        con los términos resaltados entre «»); `cursor` es la posición (relevancia, id)
+        devuelta por la página anterior.
+        """
+        raise NotImplementedError
+
+    # --- Proyectos ---
+
+    async def crear_proyecto_y_tareas(self, nombre_proyecto: str, tareas) -> tuple[int, list[int]]:
+        """Crea el proyecto y sus tareas (iterable, insertado por lotes); lanza DuplicateNameError."""
+        raise NotImplementedError
+
+    async def borrar_proyecto(self, proyecto_id: int) -> str | None:
+        """Nombre del proyecto eliminado (con sus tareas, en cascada), o None si no existía."""
+        raise NotImplementedError
+
+    async def listar_proyectos(self, nombre, after_id=None, page_size=50) -> tuple[list, int | None]:
+        raise NotImplementedError
+
+    async def proyectos_similares(self, nombre: str, limite: int = 5) -> list[tuple]:
+        """
+        Proyectos cuyo nombre contiene `nombre` o se le parece (trigramas, si el motor
+        los admite), de más a menos parecido: [(id, name, similitud)].
+        """
+        raise NotImplementedError
+
+    async def resumen_proyectos(self, nombre=None, estado=None, after_id=None, page_size=50) -> tuple[list, int | None]:
+        """
+        Estado de cada proyecto, paginado por ID: filas (id, name, {estado: nº de tareas},
+        última actividad). Con `estado`, solo los proyectos con alguna tarea en ese estado.
+        """
+        raise NotImplementedError
+
+    # --- Planes ---
+
+    async def ejecutar_plan(self, pasos) -> list[dict]:
+        """
+        Ejecuta [(método, argumentos)] en una sola transacción (ver ejecutar_pasos);
+        devuelve el resultado de cada paso o lanza PlanStepError sin aplicar nada.
+        """
+        raise NotImplementedError
+
+    # --- Exportación e importación masivas ---
+    # Filas (project, project_created_at, description, status, created_at): una por tarea
+    # con los datos de su proyecto; un proyecto sin tareas es una fila con description None.
+
+    async def exportar(self, escribir, project_name=None, lote=EXPORT_BATCH_SIZE) -> int:
+        """
+        Recorre los proyectos (filtro parcial por nombre) y sus tareas con memoria
+        constante y llama a escribir(filas) por bloques de `lote` filas: primero los
+        proyectos sin tareas y después las tareas por ID, todo de una misma instantánea.
+        Devuelve el número de filas exportadas.
+        """
+        raise NotImplementedError
+
+    async def importar(self, filas) -> dict:
+        """
+        Carga el iterable `filas` en una tabla temporal de staging y lo fusiona en una
+        sola transacción con sentencias set-based: crea los proyectos que no existen
+        (por nombre), actualiza el estado de las tareas que ya existen (mismo proyecto y
+        descripción) e inserta las demás. Devuelve {"filas", "proyectos",
+        "tareas_creadas", "tareas_actualizadas"}.
+        """
+        raise NotImplementedError
+
+
+def create_repository(backend: str = DB_BACKEND) -> Repository:
+    """Instancia el backend indicado (los módulos de cada motor se importan bajo demanda)."""
+    if backend in ("postgres", "postgresql"):
+        from atlas_server.repository_postgres import PostgresRepository
+        return PostgresRepository()
+    if backend == "sqlite":
+        from atlas_server.repository_sqlite import SqliteRepository
+        return SqliteRepository()
+    raise ValueError(f"ATLAS_DB_BACKEND desconocido: '{backend}' (usa 'postgres' o 'sqlite').")
+
+
+_repository: Repository | None = None
+_repository_lock = threading.Lock()
+
+def get_repository() -> Repository:
+    """Devuelve el repositorio compartido del proceso, creándolo la primera vez."""
+    global _repository
+    with _repository_lock:
+        if _repository is None:
+            _repository = create_repository()
+        return _repository
@@ -0,0 +1,553 @@
+# ATLAS/atlas_server/repository_postgres.py
+
+"""
+Backend PostgreSQL del repositorio (ATLAS_DB_BACKEND=postgres, el predeterminado).
+
+Cada operación es una función síncrona `_xxx(conn, ...)` que se ejecuta con
+run_in_transaction en el pool de hilos de BD, con una conexión del pool.
+"""
+
+import io
+import csv
+
+from psycopg2.extras import execute_values
+from psycopg2.errors import UniqueViolation, QueryCanceled
+
+from atlas_server.db_connector import get_pool, close_pool, run_in_transaction
+from atlas_server.migrations import apply_migrations
+from atlas_server.repository import (Repository, DuplicateNameError, BULK_INSERT_BATCH_SIZE, EXPORT_BATCH_SIZE,
+                                     PROYECTO_RECORDATORIOS, en_lotes, ejecutar_pasos)
+
+
+# --- 1. Tareas ---
+
+def _insertar_tarea(conn, project_id, description):
+    with conn.cursor() as cursor:
+        # Consulta SQL simplificada: Solo project_id y description
+        cursor.execute(
+            "INSERT INTO tasks (project_id, description) VALUES (%s, %s) RETURNING id",
+            (project_id, description)
+        )
+        return cursor.fetchone()[0]
+
+def _actualizar_estado(conn, tarea_id, nuevo_estado):
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "UPDATE tasks SET status = %s WHERE id = %s RETURNING id",
+            (nuevo_estado, tarea_id)
+        )
+        return cursor.rowcount > 0
+
+def _insertar_recordatorio(conn, description):
+    with conn.cursor() as cursor:
+        # 1. Asegurar que el proyecto 'Recordatorios' existe
+        cursor.execute("INSERT INTO projects (name) VALUES (%s) ON CONFLICT (name) DO UPDATE SET name=EXCLUDED.name RETURNING id", (PROYECTO_RECORDATORIOS,))
+        project_id = cursor.fetchone()[0]
+
+        # 2. Insertar la tarea de recordatorio (Solo project_id, description, status)
+        cursor.execute(
+            "INSERT INTO tasks (project_id, description, status) VALUES (%s, %s, %s) RETURNING id",
+            (project_id, description, 'Recordatorio')
+        )
+        return cursor.fetchone()[0], project_id
+
+def _borrar_tarea(conn, tarea_id):
+    with conn.cursor() as cursor:
+        # Obtenemos la descripción para el mensaje de respuesta en la misma sentencia
+        cursor.execute("DELETE FROM tasks WHERE id = %s RETURNING description", (tarea_id,))
+        task_info = cursor.fetchone()
+        return task_info[0] if task_info else None
+
+# Operaciones por lotes: una sola sentencia set-based (WHERE id = ANY(...)) dentro
+# de una transacción, en lugar de una llamada a herramienta por tarea.
+
+def _filtro_tareas(tarea_ids, project_id, estado_actual):
+    """Construye la condición WHERE (y sus parámetros) de una selección de tareas."""
+    condiciones, params = [], []
+    if tarea_ids:
+        condiciones.append("id = ANY(%s)")
+        params.append(list(tarea_ids))
+    if project_id is not None:
+        condiciones.append("project_id = %s")
+        params.append(project_id)
+    if estado_actual:
+        condiciones.append("lower(status) = lower(%s)")
+        params.append(estado_actual)
+    return " AND ".join(condiciones), params
+
+def _actualizar_estados(conn, nuevo_estado, tarea_ids, project_id, estado_actual):
+    condicion, params = _filtro_tareas(tarea_ids, project_id, estado_actual)
+    with conn.cursor() as cursor:
+        cursor.execute(
+            f"""
+            WITH objetivo AS (
+                SELECT id, status FROM tasks WHERE {condicion} FOR UPDATE
+            )
+            UPDATE tasks t SET status = %s
+            FROM objetivo o
+            WHERE t.id = o.id
+            RETURNING t.id, o.status
+            """,
+            params + [nuevo_estado]
+        )
+        return sorted(cursor.fetchall())
+
+def _borrar_tareas(conn, tarea_ids, project_id, estado_actual):
+    condicion, params = _filtro_tareas(tarea_ids, project_id, estado_actual)
+    with conn.cursor() as cursor:
+        cursor.execute(f"DELETE FROM tasks WHERE {condicion} RETURNING id, description", params)
+        return sorted(cursor.fetchall())
+
+def _mover_tareas(conn, tarea_ids, project_id):
+    with conn.cursor() as cursor:
+        cursor.execute(
+            """
+            WITH objetivo AS (
+                SELECT id, project_id FROM tasks WHERE id = ANY(%s) FOR UPDATE
+            )
+            UPDATE tasks t SET project_id = %s
+            FROM objetivo o
+            WHERE t.id = o.id
+            RETURNING t.id, o.project_id
+            """,
+            (list(tarea_ids), project_id)
+        )
+        return sorted(cursor.fetchall())
+
+
+# --- 2. Proyectos ---
+
+def _insertar_proyecto_y_tareas(conn, nombre_proyecto, tareas):
+    """Crea el proyecto e inserta sus tareas con un INSERT multi-fila por lote; devuelve (project_id, task_ids)."""
+    with conn.cursor() as cursor:
+        # 1. Crear el proyecto principal y obtener su ID
+        try:
+            cursor.execute("INSERT INTO projects (name) VALUES (%s) RETURNING id", (nombre_proyecto,))
+        except UniqueViolation as e:
+            raise DuplicateNameError(str(e)) from e
+        project_id = cursor.fetchone()[0]
+
+        # 2. Insertar las tareas en una sola sentencia por lote (un viaje de ida y vuelta)
+        task_ids = []
+        for lote in en_lotes(tareas, BULK_INSERT_BATCH_SIZE):
+            filas = execute_values(
+                cursor,
+                "INSERT INTO tasks (project_id, description, status) VALUES %s RETURNING id",
+                [(project_id, tarea_description, 'Pendiente') for tarea_description in lote],
+                page_size=len(lote),
+                fetch=True,
+            )
+            task_ids.extend(fila[0] for fila in filas)
+        return project_id, task_ids
+
+def _borrar_proyecto(conn, proyecto_id):
+    with conn.cursor() as cursor:
+        # Las tareas se eliminan en cascada gracias al FOREIGN KEY ON DELETE CASCADE
+        cursor.execute("DELETE FROM projects WHERE id = %s RETURNING name", (proyecto_id,))
+        project_info = cursor.fetchone()
+        return project_info[0] if project_info else None
+
+
+# --- 3. Listados paginados ---
+
+def _leer_pagina(conn, nombre_cursor, sql_query, params, page_size):
+    """
+    Ejecuta la consulta con un cursor de servidor (las filas llegan en bloques, no
+    todas de golpe) y lee como máximo `page_size` filas. La consulta debe pedir una
+    fila extra (LIMIT page_size + 1) para saber si existe una página siguiente.
+    Devuelve (filas, after_id de la página siguiente o None).
+    """
+    with conn.cursor(name=nombre_cursor) as cursor:
+        cursor.itersize = page_size + 1
+        cursor.execute(sql_query, params)
+        filas = []
+        for row in cursor:
+            if len(filas) == page_size:
+                # Hay más resultados: la siguiente página empieza tras el último ID devuelto
+                return filas, filas[-1][0]
+            filas.append(row)
+        return filas, None
+
+def _consultar_tareas(conn, project_name, status, after_id=None, page_size=10):
+    # Consulta SQL simplificada: solo selecciona id, description, status, project_name
+    sql_query = """
+        SELECT
+            t.id, t.description, t.status, p.name AS project_name
+        FROM
+            tasks t
+        JOIN
+            projects p ON t.project_id = p.id
+        WHERE
+            1 = 1
+    """
+    params = []
+    if project_name:
+        sql_query += " AND p.name ILIKE %s"
+        params.append(f'%{project_name}%')
+    if status:
+        sql_query += " AND t.status ILIKE %s"
+        params.append(f'%{status}%')
+    if after_id is not None:
+        # Paginación por clave (keyset): continúa tras el último ID visto, sin OFFSET
+        sql_query += " AND t.id > %s"
+        params.append(after_id)
+
+    # Se omite el ORDER BY due_date
+    sql_query += " ORDER BY t.id ASC LIMIT %s"
+    params.append(page_size + 1)
+
+    return _leer_pagina(conn, "listar_tareas", sql_query, params, page_size)
+
+def _consultar_proyectos(conn, nombre, after_id=None, page_size=50):
+    sql_query = "SELECT id, name, created_at FROM projects WHERE 1=1"
+    params = []
+    if nombre:
+        sql_query += " AND name ILIKE %s"
+        params.append(f'%{nombre}%')
+    if after_id is not None:
+        sql_query += " AND id > %s"
+        params.append(after_id)
+
+    sql_query += " ORDER BY id ASC LIMIT %s"
+    params.append(page_size + 1)
+
+    return _leer_pagina(conn, "listar_proyectos", sql_query, params, page_size)
+
+def _proyectos_similares(conn, nombre, limite, trigramas):
+    with conn.cursor() as cursor:
+        if trigramas:
+            # El operador % usa el índice GIN de trigramas de projects.name (migración 3)
+            cursor.execute(
+                """
+                SELECT id, name, similarity(name, %s) AS similitud FROM projects
+                WHERE name %% %s OR name ILIKE %s
+                ORDER BY similitud DESC, id ASC LIMIT %s
+                """,
+                (nombre, nombre, f'%{nombre}%', limite)
+            )
+        else:
+            cursor.execute(
+                "SELECT id, name, 0.0 FROM projects WHERE name ILIKE %s ORDER BY length(name), id LIMIT %s",
+                (f'%{nombre}%', limite)
+            )
+        return cursor.fetchall()
+
+def _tiene_pg_trgm(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+def _resumen_proyectos(conn, nombre, estado, after_id=None, page_size=50):
+    """
+    Resumen por proyecto leído de project_task_summary (migración 6): el coste depende
+    del número de proyectos de la página, no del de tareas.
+    """
+    condiciones, params = "", []
+    if nombre:
+        condiciones += " AND p.name ILIKE %s"
+        params.append(f'%{nombre}%')
+    if estado:
+        # Proyectos con al menos una tarea en ese estado (p. ej. 'Bloqueada')
+        condiciones += """ AND EXISTS (
+            SELECT 1 FROM project_task_summary f
+            WHERE f.project_id = p.id AND f.task_count > 0 AND f.status ILIKE %s)"""
+        params.append(f'%{estado}%')
+    if after_id is not None:
+        condiciones += " AND p.id > %s"
+        params.append(after_id)
+    params.append(page_size + 1)
+
+    sql_query = f"""
+        WITH pagina AS (
+            SELECT p.id, p.name, p.created_at FROM projects p
+            WHERE 1 = 1{condiciones}
+            ORDER BY p.id ASC LIMIT %s
+        )
+        SELECT pagina.id, pagina.name,
+               COALESCE(json_object_agg(s.status, s.task_count) FILTER (WHERE s.task_count > 0), '{{}}'),
+               COALESCE(max(s.last_activity), pagina.created_at)
+        FROM pagina
+        LEFT JOIN project_task_summary s ON s.project_id = pagina.id
+        GROUP BY pagina.id, pagina.name, pagina.created_at
+        ORDER BY pagina.id ASC
+    """
+    with conn.cursor() as cursor:
+        cursor.execute(sql_query, params)
+        filas = cursor.fetchall()
+    if len(filas) > page_size:
+        filas = filas[:page_size]
+        return filas, filas[-1][0]
+    return filas, None
+
+
+# --- 4. Búsqueda de texto completo ---
+# tasks.search_vector es una columna generada (to_tsvector('spanish', description)) con
+# índice GIN (migración 5): la consulta se reduce con el índice y solo se ordena por
+# relevancia el conjunto de coincidencias; ts_headline se calcula solo para la página.
+
+# Opciones de ts_headline: términos entre «», fragmento de 8 a 20 palabras
+HEADLINE_OPTIONS = "StartSel=«, StopSel=», MinWords=8, MaxWords=20"
+
+def _buscar_tareas(conn, consulta, project_name=None, status=None, cursor=None, page_size=10):
+    filtros, params = "", [consulta]
+    if project_name:
+        filtros += " AND p.name ILIKE %s"
+        params.append(f'%{project_name}%')
+    if status:
+        filtros += " AND t.status ILIKE %s"
+        params.append(f'%{status}%')
+    posicion = ""
+    if cursor is not None:
+        # Keyset sobre (relevancia DESC, id ASC); ts_rank devuelve real, así que se compara como real
+        posicion = "WHERE rank < %s::real OR (rank = %s::real AND id > %s)"
+        params.extend([cursor[0], cursor[0], cursor[1]])
+    params.extend([page_size + 1, HEADLINE_OPTIONS])
+
+    with conn.cursor() as cur:
+        cur.execute(
+            f"""
+            WITH q AS (SELECT websearch_to_tsquery('spanish', %s) AS query),
+            coincidencias AS (
+                SELECT t.id, t.description, t.status, p.name AS project_name,
+                       ts_rank(t.search_vector, q.query) AS rank
+                FROM tasks t
+                JOIN projects p ON t.project_id = p.id
+                CROSS JOIN q
+                WHERE t.search_vector @@ q.query{filtros}
+            ),
+            pagina AS (
+                SELECT * FROM coincidencias {posicion}
+                ORDER BY rank DESC, id ASC
+                LIMIT %s
+            )
+            SELECT pagina.id, pagina.description, pagina.status, pagina.project_name, pagina.rank,
+                   ts_headline('spanish', pagina.description, q.query, %s)
+            FROM pagina CROSS JOIN q
+            ORDER BY pagina.rank DESC, pagina.id ASC
+            """,
+            params
+        )
+        filas = cur.fetchall()
+    if len(filas) > page_size:
+        filas = filas[:page_size]
+        return filas, (filas[-1][4], filas[-1][0])
+    return filas, None
+
+
+# --- 5. Planes ---
+
+# Funciones de cada operación que admite un plan (ver repository.ejecutar_pasos)
+FUNCIONES_PLAN = {
+    "crear_tarea": _insertar_tarea,
+    "actualizar_estado": _actualizar_estado,
+    "crear_recordatorio": _insertar_recordatorio,
+    "borrar_tarea": _borrar_tarea,
+    "actualizar_estados": _actualizar_estados,
+    "borrar_tareas": _borrar_tareas,
+    "mover_tareas": _mover_tareas,
+    "crear_proyecto_y_tareas": _insertar_proyecto_y_tareas,
+    "borrar_proyecto": _borrar_proyecto,
+}
+
+
+# --- 6. Exportación e importación masivas ---
+
+# Tareas nuevas a partir de las cuales la importación actualiza las estadísticas del planificador
+IMPORT_ANALYZE_THRESHOLD = 10000
+
+def _exportar(conn, escribir, project_name, lote):
+    """Dos consultas con cursores de servidor sobre la misma instantánea (REPEATABLE READ)."""
+    with conn.cursor() as cursor:
+        cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY")
+    filtro, params = "", []
+    if project_name:
+        filtro = " AND p.name ILIKE %s"
+        params.append(f'%{project_name}%')
+    consultas = [
+        ("exportar_proyectos", f"""
+            SELECT p.name, p.created_at, NULL, NULL, NULL FROM projects p
+            WHERE NOT EXISTS (SELECT 1 FROM tasks t WHERE t.project_id = p.id){filtro}
+            ORDER BY p.id
+        """),
+        # Recorre tasks por su clave primaria: las filas salen en orden sin ordenar la tabla
+        ("exportar_tareas", f"""
+            SELECT p.name, p.created_at, t.description, t.status, t.created_at
+            FROM tasks t JOIN projects p ON p.id = t.project_id
+            WHERE 1 = 1{filtro}
+            ORDER BY t.id
+        """),
+    ]
+    total = 0
+    for nombre_cursor, sql_query in consultas:
+        with conn.cursor(name=nombre_cursor) as cursor:
+            cursor.itersize = lote
+            cursor.execute(sql_query, params)
+            while filas := cursor.fetchmany(lote):
+                escribir(filas)
+                total += len(filas)
+    return total
+
+class _FlujoCopy:
+    """
+    Fichero de solo lectura que COPY ... FROM STDIN consume por bloques: genera el CSV
+    de las filas según se piden, sin tener el conjunto entero en memoria. Antepone a
+    cada fila su número de línea (orden de inserción de las tareas).
+    """
+
+    def __init__(self, filas):
+        self._filas = iter(filas)
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, lineterminator="\n")
+        self.filas = 0
+        # psycopg2 convierte un fallo de read() en QueryCanceled: se guarda para relanzarlo
+        self.error = None
+
+    def read(self, size=-1):
+        size = size if size and size > 0 else 65536
+        while self._buffer.tell() < size:
+            try:
+                fila = next(self._filas, None)
+            except Exception as e:
+                self.error = e
+                raise
+            if fila is None:
+                break
+            self.filas += 1
+            self._writer.writerow((self.filas, *fila))
+        datos = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return datos
+
+def _importar(conn, filas):
+    flujo = _FlujoCopy(filas)
+    with conn.cursor() as cursor:
+        # Tabla de staging sin índices ni restricciones: COPY la llena al ritmo de lectura
+        cursor.execute("""
+            CREATE TEMP TABLE atlas_import (
+                linea BIGINT, project_name TEXT, project_created_at TIMESTAMP,
+                description TEXT, status TEXT, created_at TIMESTAMP
+            ) ON COMMIT DROP
+        """)
+        try:
+            cursor.copy_expert("COPY atlas_import FROM STDIN WITH (FORMAT csv)", flujo, size=65536)
+        except QueryCanceled:
+            if flujo.error is not None:
+                raise flujo.error from None
+            raise
+        cursor.execute("ANALYZE atlas_import")
+
+        # 1. Proyectos que no existen, en el orden en que aparecen
+        cursor.execute("""
+            INSERT INTO projects (name, created_at)
+            SELECT project_name, COALESCE(min(project_created_at), CURRENT_TIMESTAMP)
+            FROM atlas_import GROUP BY project_name ORDER BY min(linea)
+            ON CONFLICT (name) DO NOTHING
+        """)
+        proyectos = cursor.rowcount
+
+        # 2. Tareas que ya existen (mismo proyecto y descripción): el estado de su última línea
+        cursor.execute("""
+            UPDATE tasks t SET status = u.status
+            FROM (
+                SELECT DISTINCT ON (p.id, i.description) p.id AS project_id, i.description, i.status
+                FROM atlas_import i JOIN projects p ON p.name = i.project_name
+                WHERE i.description IS NOT NULL AND i.status IS NOT NULL
+                ORDER BY p.id, i.description, i.linea DESC
+            ) u
+            WHERE t.project_id = u.project_id AND t.description = u.description
+              AND t.status IS DISTINCT FROM u.status
+        """)
+        actualizadas = cursor.rowcount
+
+        # 3. Las demás tareas, con un solo INSERT ... SELECT (los triggers del resumen y de
+        # NOTIFY se disparan una vez por sentencia, no por fila)
+        cursor.execute("""
+            INSERT INTO tasks (project_id, description, status, created_at)
+            SELECT p.id, i.description, COALESCE(i.status, 'Pendiente'), COALESCE(i.created_at, CURRENT_TIMESTAMP)
+            FROM atlas_import i JOIN projects p ON p.name = i.project_name
+            WHERE i.description IS NOT NULL
+              AND NOT EXISTS (SELECT 1 FROM tasks t WHERE t.project_id = p.id AND t.description = i.description)
+            ORDER BY i.linea
+        """)
+        creadas = cursor.rowcount
+        if creadas >= IMPORT_ANALYZE_THRESHOLD:
+            # Sin estadísticas al día, el planificador sigue viendo la tabla pequeña y elige
+            # bucles anidados para la siguiente fusión (o consulta) sobre millones de filas
+            cursor.execute("ANALYZE projects, tasks")
+    return {"filas": flujo.filas, "proyectos": proyectos, "tareas_creadas": creadas, "tareas_actualizadas": actualizadas}
+
+
+# --- 7. Repositorio ---
+
+class PostgresRepository(Repository):
+    name = "postgres"
+    supports_notify = True
+    # ¿Está instalada pg_trgm? Se comprueba en la primera búsqueda aproximada
+    _pg_trgm = None
+
+    def initialize(self) -> list[int]:
+        # Con la misma conexión y política de tiempos que las herramientas; apply_migrations
+        # deja la conexión sin transacción abierta ni estado de sesión
+        with get_pool().connection() as conn:
+            return apply_migrations(conn)
+
+    def close(self):
+        close_pool()
+
+    def stats(self) -> dict:
+        return {"backend": self.name, **get_pool().stats()}
+
+    async def crear_tarea(self, project_id, description):
+        return await run_in_transaction(_insertar_tarea, project_id, description)
+
+    async def actualizar_estado(self, tarea_id, nuevo_estado):
+        return await run_in_transaction(_actualizar_estado, tarea_id, nuevo_estado)
+
+    async def crear_recordatorio(self, description):
+        return await run_in_transaction(_insertar_recordatorio, description)
+
+    async def borrar_tarea(self, tarea_id):
+        return await run_in_transaction(_borrar_tarea, tarea_id)
+
+    async def actualizar_estados(self, nuevo_estado, tarea_ids, project_id, estado_actual):
+        return await run_in_transaction(_actualizar_estados, nuevo_estado, tarea_ids, project_id, estado_actual)
+
+    async def borrar_tareas(self, tarea_ids, project_id, estado_actual):
+        return await run_in_transaction(_borrar_tareas, tarea_ids, project_id, estado_actual)
+
+    async def listar_tareas(self, project_name, status, after_id=None, page_size=10):
+        return await run_in_transaction(_consultar_tareas, project_name, status, after_id, page_size)
+
+    async def buscar_tareas(self, consulta, project_name=None, status=None, cursor=None, page_size=10):
+        return await run_in_transaction(_buscar_tareas, consulta, project_name, status, cursor, page_size)
+
+    async def mover_tareas(self, tarea_ids, project_id):
+        return await run_in_transaction(_mover_tareas, tarea_ids, project_id)
+
+    async def crear_proyecto_y_tareas(self, nombre_proyecto, tareas):
+        return await run_in_transaction(_insertar_proyecto_y_tareas, nombre_proyecto, tareas)
+
+    async def borrar_proyecto(self, proyecto_id):
+        return await run_in_transaction(_borrar_proyecto, proyecto_id)
+
+    async def listar_proyectos(self, nombre, after_id=None, page_size=50):
+        return await run_in_transaction(_consultar_proyectos, nombre, after_id, page_size)
+
+    async def proyectos_similares(self, nombre, limite=5):
+        if self._pg_trgm is None:
+            # La migración 3 solo instala pg_trgm si está disponible en el servidor
+            self._pg_trgm = await run_in_transaction(_tiene_pg_trgm)
+        return await run_in_transaction(_proyectos_similares, nombre, limite, self._pg_trgm)
+
+    async def resumen_proyectos(self, nombre=None, estado=None, after_id=None, page_size=50):
+        return await run_in_transaction(_resumen_proyectos, nombre, estado, after_id, page_size)
+
+    async def ejecutar_plan(self, pasos):
+        return await run_in_transaction(ejecutar_pasos, pasos, FUNCIONES_PLAN)
+
+    async def exportar(self, escribir, project_name=None, lote=EXPORT_BATCH_SIZE):
+        return await run_in_transaction(_exportar, escribir, project_name, lote)
+
+    async def importar(self, filas):
+        return await run_in_transaction(_importar, filas)
@@ -0,0 +1,647 @@
+# ATLAS/atlas_server/repository_sqlite.py
+
+"""
+Backend SQLite embebido del repositorio (ATLAS_DB_BACKEND=sqlite).
+
+Toda la base de datos vive en un fichero (ATLAS_SQLITE_PATH) y no necesita servidor.
+El esquema y la semántica son los de PostgreSQL:
+
+  - Mismas tablas, columnas, valores por defecto, índice (project_id, status) y
+    borrado en cascada (PRAGMA foreign_keys=ON). Las longitudes de VARCHAR, que
+    SQLite no aplica, se comprueban con restricciones CHECK.
+  - Los IDs nunca se reutilizan (AUTOINCREMENT), como con SERIAL.
+  - Cada operación es una transacción; las escrituras toman el bloqueo de escritura
+    al empezar (BEGIN IMMEDIATE) para que el SELECT previo de las operaciones por
+    lotes vea exactamente las filas que se van a modificar.
+
+Cada hilo del pool tiene su propia conexión en modo WAL (los lectores no bloquean al
+escritor) con caché de sentencias preparadas: las consultas son textos fijos con
+parámetros, y las listas de IDs se pasan como un único parámetro JSON (json_each).
+
+Diferencia conocida: LIKE de SQLite ignora mayúsculas solo en caracteres ASCII
+('diseño' no coincide con 'DISEÑO'), mientras que ILIKE de PostgreSQL cubre Unicode.
+"""
+
+import os
+import re
+import json
+import datetime
+import time
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from atlas_server.db_connector import run_db_call, DB_EXECUTOR_WORKERS
+from atlas_server.repository import (Repository, DuplicateNameError, BULK_INSERT_BATCH_SIZE, EXPORT_BATCH_SIZE,
+                                     PROYECTO_RECORDATORIOS, en_lotes, ejecutar_pasos)
+from atlas_server.tracing import span
+
+SQLITE_PATH = os.getenv("ATLAS_SQLITE_PATH", "atlas.db")
+# Sentencias preparadas que conserva cada conexión
+SQLITE_STATEMENT_CACHE = int(os.getenv("ATLAS_SQLITE_STATEMENT_CACHE", "256"))
+# Espera máxima (ms) por el bloqueo de escritura antes de fallar con 'database is locked'
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("ATLAS_SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+
+# --- 1. Esquema ---
+# Mismo esquema que las migraciones de PostgreSQL; la versión se guarda en PRAGMA user_version.
+
+SQLITE_MIGRATIONS = [
+    (1, "Esquema base: tablas projects y tasks, índice (project_id, status)", [
+        """
+        CREATE TABLE IF NOT EXISTS projects (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name VARCHAR(255) UNIQUE NOT NULL CHECK (length(name) <= 255),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            project_id INTEGER NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+            description VARCHAR(255) NOT NULL CHECK (length(description) <= 255),
+            status VARCHAR(50) DEFAULT 'Pendiente' CHECK (length(status) <= 50),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_tasks_project_status ON tasks (project_id, status)",
+    ]),
+    (2, "Búsqueda de texto completo en tasks.description (FTS5 mantenido por triggers)", [
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+            description, content='tasks', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+            INSERT INTO tasks_fts (rowid, description) VALUES (new.id, new.description);
+        END
+        """,
+        # También se disparan con el borrado en cascada de un proyecto
+        """
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, description) VALUES ('delete', old.id, old.description);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF description ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, description) VALUES ('delete', old.id, old.description);
+            INSERT INTO tasks_fts (rowid, description) VALUES (new.id, new.description);
+        END
+        """,
+        # Indexa las tareas que ya existían
+        "INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')",
+    ]),
+    (3, "Resumen por proyecto y estado (project_task_summary) mantenido por triggers", [
+        """
+        CREATE TABLE IF NOT EXISTS project_task_summary (
+            project_id INTEGER NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+            status VARCHAR(50) NOT NULL,
+            task_count INTEGER NOT NULL DEFAULT 0,
+            last_activity TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (project_id, status)
+        ) WITHOUT ROWID
+        """,
+        # SQLite solo tiene triggers por fila: cada tarea suma o resta 1 en su fila del resumen
+        """
+        CREATE TRIGGER IF NOT EXISTS tasks_summary_insert AFTER INSERT ON tasks BEGIN
+            INSERT INTO project_task_summary (project_id, status, task_count, last_activity)
+            VALUES (new.project_id, COALESCE(new.status, ''), 1, CURRENT_TIMESTAMP)
+            ON CONFLICT (project_id, status) DO UPDATE
+            SET task_count = task_count + 1, last_activity = excluded.last_activity;
+        END
+        """,
+        # Solo UPDATE: con el borrado en cascada de un proyecto su resumen ya no existe
+        """
+        CREATE TRIGGER IF NOT EXISTS tasks_summary_delete AFTER DELETE ON tasks BEGIN
+            UPDATE project_task_summary SET task_count = task_count - 1, last_activity = CURRENT_TIMESTAMP
+            WHERE project_id = old.project_id AND status = COALESCE(old.status, '');
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS tasks_summary_update AFTER UPDATE ON tasks BEGIN
+            UPDATE project_task_summary SET task_count = task_count - 1, last_activity = CURRENT_TIMESTAMP
+            WHERE project_id = old.project_id AND status = COALESCE(old.status, '');
+            INSERT INTO project_task_summary (project_id, status, task_count, last_activity)
+            VALUES (new.project_id, COALESCE(new.status, ''), 1, CURRENT_TIMESTAMP)
+            ON CONFLICT (project_id, status) DO UPDATE
+            SET task_count = task_count + 1, last_activity = excluded.last_activity;
+        END
+        """,
+        # Carga inicial con las tareas existentes (la migración se aplica con BEGIN IMMEDIATE)
+        """
+        INSERT INTO project_task_summary (project_id, status, task_count, last_activity)
+        SELECT project_id, COALESCE(status, ''), count(*), COALESCE(max(created_at), CURRENT_TIMESTAMP)
+        FROM tasks WHERE true GROUP BY 1, 2
+        ON CONFLICT (project_id, status) DO NOTHING
+        """,
+    ]),
+]
+
+SQLITE_LATEST_VERSION = SQLITE_MIGRATIONS[-1][0]
+
+
+class _TracingConnection(sqlite3.Connection):
+    """Conexión que registra cada sentencia como un span 'sql' (igual que TracingCursor en PostgreSQL)."""
+
+    def execute(self, sql, parameters=()):
+        with span("sql", statement=" ".join(sql.split())[:200]) as current:
+            cursor = super().execute(sql, parameters)
+            current.set("rows", cursor.rowcount)
+            return cursor
+
+    def executemany(self, sql, seq_of_parameters):
+        with span("sql", statement=" ".join(sql.split())[:200], many=True):
+            return super().executemany(sql, seq_of_parameters)
+
+
+# --- 2. Tareas ---
+
+def _insertar_tarea(conn, project_id, description):
+    return conn.execute(
+        "INSERT INTO tasks (project_id, description) VALUES (?, ?) RETURNING id",
+        (project_id, description)
+    ).fetchone()[0]
+
+def _actualizar_estado(conn, tarea_id, nuevo_estado):
+    return conn.execute(
+        "UPDATE tasks SET status = ? WHERE id = ? RETURNING id", (nuevo_estado, tarea_id)
+    ).fetchone() is not None
+
+def _insertar_recordatorio(conn, description):
+    project_id = conn.execute(
+        "INSERT INTO projects (name) VALUES (?) ON CONFLICT (name) DO UPDATE SET name=excluded.name RETURNING id",
+        (PROYECTO_RECORDATORIOS,)
+    ).fetchone()[0]
+    task_id = conn.execute(
+        "INSERT INTO tasks (project_id, description, status) VALUES (?, ?, ?) RETURNING id",
+        (project_id, description, 'Recordatorio')
+    ).fetchone()[0]
+    return task_id, project_id
+
+def _borrar_tarea(conn, tarea_id):
+    fila = conn.execute("DELETE FROM tasks WHERE id = ? RETURNING description", (tarea_id,)).fetchone()
+    return fila[0] if fila else None
+
+def _filtro_tareas(tarea_ids, project_id, estado_actual):
+    """Condición WHERE de una selección de tareas; la lista de IDs va en un solo parámetro JSON."""
+    condiciones, params = [], []
+    if tarea_ids:
+        condiciones.append("id IN (SELECT value FROM json_each(?))")
+        params.append(json.dumps(list(tarea_ids)))
+    if project_id is not None:
+        condiciones.append("project_id = ?")
+        params.append(project_id)
+    if estado_actual:
+        condiciones.append("lower(status) = lower(?)")
+        params.append(estado_actual)
+    return " AND ".join(condiciones), params
+
+def _actualizar_estados(conn, nuevo_estado, tarea_ids, project_id, estado_actual):
+    condicion, params = _filtro_tareas(tarea_ids, project_id, estado_actual)
+    # UPDATE ... RETURNING solo da el estado nuevo: el anterior se lee antes, dentro de
+    # la misma transacción de escritura (BEGIN IMMEDIATE), así que nadie puede cambiarlo
+    anteriores = conn.execute(f"SELECT id, status FROM tasks WHERE {condicion}", params).fetchall()
+    if anteriores:
+        conn.execute(f"UPDATE tasks SET status = ? WHERE {condicion}", [nuevo_estado] + params)
+    return sorted(anteriores)
+
+def _borrar_tareas(conn, tarea_ids, project_id, estado_actual):
+    condicion, params = _filtro_tareas(tarea_ids, project_id, estado_actual)
+    return sorted(conn.execute(f"DELETE FROM tasks WHERE {condicion} RETURNING id, description", params).fetchall())
+
+def _mover_tareas(conn, tarea_ids, project_id):
+    ids = json.dumps(list(tarea_ids))
+    anteriores = conn.execute("SELECT id, project_id FROM tasks WHERE id IN (SELECT value FROM json_each(?))", (ids,)).fetchall()
+    if anteriores:
+        conn.execute("UPDATE tasks SET project_id = ? WHERE id IN (SELECT value FROM json_each(?))", (project_id, ids))
+    return sorted(anteriores)
+
+
+# --- 3. Proyectos ---
+
+def _insertar_proyecto_y_tareas(conn, nombre_proyecto, tareas):
+    try:
+        project_id = conn.execute("INSERT INTO projects (name) VALUES (?) RETURNING id", (nombre_proyecto,)).fetchone()[0]
+    except sqlite3.IntegrityError as e:
+        if "UNIQUE" in str(e):
+            raise DuplicateNameError(str(e)) from e
+        raise
+
+    task_ids = []
+    for lote in en_lotes(tareas, BULK_INSERT_BATCH_SIZE):
+        # INSERT multi-fila por lote, como execute_values en PostgreSQL
+        valores = ", ".join(["(?, ?, 'Pendiente')"] * len(lote))
+        params = [valor for tarea_description in lote for valor in (project_id, tarea_description)]
+        filas = conn.execute(f"INSERT INTO tasks (project_id, description, status) VALUES {valores} RETURNING id", params)
+        # El orden de RETURNING no está garantizado en SQLite
+        task_ids.extend(sorted(fila[0] for fila in filas))
+    return project_id, task_ids
+
+def _borrar_proyecto(conn, proyecto_id):
+    # Las tareas se eliminan en cascada (PRAGMA foreign_keys=ON)
+    fila = conn.execute("DELETE FROM projects WHERE id = ? RETURNING name", (proyecto_id,)).fetchone()
+    return fila[0] if fila else None
+
+
+# --- 4. Listados paginados ---
+
+def _leer_pagina(cursor, page_size):
+    """Lee como máximo `page_size` filas de una consulta con LIMIT page_size + 1."""
+    filas = cursor.fetchmany(page_size + 1)
+    if len(filas) > page_size:
+        filas = filas[:page_size]
+        return filas, filas[-1][0]
+    return filas, None
+
+def _consultar_tareas(conn, project_name, status, after_id=None, page_size=10):
+    sql_query = """
+        SELECT t.id, t.description, t.status, p.name AS project_name
+        FROM tasks t JOIN projects p ON t.project_id = p.id
+        WHERE 1 = 1
+    """
+    params = []
+    if project_name:
+        sql_query += " AND p.name LIKE ?"
+        params.append(f'%{project_name}%')
+    if status:
+        sql_query += " AND t.status LIKE ?"
+        params.append(f'%{status}%')
+    if after_id is not None:
+        sql_query += " AND t.id > ?"
+        params.append(after_id)
+    sql_query += " ORDER BY t.id ASC LIMIT ?"
+    params.append(page_size + 1)
+    return _leer_pagina(conn.execute(sql_query, params), page_size)
+
+def _consultar_proyectos(conn, nombre, after_id=None, page_size=50):
+    sql_query = "SELECT id, name, created_at FROM projects WHERE 1=1"
+    params = []
+    if nombre:
+        sql_query += " AND name LIKE ?"
+        params.append(f'%{nombre}%')
+    if after_id is not None:
+        sql_query += " AND id > ?"
+        params.append(after_id)
+    sql_query += " ORDER BY id ASC LIMIT ?"
+    params.append(page_size + 1)
+    filas, next_after_id = _leer_pagina(conn.execute(sql_query, params), page_size)
+    # CURRENT_TIMESTAMP se guarda como texto: se devuelve como datetime, igual que psycopg2
+    return [(pid, name, datetime.datetime.fromisoformat(created_at) if created_at else None)
+            for pid, name, created_at in filas], next_after_id
+
+def _proyectos_similares(conn, nombre, limite):
+    # Sin extensión de trigramas: búsqueda parcial, primero los nombres más cortos
+    return conn.execute(
+        "SELECT id, name, 0.0 FROM projects WHERE name LIKE ? ORDER BY length(name), id LIMIT ?",
+        (f'%{nombre}%', limite)
+    ).fetchall()
+
+def _resumen_proyectos(conn, nombre, estado, after_id=None, page_size=50):
+    """Resumen por proyecto leído de project_task_summary (migración 3), sin recorrer las tareas."""
+    condiciones, params = "", []
+    if nombre:
+        condiciones += " AND p.name LIKE ?"
+        params.append(f'%{nombre}%')
+    if estado:
+        condiciones += """ AND EXISTS (
+            SELECT 1 FROM project_task_summary f
+            WHERE f.project_id = p.id AND f.task_count > 0 AND f.status LIKE ?)"""
+        params.append(f'%{estado}%')
+    if after_id is not None:
+        condiciones += " AND p.id > ?"
+        params.append(after_id)
+    params.append(page_size + 1)
+
+    cursor = conn.execute(
+        f"""
+        WITH pagina AS (
+            SELECT p.id, p.name, p.created_at FROM projects p
+            WHERE 1 = 1{condiciones}
+            ORDER BY p.id ASC LIMIT ?
+        )
+        SELECT pagina.id, pagina.name,
+               json_group_object(s.status, s.task_count) FILTER (WHERE s.task_count > 0),
+               COALESCE(max(s.last_activity), pagina.created_at)
+        FROM pagina
+        LEFT JOIN project_task_summary s ON s.project_id = pagina.id
+        GROUP BY pagina.id, pagina.name, pagina.created_at
+        ORDER BY pagina.id ASC
+        """,
+        params
+    )
+    filas, next_after_id = _leer_pagina(cursor, page_size)
+    return [(pid, name, json.loads(conteos or "{}"),
+             datetime.datetime.fromisoformat(ultima) if ultima else None)
+            for pid, name, conteos, ultima in filas], next_after_id
+
+
+# --- 5. Búsqueda de texto completo ---
+# Índice FTS5 'tasks_fts' sobre tasks.description (migración 2), mantenido por triggers.
+# FTS5 no trae lematizador para español: cada término se busca como prefijo ("factura"
+# encuentra "facturas" y "facturación") y los acentos se ignoran. La relevancia es
+# -bm25 (mayor es mejor, como ts_rank).
+
+_PATRON_TERMINO = re.compile(r"\w+")
+
+# Palabras vacías más frecuentes del diccionario 'spanish' de PostgreSQL, que las ignora
+PALABRAS_VACIAS = frozenset("""
+    a al algo algunas algunos ante antes como con contra cual cuando de del desde donde durante
+    e el él ella ellas ellos en entre era es esa ese eso esta está estas este esto estos fue ha
+    hay la las le les lo los más me mi mí mucho muy nada ni no nos o os otra otro para pero poco
+    por porque que qué quien se sí sin sobre su sus también tanto te todo todos tu tú un una uno
+    unos y ya yo
+""".split())
+
+def _consulta_fts(consulta: str) -> str:
+    """Texto libre -> consulta FTS5 segura: todos los términos significativos, como prefijos entrecomillados."""
+    terminos = [t for t in _PATRON_TERMINO.findall(consulta.lower()) if t not in PALABRAS_VACIAS]
+    return " ".join(f'"{termino}"*' for termino in terminos)
+
+def _buscar_tareas(conn, consulta, project_name=None, status=None, cursor=None, page_size=10):
+    expresion = _consulta_fts(consulta)
+    if not expresion:
+        return [], None
+    filtros, params = "", [expresion]
+    if project_name:
+        filtros += " AND p.name LIKE ?"
+        params.append(f'%{project_name}%')
+    if status:
+        filtros += " AND t.status LIKE ?"
+        params.append(f'%{status}%')
+    posicion = ""
+    if cursor is not None:
+        posicion = "WHERE rank < ? OR (rank = ? AND id > ?)"
+        params.extend([cursor[0], cursor[0], cursor[1]])
+    params.append(page_size + 1)
+
+    filas = conn.execute(
+        f"""
+        SELECT * FROM (
+            SELECT t.id, t.description, t.status, p.name AS project_name,
+                   -bm25(tasks_fts) AS rank, snippet(tasks_fts, 0, '«', '»', '…', 20) AS fragmento
+            FROM tasks_fts
+            JOIN tasks t ON t.id = tasks_fts.rowid
+            JOIN projects p ON t.project_id = p.id
+            WHERE tasks_fts MATCH ?{filtros}
+        ) {posicion}
+        ORDER BY rank DESC, id ASC
+        LIMIT ?
+        """,
+        params
+    ).fetchall()
+    if len(filas) > page_size:
+        filas = filas[:page_size]
+        return filas, (filas[-1][4], filas[-1][0])
+    return filas, None
+
+
+# --- 6. Planes ---
+
+# Funciones de cada operación que admite un plan (ver repository.ejecutar_pasos)
+FUNCIONES_PLAN = {
+    "crear_tarea": _insertar_tarea,
+    "actualizar_estado": _actualizar_estado,
+    "crear_recordatorio": _insertar_recordatorio,
+    "borrar_tarea": _borrar_tarea,
+    "actualizar_estados": _actualizar_estados,
+    "borrar_tareas": _borrar_tareas,
+    "mover_tareas": _mover_tareas,
+    "crear_proyecto_y_tareas": _insertar_proyecto_y_tareas,
+    "borrar_proyecto": _borrar_proyecto,
+}
+
+
+# --- 7. Exportación e importación masivas ---
+# Sin COPY: la tabla de staging se llena con executemany sobre el iterable (una sentencia
+# preparada, sin materializar las filas) y la fusión usa las mismas sentencias set-based.
+
+def _fecha(valor):
+    return datetime.datetime.fromisoformat(valor) if valor else None
+
+def _exportar(conn, escribir, project_name, lote):
+    # BEGIN (en modo WAL) fija la instantánea en la primera lectura: ambas consultas la comparten
+    filtro, params = "", []
+    if project_name:
+        filtro = " AND p.name LIKE ?"
+        params.append(f'%{project_name}%')
+    consultas = [
+        f"""
+        SELECT p.name, p.created_at, NULL, NULL, NULL FROM projects p
+        WHERE NOT EXISTS (SELECT 1 FROM tasks t WHERE t.project_id = p.id){filtro}
+        ORDER BY p.id
+        """,
+        f"""
+        SELECT p.name, p.created_at, t.description, t.status, t.created_at
+        FROM tasks t JOIN projects p ON p.id = t.project_id
+        WHERE 1 = 1{filtro}
+        ORDER BY t.id
+        """,
+    ]
+    total = 0
+    for sql_query in consultas:
+        cursor = conn.execute(sql_query, params)
+        while filas := cursor.fetchmany(lote):
+            escribir([(nombre, _fecha(creado), descripcion, estado, _fecha(creada))
+                      for nombre, creado, descripcion, estado, creada in filas])
+            total += len(filas)
+    return total
+
+def _importar(conn, filas):
+    conn.execute("""
+        CREATE TEMP TABLE atlas_import (
+            linea INTEGER PRIMARY KEY, project_name TEXT, project_created_at TEXT,
+            description TEXT, status TEXT, created_at TEXT, project_id INTEGER
+        )
+    """)
+    conn.executemany(
+        "INSERT INTO temp.atlas_import (linea, project_name, project_created_at, description, status, created_at) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        ((linea, *fila) for linea, fila in enumerate(filas, 1))
+    )
+    total = conn.execute("SELECT count(*) FROM temp.atlas_import").fetchone()[0]
+
+    # 1. Proyectos que no existen, en el orden en que aparecen (las fechas se guardan
+    # como CURRENT_TIMESTAMP: 'AAAA-MM-DD HH:MM:SS')
+    proyectos = conn.execute("""
+        INSERT INTO projects (name, created_at)
+        SELECT project_name, COALESCE(datetime(min(project_created_at)), CURRENT_TIMESTAMP)
+        FROM temp.atlas_import WHERE true GROUP BY project_name ORDER BY min(linea)
+        ON CONFLICT (name) DO NOTHING
+    """).rowcount
+    conn.execute("""
+        UPDATE temp.atlas_import SET project_id = (SELECT id FROM projects WHERE name = atlas_import.project_name)
+    """)
+
+    # 2. Tareas que ya existían en esos proyectos, indexadas por (proyecto, descripción):
+    # el índice de tasks es (project_id, status) y no sirve para buscarlas por descripción
+    conn.execute("""
+        CREATE TEMP TABLE atlas_existentes AS
+        SELECT id, project_id, description FROM tasks
+        WHERE project_id IN (SELECT DISTINCT project_id FROM temp.atlas_import)
+    """)
+    conn.execute("CREATE INDEX temp.atlas_existentes_clave ON atlas_existentes (project_id, description)")
+    # Cada tarea existente toma el estado de su última línea (max() elige la fila)
+    actualizadas = conn.execute("""
+        UPDATE tasks SET status = u.status
+        FROM (
+            SELECT e.id, i.status, max(i.linea)
+            FROM temp.atlas_import i
+            JOIN temp.atlas_existentes e ON e.project_id = i.project_id AND e.description = i.description
+            WHERE i.status IS NOT NULL
+            GROUP BY e.id
+        ) u
+        WHERE tasks.id = u.id AND tasks.status IS NOT u.status
+    """).rowcount
+
+    # 3. Las demás tareas, con un solo INSERT ... SELECT
+    creadas = conn.execute("""
+        INSERT INTO tasks (project_id, description, status, created_at)
+        SELECT i.project_id, i.description, COALESCE(i.status, 'Pendiente'),
+               COALESCE(datetime(i.created_at), CURRENT_TIMESTAMP)
+        FROM temp.atlas_import i
+        WHERE i.description IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM temp.atlas_existentes e
+                          WHERE e.project_id = i.project_id AND e.description = i.description)
+        ORDER BY i.linea
+    """).rowcount
+
+    conn.execute("DROP TABLE temp.atlas_existentes")
+    conn.execute("DROP TABLE temp.atlas_import")
+    return {"filas": total, "proyectos": proyectos, "tareas_creadas": creadas, "tareas_actualizadas": actualizadas}
+
+
+# --- 8. Repositorio ---
+
+class SqliteRepository(Repository):
+    name = "sqlite"
+
+    def __init__(self, path: str = SQLITE_PATH, workers: int = DB_EXECUTOR_WORKERS):
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="atlas-sqlite")
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self._transactions = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        """Conexión del hilo actual (sqlite3 no permite compartir una conexión entre hilos)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            with span("db.connect", backend=self.name):
+                # isolation_level=None: las transacciones se abren explícitamente con BEGIN
+                conn = sqlite3.connect(self.path, isolation_level=None, factory=_TracingConnection,
+                                       cached_statements=SQLITE_STATEMENT_CACHE, check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute("PRAGMA foreign_keys=ON")
+                conn.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def _transaction(self, func, write, *args):
+        conn = self._connection()
+        with span("db.transaction", function=func.__name__, backend=self.name):
+            conn.execute("BEGIN IMMEDIATE" if write else "BEGIN")
+            try:
+                result = func(conn, *args)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        with self._lock:
+            self._transactions += 1
+        return result
+
+    async def _run(self, func, *args, write=True):
+        return await run_db_call(self._executor, self._transaction, func, write, *args)
+
+    def initialize(self) -> list[int]:
+        conn = self._connection()
+        applied = []
+        current = conn.execute("PRAGMA user_version").fetchone()[0]
+        for number, description, steps in SQLITE_MIGRATIONS:
+            if number <= current:
+                continue
+            start = time.perf_counter()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for statement in steps:
+                    conn.execute(statement)
+                # PRAGMA no admite parámetros; el número viene de la lista de migraciones
+                conn.execute(f"PRAGMA user_version = {int(number)}")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            print(f"🛠️ Migración SQLite {number} aplicada en {(time.perf_counter() - start) * 1000:.1f} ms: {description}")
+            applied.append(number)
+        return applied
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"backend": self.name, "path": self.path, "connections": len(self._connections),
+                    "transactions": self._transactions}
+
+    async def crear_tarea(self, project_id, description):
+        return await self._run(_insertar_tarea, project_id, description)
+
+    async def actualizar_estado(self, tarea_id, nuevo_estado):
+        return await self._run(_actualizar_estado, tarea_id, nuevo_estado)
+
+    async def crear_recordatorio(self, description):
+        return await self._run(_insertar_recordatorio, description)
+
+    async def borrar_tarea(self, tarea_id):
+        return await self._run(_borrar_tarea, tarea_id)
+
+    async def actualizar_estados(self, nuevo_estado, tarea_ids, project_id, estado_actual):
+        return await self._run(_actualizar_estados, nuevo_estado, tarea_ids, project_id, estado_actual)
+
+    async def borrar_tareas(self, tarea_ids, project_id, estado_actual):
+        return await self._run(_borrar_tareas, tarea_ids, project_id, estado_actual)
+
+    async def listar_tareas(self, project_name, status, after_id=None, page_size=10):
+        return await self._run(_consultar_tareas, project_name, status, after_id, page_size, write=False)
+
+    async def buscar_tareas(self, consulta, project_name=None, status=None, cursor=None, page_size=10):
+        return await self._run(_buscar_tareas, consulta, project_name, status, cursor, page_size, write=False)
+
+    async def mover_tareas(self, tarea_ids, project_id):
+        return await self._run(_mover_tareas, tarea_ids, project_id)
+
+    async def crear_proyecto_y_tareas(self, nombre_proyecto, tareas):
+        return await self._run(_insertar_proyecto_y_tareas, nombre_proyecto, tareas)
+
+    async def borrar_proyecto(self, proyecto_id):
+        return await self._run(_borrar_proyecto, proyecto_id)
+
+    async def listar_proyectos(self, nombre, after_id=None, page_size=50):
+        return await self._run(_consultar_proyectos, nombre, after_id, page_size, write=False)
+
+    async def proyectos_similares(self, nombre, limite=5):
+        return await self._run(_proyectos_similares, nombre, limite, write=False)
+
+    async def resumen_proyectos(self, nombre=None, estado=None, after_id=None, page_size=50):
+        return await self._run(_resumen_proyectos, nombre, estado, after_id, page_size, write=False)
+
+    async def ejecutar_plan(self, pasos):
+        return await self._run(ejecutar_pasos, pasos, FUNCIONES_PLAN)
+
+    async def exportar(self, escribir, project_name=None, lote=EXPORT_BATCH_SIZE):
+        return await self._run(_exportar, escribir, project_name, lote, write=False)
+
+    async def importar(self, filas):
+        return await self._run(_importar, filas)
@@ -0,0 +1,102 @@
+# ATLAS/atlas_server/results.py
+
+"""
+Resultados estructurados de las herramientas de consulta y su presentación.
+
+Las herramientas de listado devuelven un dict serializable en JSON en lugar de texto
+ya redactado:
+
+    {"status": "ok" | "empty" | "error", "title": str, "columns": [str, ...],
+     "rows": [[celda, ...], ...], "next": {"after_id": 12} | None, "message": str | None}
+
+Las celdas son valores JSON (int, float, str o None) o un dict {clave: número}, como
+las tareas por estado. `next` son los argumentos que piden la página siguiente. Quien
+recibe el resultado elige cómo presentarlo con render():
+
+  - 'tsv': cabecera y filas separadas por tabuladores, para el LLM. Es el texto que
+    se reenvía en cada llamada posterior, así que repite lo mínimo.
+  - 'json': el propio dict compacto, para programas.
+  - 'text': tabla alineada con emojis, para el terminal.
+
+Solo depende de la biblioteca estándar: el cliente lo importa sin pydantic ni psycopg2.
+"""
+
+import json
+
+FORMATS = ("tsv", "json", "text")
+
+STATUS_OK = "ok"
+STATUS_EMPTY = "empty"
+STATUS_ERROR = "error"
+
+
+# --- 1. Construcción ---
+
+def tabla(titulo: str, columnas, filas, siguiente: dict | None = None, vacio: str = "No se encontraron resultados.") -> dict:
+    """Resultado tabular; sin filas su estado es 'empty' y `vacio` es el mensaje."""
+    filas = [list(fila) for fila in filas]
+    return {
+        "status": STATUS_OK if filas else STATUS_EMPTY,
+        "title": titulo,
+        "columns": list(columnas),
+        "rows": filas,
+        "next": siguiente,
+        "message": None if filas else vacio,
+    }
+
+def error(mensaje: str) -> dict:
+    return {"status": STATUS_ERROR, "title": None, "columns": [], "rows": [], "next": None, "message": mensaje}
+
+def es_tabla(result) -> bool:
+    return isinstance(result, dict) and "status" in result and "rows" in result
+
+def es_error(result) -> bool:
+    """Fallo de una herramienta, tanto estructurado como en texto ('❌ ...')."""
+    if isinstance(result, str):
+        return result.startswith("❌")
+    return es_tabla(result) and result["status"] == STATUS_ERROR
+
+
+# --- 2. Presentación ---
+
+def _celda(valor, separador=", ", asignacion=": ") -> str:
+    if valor is None:
+        return ""
+    if isinstance(valor, dict):
+        return separador.join(f"{clave}{asignacion}{numero}" for clave, numero in valor.items())
+    # Una celda nunca parte la fila ni la columna
+    return " ".join(str(valor).split())
+
+def _siguiente(siguiente: dict) -> str:
+    return ", ".join(f"{nombre}={json.dumps(valor, ensure_ascii=False)}" for nombre, valor in siguiente.items())
+
+def _tsv(result: dict) -> str:
+    lineas = [f"{result['title']}: {len(result['rows'])}", "\t".join(result["columns"])]
+    lineas.extend("\t".join(_celda(valor, ",", "=") for valor in fila) for fila in result["rows"])
+    if result["next"]:
+        lineas.append(f"siguiente página: {_siguiente(result['next'])}")
+    return "\n".join(lineas)
+
+def _text(result: dict) -> str:
+    celdas = [[_celda(valor) for valor in fila] for fila in [result["columns"]] + result["rows"]]
+    anchos = [max(len(fila[i]) for fila in celdas) for i in range(len(result["columns"]))]
+    lineas = [f"--- {len(result['rows'])} {result['title']} ---"]
+    for fila in celdas:
+        lineas.append("  ".join(valor.ljust(ancho) for valor, ancho in zip(fila, anchos)).rstrip())
+    if result["next"]:
+        lineas.append(f"➡️ Hay más resultados. Para la siguiente página usa {_siguiente(result['next'])}.")
+    return "\n".join(lineas)
+
+def render(result, formato: str = "tsv") -> str:
+    """Texto del resultado de una herramienta en el formato indicado (ver FORMATS)."""
+    if isinstance(result, str):
+        return result.strip()
+    if not es_tabla(result):
+        return json.dumps(result, ensure_ascii=False)
+    if formato == "json":
+        return json.dumps(result, ensure_ascii=False, separators=(",", ":"))
+    if result["status"] == STATUS_ERROR:
+        return f"❌ {result['message']}"
+    if result["status"] == STATUS_EMPTY:
+        return f"✅ {result['message']}"
+    return _text(result) if formato == "text" else _tsv(result)
@@ -1,52 +1,388 @@
 # atlas_server/server.py
 
+import os
 import sys
 import json
+import time
+import signal
 import asyncio
-# Importamos la clase Server y el tipo Tool, pero eliminamos stdio_server
-from mcp.server import Server 
-from mcp.types import Tool
-# Importamos todas las funciones de herramientas
-from tools import crear_tarea, actualizar_estado_tarea, crear_recordatorio, crear_proyecto_y_tareas, listar_tareas, listar_proyectos, eliminar_tarea, eliminar_proyecto 
+import itertools
+import contextlib
+
+# Como script (python atlas_server/server.py) sys.path empieza por atlas_server/: se cambia
+# por la raíz del proyecto para que cada módulo se cargue una sola vez, como atlas_server.*
+if not __package__:
+    _SERVER_DIR = os.path.dirname(os.path.abspath(__file__))
+    sys.path[:] = [path for path in sys.path if os.path.abspath(path or os.curdir) != _SERVER_DIR]
+    sys.path.insert(0, os.path.dirname(_SERVER_DIR))
+
+# Importamos el registro de herramientas (la librería 'mcp' solo se carga si se pide el servidor MCP)
+from atlas_server.db_connector import DB_TIMINGS
+from atlas_server.repository import get_repository
+from atlas_server.project_index import get_project_index
+from atlas_server.cache import ResultCache, ChangeListener, CACHE_LISTEN
+from atlas_server.manifest import describe_tool
+from atlas_server.results import es_error
+from atlas_server import metrics, tracing
+from atlas_server.tools import TOOL_REGISTRY, validate_arguments, initialize_db_schema
 
 # Lista que contiene todas las funciones de las herramientas
-ALL_TOOLS = [crear_tarea, actualizar_estado_tarea, crear_recordatorio, crear_proyecto_y_tareas, listar_tareas, listar_proyectos, eliminar_tarea, eliminar_proyecto]
+ALL_TOOLS = list(TOOL_REGISTRY.values())
 
-# Inicialización del servidor MCP
-atlas_server = Server(name="ATLAS_MCP_Server")
+# Caché de resultados de las herramientas de solo lectura (ver atlas_server/cache.py)
+result_cache = ResultCache()
 
 # --- REGISTRO DE MANEJADORES DE HERRAMIENTAS ---
 
-@atlas_server.list_tools()
-async def list_available_tools() -> list[Tool]:
+async def list_available_tools() -> list:
     """
     Manejador para ListToolsRequest (aunque no se usa en este flujo manual).
     """
+    from mcp.types import Tool
+
     return [
         Tool(
-            name=func.tool_name, 
-            description=func.tool_description, 
-            inputSchema=func.input_schema
+            name=description["name"],
+            description=description["description"],
+            inputSchema=description["parameters"]
         )
-        for func in ALL_TOOLS
+        for description in map(describe_tool, ALL_TOOLS)
     ]
 
-@atlas_server.call_tool()
 async def execute_tool_call(tool_name: str, arguments: dict) -> dict | str:
     """
     Ejecuta la función de herramienta solicitada.
     """
     # Buscamos la función de la herramienta por su nombre
-    tool_func = next((f for f in ALL_TOOLS if f.tool_name == tool_name), None)
+    tool_func = TOOL_REGISTRY.get(tool_name)
     
     if tool_func is None:
         # En este flujo, el cliente ya debería haber verificado el nombre.
         raise ValueError(f"Tool '{tool_name}' not found.")
+
+    # Validamos y convertimos los argumentos con el modelo Pydantic de la herramienta
+    arguments = validate_arguments(tool_func, arguments)
     
-    # Ejecutamos la función con los argumentos desempaquetados
-    return await tool_func(**arguments)
+    # Herramientas de solo lectura: se sirven desde la caché mientras no cambien sus tablas
+    if tool_func.reads and not tool_func.writes:
+        key = ResultCache.make_key(tool_func, arguments)
+        cached = result_cache.get(key)
+        if cached is not None:
+            return cached
+        generation = result_cache.generation(tool_func.reads)
+        result = await tool_func(**arguments)
+        if not es_error(result):
+            result_cache.put(key, result, tool_func.reads, generation)
+        return result
 
-if __name__ == '__main__':
+    try:
+        # Ejecutamos la función con los argumentos desempaquetados
+        return await tool_func(**arguments)
+    finally:
+        # Cualquier escritura invalida las lecturas cacheadas de las tablas que modifica
+        if tool_func.writes:
+            result_cache.invalidate(tool_func.writes)
+
+def create_mcp_server():
+    """
+    Construye el servidor MCP con sus manejadores registrados. La librería 'mcp' es
+    costosa de importar y los modos de E/S manual no la necesitan, así que solo se
+    carga aquí.
+    """
+    # Importamos la clase Server, pero eliminamos stdio_server
+    from mcp.server import Server
+
+    # Inicialización del servidor MCP
+    atlas_server = Server(name="ATLAS_MCP_Server")
+    atlas_server.list_tools()(list_available_tools)
+    atlas_server.call_tool()(execute_tool_call)
+    return atlas_server
+
+# --- MODO PERSISTENTE (JSON delimitado por líneas) ---
+
+async def handle_request(message: dict, session=None) -> dict:
+    """
+    Procesa una petición del protocolo persistente y construye su respuesta.
+    La respuesta siempre lleva el mismo 'id' que la petición para que el
+    cliente pueda correlacionarlas aunque lleguen en otro orden, y un campo
+    'timing' con el tiempo total en el servidor y el pasado en la base de datos.
+    `session` es la sesión TCP de origen (None en el modo por STDIN).
+    """
+    request_id = message.get("id")
+    function_name = message.get("function")
+    arguments = message.get("arguments") or {}
+
+    # Mensajes de control (no son llamadas a herramientas)
+    if message.get("control") == "stats":
+        result = {"cache": result_cache.stats(), "pool": get_repository().stats(),
+                  "project_index": get_project_index().stats()}
+        if session is not None:
+            result["session"] = session.stats()
+        return {"id": request_id, "result": result}
+    if message.get("control") == "metrics":
+        return {"id": request_id, "result": metrics.render()}
+
+    if not function_name:
+        return {"id": request_id, "error": "Comando JSON inválido: falta 'function'."}
+
+    # Cada petición se procesa en su propia tarea, así que los tiempos de BD no se mezclan
+    db_timings = []
+    DB_TIMINGS.set(db_timings)
+    start = time.perf_counter()
+    # El span cuelga del span de la llamada en el cliente (campo 'trace', formato traceparent)
+    attributes = {"tool": function_name}
+    if session is not None:
+        attributes["session"] = session.id
+    with tracing.span("mcp.request", traceparent=message.get("trace"), **attributes) as current:
+        try:
+            response = {"id": request_id, "result": await execute_tool_call(function_name, arguments)}
+            failed = es_error(response["result"])
+        except Exception as e:
+            response = {"id": request_id, "error": f"{type(e).__name__}: {e}"}
+            failed = True
+        current.status = "error" if failed else "ok"
+    elapsed = time.perf_counter() - start
+    metrics.TOOL_CALLS.inc(tool=function_name, status="error" if failed else "ok")
+    metrics.TOOL_DURATION.observe(elapsed, tool=function_name)
+    response["timing"] = {
+        "server_ms": round(elapsed * 1000, 3),
+        "db_ms": round(sum(db_timings), 3),
+    }
+    return response
+
+async def serve_persistent(reader=None, writer=None):
+    """
+    Bucle del servidor persistente: lee peticiones JSON (una por línea) de STDIN
+    y escribe cada respuesta como una línea JSON en STDOUT. Las peticiones se
+    ejecutan como tareas independientes, por lo que una herramienta lenta no
+    bloquea la lectura de las siguientes. Termina cuando STDIN se cierra.
+    """
+    reader = reader or sys.stdin
+    writer = writer or sys.stdout
+    loop = asyncio.get_running_loop()
+    in_flight = set()
+
+    def write_response(response: dict):
+        writer.write(json.dumps(response) + "\n")
+        writer.flush()
+
+    async def process(message: dict):
+        write_response(await handle_request(message))
+
+    while True:
+        line = await loop.run_in_executor(None, reader.readline)
+        if not line:
+            break
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            message = json.loads(line)
+        except json.JSONDecodeError as e:
+            write_response({"id": None, "error": f"No se pudo decodificar el JSON de entrada. Detalle: {e}"})
+            continue
+
+        task = asyncio.create_task(process(message))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+
+    # STDIN cerrado: terminamos las peticiones en curso antes de salir
+    if in_flight:
+        await asyncio.gather(*in_flight, return_exceptions=True)
+
+# --- MODO RED (TCP, varias sesiones) ---
+# Mismo protocolo que el modo persistente (JSON delimitado por líneas), pero cada
+# conexión es una sesión independiente servida por el mismo proceso: todas comparten
+# el registro de herramientas, la caché y los recursos de base de datos.
+
+TCP_ADDRESS = os.getenv("ATLAS_TCP_ADDRESS", "127.0.0.1:7410")
+# Peticiones en vuelo por sesión: al alcanzarse, se deja de leer de esa conexión
+# (el control de flujo de TCP frena al cliente sin afectar a las demás sesiones)
+SESSION_MAX_IN_FLIGHT = int(os.getenv("ATLAS_SESSION_MAX_IN_FLIGHT", "8"))
+MAX_SESSIONS = int(os.getenv("ATLAS_MAX_SESSIONS", "256"))
+# Segundos que el cierre ordenado espera a las peticiones en curso antes de cancelarlas
+SHUTDOWN_GRACE = float(os.getenv("ATLAS_SHUTDOWN_GRACE", "10"))
+# Tamaño máximo de una línea de petición
+MAX_LINE_BYTES = 1024 * 1024
+
+
+def parse_address(address: str) -> tuple[str, int]:
+    """'host:puerto' (o solo ':puerto') -> (host, puerto)."""
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+class Session:
+    """
+    Una conexión de cliente. Sus peticiones se ejecutan como tareas independientes
+    (como en el modo persistente) y sus respuestas solo se escriben en su socket, así
+    que los 'id' de cada sesión son independientes de los de las demás.
+    """
+
+    def __init__(self, session_id: int, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.id = session_id
+        self.reader = reader
+        self.writer = writer
+        self.peer = writer.get_extra_info("peername")
+        self.requests = 0
+        self.in_flight: set[asyncio.Task] = set()
+        self.closing = False
+        self._slots = asyncio.Semaphore(SESSION_MAX_IN_FLIGHT)
+        self._write_lock = asyncio.Lock()
+        self._reader_task: asyncio.Task | None = None
+
+    async def send(self, response: dict):
+        data = (json.dumps(response) + "\n").encode()
+        async with self._write_lock:
+            self.writer.write(data)
+            # Si el cliente no lee sus respuestas, solo se frena esta sesión
+            await self.writer.drain()
+
+    async def _process(self, message: dict):
+        try:
+            await self.send(await handle_request(message, session=self))
+        except ConnectionError:
+            pass  # El cliente se desconectó antes de recibir la respuesta
+        finally:
+            self._slots.release()
+
+    async def _read_requests(self):
+        while True:
+            await self._slots.acquire()
+            try:
+                line = await self.reader.readline()
+            except ValueError:
+                self._slots.release()
+                await self.send({"id": None, "error": f"Petición demasiado larga (máximo {MAX_LINE_BYTES} bytes)."})
+                return
+            except ConnectionError:
+                self._slots.release()
+                return
+            if not line:
+                self._slots.release()
+                return
+            line = line.strip()
+            if not line:
+                self._slots.release()
+                continue
+
+            try:
+                message = json.loads(line)
+            except json.JSONDecodeError as e:
+                self._slots.release()
+                await self.send({"id": None, "error": f"No se pudo decodificar el JSON de entrada. Detalle: {e}"})
+                continue
+
+            self.requests += 1
+            task = asyncio.create_task(self._process(message))
+            self.in_flight.add(task)
+            task.add_done_callback(self.in_flight.discard)
+
+    async def serve(self):
+        """Lee peticiones hasta que el cliente cierra la conexión y espera a las que están en curso."""
+        self._reader_task = asyncio.create_task(self._read_requests())
+        try:
+            await self._reader_task
+        except asyncio.CancelledError:
+            # stop_reading(): se deja de leer, pero las peticiones aceptadas se responden
+            if not self.closing:
+                raise
+        except ConnectionError:
+            pass
+        if self.in_flight:
+            await asyncio.gather(*self.in_flight, return_exceptions=True)
+
+    def stop_reading(self):
+        self.closing = True
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+
+    def stats(self) -> dict:
+        return {"id": self.id, "requests": self.requests, "in_flight": len(self.in_flight)}
+
+
+class TCPServer:
+    """Acepta conexiones y crea una Session por cada una, con un máximo de MAX_SESSIONS."""
+
+    def __init__(self, host: str, port: int, max_sessions: int = MAX_SESSIONS):
+        self.host = host
+        self.port = port
+        self.max_sessions = max_sessions
+        self.sessions: dict[int, tuple[Session, asyncio.Task]] = {}
+        self._ids = itertools.count(1)
+        self._server: asyncio.AbstractServer | None = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._accept, self.host, self.port, limit=MAX_LINE_BYTES)
+        # Con el puerto 0 el sistema asigna uno libre
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def _accept(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        if len(self.sessions) >= self.max_sessions:
+            metrics.TCP_REJECTED.inc()
+            writer.write((json.dumps({"id": None, "error": "Servidor ocupado: se alcanzó el máximo de sesiones."}) + "\n").encode())
+            with contextlib.suppress(ConnectionError):
+                await writer.drain()
+            writer.close()
+            return
+
+        session = Session(next(self._ids), reader, writer)
+        self.sessions[session.id] = (session, asyncio.current_task())
+        metrics.TCP_SESSIONS.inc()
+        try:
+            await session.serve()
+        finally:
+            del self.sessions[session.id]
+            metrics.TCP_SESSIONS.dec()
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def shutdown(self, grace: float = SHUTDOWN_GRACE):
+        """
+        Cierre ordenado: deja de aceptar conexiones y de leer peticiones nuevas, espera
+        hasta `grace` segundos a que terminen las que están en curso y cancela el resto.
+        """
+        self._server.close()
+        sessions = list(self.sessions.values())
+        for session, _ in sessions:
+            session.stop_reading()
+        tasks = [task for _, task in sessions]
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=grace)
+            for session, task in sessions:
+                if task in pending:
+                    for request in session.in_flight:
+                        request.cancel()
+                    task.cancel()
+            if pending:
+                print(f"⚠️ {len(pending)} sesiones no terminaron en {grace:g}s; se cancelaron sus peticiones.")
+                await asyncio.gather(*pending, return_exceptions=True)
+        await self._server.wait_closed()
+
+    def stats(self) -> dict:
+        return {"sessions": len(self.sessions), "max_sessions": self.max_sessions}
+
+
+async def serve_tcp(address: str = TCP_ADDRESS):
+    """Sirve el protocolo por TCP hasta recibir SIGINT o SIGTERM, y entonces cierra ordenadamente."""
+    host, port = parse_address(address)
+    server = TCPServer(host, port)
+    await server.start()
+    print(f"🌐 Servidor MCP escuchando en {server.host}:{server.port} (máximo {server.max_sessions} sesiones).", flush=True)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+    await stop.wait()
+
+    print("🛑 Cerrando el Servidor MCP: se terminan las peticiones en curso...", flush=True)
+    await server.shutdown()
+
+def run_once():
+    """Modo clásico: procesa un único comando JSON leído de STDIN y termina."""
     # --- MANEJO MANUAL DE I/O PARA EVITAR ERRORES DE LIBRERÍA ---
     try:
         # 1. Leer el comando JSON completo de la entrada estándar (STDIN)
@@ -85,4 +421,44 @@ if __name__ == '__main__':
     except Exception as e:
         # Captura cualquier otro error durante la ejecución (incluidos errores de la BD)
         print(f"❌ Error del Servidor MCP durante la ejecución: {type(e).__name__}: {e}")
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
+
+def run_server(main):
+    """Arranque común de los modos de larga duración (persistente y TCP)."""
+    tracing.set_service("server")
+    # Métricas en formato Prometheus en http://127.0.0.1:<ATLAS_METRICS_PORT>/metrics
+    metrics_server = metrics.start_metrics_server()
+    # El servidor aplica las migraciones pendientes al arrancar
+    initialize_db_schema()
+    # Las escrituras de otros procesos llegan por LISTEN/NOTIFY e invalidan la caché
+    # (solo PostgreSQL; con SQLite la caché solo se invalida con las escrituras propias)
+    listener = (ChangeListener(result_cache, extra_caches=(get_project_index(),))
+                if CACHE_LISTEN and get_repository().supports_notify else None)
+    if listener:
+        listener.start()
+    try:
+        asyncio.run(main)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if listener:
+            listener.stop()
+        if metrics_server:
+            metrics_server.shutdown()
+        get_repository().close()
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    if "--persistent" in args:
+        # El protocolo usa STDOUT en exclusiva: cualquier print() de las
+        # herramientas o del conector de BD se redirige a STDERR.
+        protocol_stdout = sys.stdout
+        sys.stdout = sys.stderr
+        run_server(serve_persistent(sys.stdin, protocol_stdout))
+    elif "--tcp" in args:
+        # Dirección opcional tras --tcp ('host:puerto'); por defecto, ATLAS_TCP_ADDRESS
+        index = args.index("--tcp") + 1
+        address = args[index] if index < len(args) and not args[index].startswith("--") else TCP_ADDRESS
+        run_server(serve_tcp(address))
+    else:
+        run_once()
@@ -1,6 +1,11 @@
 # test_connection.py (En la carpeta de tu Agente ATLAS)
 
-from db_connector import get_db_connection
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from atlas_server.db_connector import get_db_connection
 
 def test_db_read():
     try:
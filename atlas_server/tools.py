@@ -1,74 +1,75 @@
 # ATLAS/atlas_server/tools.py
 
-from atlas_server.db_connector import get_db_connection
-from pydantic import BaseModel, Field
-import json, datetime
+from atlas_server.repository import get_repository, DuplicateNameError, PlanStepError, PROYECTO_RECORDATORIOS, es_referencia
+from atlas_server.project_index import get_project_index, normalizar_nombre, ProjectNotFoundError, AmbiguousProjectError
+from atlas_server.results import tabla, error
+from pydantic import BaseModel, Field, ValidationError, model_validator
+from typing import Any, Literal
+import re, time
 
-def tool(name, description, pydantic_class):
+# Registro de herramientas por nombre (búsqueda O(1)); lo rellena el decorador @tool
+TOOL_REGISTRY: dict = {}
+
+def tool(name, description, pydantic_class, reads=(), writes=(), direct_return=False):
     """
-    Decorador personalizado que adjunta el esquema JSON de Pydantic
-    a la función para que el cliente lo lea directamente.
+    Decorador personalizado que adjunta a la función sus metadatos y su modelo
+    Pydantic de entrada, y la registra en TOOL_REGISTRY. El esquema JSON se genera
+    bajo demanda (ver atlas_server/manifest.py), no al importar el módulo.
+
+    `reads` y `writes` declaran las tablas que la herramienta consulta o modifica;
+    el servidor los usa para cachear las lecturas e invalidarlas tras cada escritura.
+
+    `direct_return=True` indica que el resultado ya es la respuesta final para el
+    usuario: el cliente lo muestra tal cual y se ahorra la segunda llamada al LLM.
     """
     def decorator(func):
-        # Almacenar los metadatos y el esquema en la propia función
+        # Almacenar los metadatos y el modelo de entrada en la propia función
         func.tool_name = name
         func.tool_description = description
-        
-        # Almacenar el esquema Pydantic v2 para que el cliente lo lea
-        func.input_schema = pydantic_class.model_json_schema(by_alias=True)
+        func.reads = frozenset(reads)
+        func.writes = frozenset(writes)
+        func.direct_return = direct_return
+        func.input_model = pydantic_class
+        TOOL_REGISTRY[name] = func
         return func
     return decorator
 
+def _detalles_validacion(e: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(map(str, err['loc'])) or 'argumentos'}: {err['msg']}" for err in e.errors()
+    )
+
+def validate_arguments(func, arguments: dict) -> dict:
+    """
+    Valida los argumentos contra el modelo Pydantic de la herramienta y devuelve
+    solo los campos indicados, ya convertidos a su tipo (los extra se descartan).
+    """
+    try:
+        model = func.input_model.model_validate(arguments)
+    except ValidationError as e:
+        raise ValueError(f"Argumentos inválidos para '{func.tool_name}': {_detalles_validacion(e)}") from None
+    return model.model_dump(exclude_unset=True)
+
 # ----------------------------------------------------
 # 0. INICIALIZACIÓN DE LA BASE DE DATOS 
 # ----------------------------------------------------
 
 def initialize_db_schema():
-    """Crea las tablas 'projects' y 'tasks' con el esquema simplificado si no existen."""
-    conn = get_db_connection()
-    if conn is None:
-        print("❌ ERROR: La inicialización de la base de datos falló al obtener la conexión.")
-        return
-        
-    cursor = None
-    
+    """Aplica las migraciones pendientes del esquema del backend activo (no hace nada si ya está al día)."""
+    repository = get_repository()
     try:
-        cursor = conn.cursor()
-        
-        # Tabla de proyectos
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS projects (
-                id SERIAL PRIMARY KEY,
-                name VARCHAR(255) UNIQUE NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-        """)
-        
-        # Tabla de tareas (ESQUEMA SIMPLIFICADO: SIN assigned_to ni due_date)
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS tasks (
-                id SERIAL PRIMARY KEY,
-                project_id INTEGER NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
-                description VARCHAR(255) NOT NULL,
-                status VARCHAR(50) DEFAULT 'Pendiente',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-        """)
-        
-        conn.commit()
-        print("✅ Conexión a base de datos exitosa.")
-        
+        applied = repository.initialize()
+        if applied:
+            print(f"🛠️ Migraciones de esquema aplicadas: {', '.join(map(str, applied))} (backend: {repository.name}).")
+        print(f"✅ Conexión a base de datos exitosa ({repository.name}).")
+
     except Exception as e:
         print(f"❌ ADVERTENCIA: No se pudo inicializar el esquema de la base de datos. Las herramientas podrían fallar. Error: {e}")
-        
-    finally:
-        if cursor: cursor.close()
-        if conn: conn.close()
 
 
 # --- CLASES PYDANTIC ---
 class CrearTareaInput(BaseModel):
-    project_id: int = Field(..., description="El ID numérico del proyecto al que se debe asignar la tarea.")
+    project_id: int | str = Field(..., description="El ID numérico o el nombre del proyecto al que se debe asignar la tarea.")
     description: str = Field(..., description="El título conciso de la nueva tarea a crear.")
 
 class ActualizarEstadoInput(BaseModel):
@@ -83,312 +84,584 @@ class CrearProyectoYTareasInput(BaseModel):
     lista_tareas: str = Field(..., description="Cadena de texto con todas las tareas separadas por comas, saltos de línea o guiones.")
 
 class ListarTareasInput(BaseModel):
-    project_name: str = Field(None, description="Filtra por nombre del proyecto (búsqueda parcial).")
-    status: str = Field(None, description="Filtra por estado de la tarea (ej. 'Pendiente', 'Hecha').")
+    project_name: str | None = Field(None, description="Filtra por nombre del proyecto (búsqueda parcial).")
+    status: str | None = Field(None, description="Filtra por estado de la tarea (ej. 'Pendiente', 'Hecha').")
+    after_id: int | None = Field(None, description="Para paginar: devuelve solo tareas con ID mayor que este (usa el valor indicado al final de la página anterior).")
+    page_size: int = Field(10, description="Número máximo de tareas por página (máximo 100).")
+
+class BuscarTareasInput(BaseModel):
+    consulta: str = Field(..., min_length=1, description="Palabras a buscar en la descripción de las tareas. Admite frases entre comillas, 'or' y '-palabra' para excluir.")
+    project_name: str | None = Field(None, description="Filtra por nombre del proyecto (búsqueda parcial).")
+    status: str | None = Field(None, description="Filtra por estado de la tarea (ej. 'Pendiente', 'Hecha').")
+    cursor: str | None = Field(None, description="Para paginar: el valor de cursor indicado al final de la página anterior.")
+    page_size: int = Field(10, description="Número máximo de tareas por página (máximo 100).")
 
 class ListarProyectosInput(BaseModel):
-    nombre: str = Field(None, description="Filtra proyectos por nombre (búsqueda parcial).")
+    nombre: str | None = Field(None, description="Filtra proyectos por nombre (búsqueda parcial).")
+    after_id: int | None = Field(None, description="Para paginar: devuelve solo proyectos con ID mayor que este (usa el valor indicado al final de la página anterior).")
+    page_size: int = Field(50, description="Número máximo de proyectos por página (máximo 100).")
+
+class ResumenProyectosInput(BaseModel):
+    nombre: str | None = Field(None, description="Filtra proyectos por nombre (búsqueda parcial).")
+    estado: str | None = Field(None, description="Solo proyectos con alguna tarea en este estado (ej. 'Bloqueada').")
+    after_id: int | None = Field(None, description="Para paginar: devuelve solo proyectos con ID mayor que este (usa el valor indicado al final de la página anterior).")
+    page_size: int = Field(50, description="Número máximo de proyectos por página (máximo 100).")
 
 class EliminarTareaInput(BaseModel):
     tarea_id: int = Field(..., description="El ID numérico de la tarea a eliminar.")
 
 class EliminarProyectoInput(BaseModel):
-    proyecto_id: int = Field(...,description="El ID del proyecto a eliminar.")
+    proyecto_id: int | str = Field(..., description="El ID o el nombre exacto del proyecto a eliminar.")
+
+# Máximo de IDs explícitos en una operación por lotes
+MAX_BATCH_IDS = 1000
+
+class SeleccionTareasInput(BaseModel):
+    """Selección de tareas para las operaciones por lotes: lista de IDs y/o filtro."""
+    tarea_ids: list[int] | None = Field(None, max_length=MAX_BATCH_IDS, description="Lista de IDs de tareas a modificar.")
+    project_id: int | str | None = Field(None, description="Filtra por el ID o el nombre del proyecto (todas sus tareas, o las de tarea_ids que pertenezcan a él).")
+    estado_actual: str | None = Field(None, description="Filtra por el estado actual exacto de la tarea (ej. 'Pendiente').")
+
+    @model_validator(mode="after")
+    def _requiere_seleccion(self):
+        # Sin IDs ni filtro la operación afectaría a todas las tareas: no se permite
+        if not self.tarea_ids and self.project_id is None and not self.estado_actual:
+            raise ValueError("indica tarea_ids o al menos un filtro (project_id, estado_actual)")
+        return self
+
+class ActualizarEstadoTareasInput(SeleccionTareasInput):
+    nuevo_estado: str = Field(..., description="El nuevo estado para todas las tareas seleccionadas, ej.: 'En Progreso', 'Hecha', 'Bloqueada'.")
+
+class EliminarTareasInput(SeleccionTareasInput):
+    pass
+
+class MoverTareasInput(BaseModel):
+    tarea_ids: list[int] = Field(..., min_length=1, max_length=MAX_BATCH_IDS, description="Lista de IDs de las tareas a mover.")
+    project_id: int | str = Field(..., description="El ID o el nombre del proyecto de destino.")
+
+# Máximo de pasos de un plan
+MAX_PASOS_PLAN = 50
+
+class PasoPlan(BaseModel):
+    operacion: Literal[
+        "crear_tarea", "actualizar_estado_tarea", "crear_recordatorio", "crear_proyecto_y_tareas",
+        "eliminar_tarea", "actualizar_estado_tareas", "eliminar_tareas", "mover_tareas", "eliminar_proyecto",
+    ] = Field(..., description="Herramienta que ejecuta este paso.")
+    argumentos: dict[str, Any] = Field(default_factory=dict, description="Argumentos de la herramienta, los mismos que en su llamada individual. '$N' es el ID creado o afectado por el paso N (p. ej. project_id='$1'); '$N.tareas' son los IDs de las tareas del paso N (p. ej. tarea_ids=['$1.tareas']).")
+
+class EjecutarPlanInput(BaseModel):
+    pasos: list[PasoPlan] = Field(..., min_length=1, max_length=MAX_PASOS_PLAN, description="Operaciones a ejecutar en orden (numeradas desde 1).")
+
+
+# --- RESOLUCIÓN DE PROYECTOS ---
+# Las herramientas que modifican datos aceptan el ID o el nombre del proyecto; el
+# nombre se resuelve en memoria con el índice de proyectos (atlas_server/project_index.py).
+
+def _error_proyecto(e: LookupError) -> str:
+    """Mensaje de error con los candidatos, para que el LLM pueda reintentar con el ID."""
+    candidatos = ", ".join(f"ID {project_id} ('{name}')" for project_id, name in e.candidates)
+    if isinstance(e, AmbiguousProjectError):
+        return f"❌ Error: '{e.reference}' corresponde a varios proyectos: {candidatos}. Indica el ID del proyecto."
+    if candidatos:
+        return f"❌ Error: No existe el proyecto '{e.reference}'. ¿Quisiste decir {candidatos}?"
+    return f"❌ Error: No existe ningún proyecto llamado '{e.reference}'."
+
+def _describir_proyecto(project_id, name):
+    return f"'{name}' (ID {project_id})" if name else f"ID {project_id}"
 
 
 # --- HERRAMIENTAS ATLAS ---
+# Cada herramienta delega el acceso a datos en el repositorio activo (PostgreSQL o
+# SQLite, ver atlas_server/repository.py), que ejecuta cada operación en una
+# transacción sin bloquear el bucle de eventos; la corrutina solo formatea la respuesta.
 
 @tool(
     name="crear_tarea",
-    description="Crea una tarea individual con un título en un proyecto específico. Requiere el ID del proyecto. (Omite asignación y vencimiento).",
-    pydantic_class=CrearTareaInput
+    description="Crea una tarea individual con un título en un proyecto específico, indicado por su ID o su nombre. (Omite asignación y vencimiento).",
+    pydantic_class=CrearTareaInput,
+    writes=("tasks",),
+    direct_return=True
 )
-async def crear_tarea(project_id: int, description: str) -> str:
+async def crear_tarea(project_id: int | str, description: str) -> str:
     """Inserta una nueva tarea en la tabla 'tasks' asociada a un proyecto (esquema simplificado)."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
     try:
-        # Consulta SQL simplificada: Solo project_id y description
-        cursor.execute(
-            "INSERT INTO tasks (project_id, description) VALUES (%s, %s) RETURNING id",
-            (project_id, description)
-        )
-        task_id = cursor.fetchone()[0]
-        conn.commit()
-        return f"Tarea '{description}' creada exitosamente en el proyecto ID {project_id}. ID de Tarea: {task_id}."
+        project_id, project_name = await get_project_index().resolve(project_id)
+    except LookupError as e:
+        return _error_proyecto(e)
+    try:
+        task_id = await get_repository().crear_tarea(project_id, description)
+        return f"Tarea '{description}' creada exitosamente en el proyecto {_describir_proyecto(project_id, project_name)}. ID de Tarea: {task_id}."
     except Exception as e:
-        conn.rollback()
         return f"❌ Error al crear la tarea. Asegúrate de que el Project ID {project_id} existe. Error: {e}"
-    finally:
-        conn.close()
 
 @tool(
     name="actualizar_estado_tarea",
     description="Actualiza el estado de una tarea existente. Los estados válidos comunes son 'Pendiente', 'En Progreso', 'Bloqueada', o 'Hecha'.",
-    pydantic_class=ActualizarEstadoInput
+    pydantic_class=ActualizarEstadoInput,
+    writes=("tasks",),
+    direct_return=True
 )
 async def actualizar_estado_tarea(tarea_id: int, nuevo_estado: str) -> str:
     """Actualiza el campo 'status' de una tarea específica."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
     try:
-        cursor.execute(
-            "UPDATE tasks SET status = %s WHERE id = %s RETURNING id",
-            (nuevo_estado, tarea_id)
-        )
-        if cursor.rowcount == 0:
+        if not await get_repository().actualizar_estado(tarea_id, nuevo_estado):
             return f"❌ Error: No se encontró la tarea con ID {tarea_id}."
-        conn.commit()
         return f"✅ Tarea ID {tarea_id} actualizada. Nuevo estado: {nuevo_estado}."
     except Exception as e:
-        conn.rollback()
         return f"❌ Error al actualizar el estado de la tarea {tarea_id}. Error: {e}"
-    finally:
-        conn.close()
 
 @tool(
     name="crear_recordatorio",
     description="Crea una tarea de alta prioridad con un título en el proyecto 'Recordatorios'. (No admite fecha/hora límite ni asignado en este esquema).",
-    pydantic_class=CrearRecordatorioInput
+    pydantic_class=CrearRecordatorioInput,
+    writes=("projects", "tasks"),
+    direct_return=True
 )
 async def crear_recordatorio(description: str) -> str:
     """Crea una tarea de alta prioridad en el proyecto 'Recordatorios'."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
     try:
-        # 1. Asegurar que el proyecto 'Recordatorios' existe
-        cursor.execute("INSERT INTO projects (name) VALUES (%s) ON CONFLICT (name) DO UPDATE SET name=EXCLUDED.name RETURNING id", ('Recordatorios',))
-        project_id = cursor.fetchone()[0]
-        
-        # 2. Insertar la tarea de recordatorio (Solo project_id, description, status)
-        cursor.execute(
-            "INSERT INTO tasks (project_id, description, status) VALUES (%s, %s, %s) RETURNING id",
-            (project_id, description, 'Recordatorio')
-        )
-        task_id = cursor.fetchone()[0]
-        conn.commit()
-        return f"✅ Recordatorio '{description}' creado (ID: {task_id})."
+        task_id, project_id = await get_repository().crear_recordatorio(description)
     except Exception as e:
-        conn.rollback()
         return f"❌ Error al crear el recordatorio. Error: {e}"
-    finally:
-        conn.close()
+    # El proyecto puede haberse creado ahora: el índice no recibe las notificaciones de este proceso
+    get_project_index().add(project_id, PROYECTO_RECORDATORIOS)
+    return f"✅ Recordatorio '{description}' creado (ID: {task_id})."
+
+_PATRON_TAREA = re.compile(r'[^,;\n-]+')
+
+def _iter_tareas(lista_tareas: str):
+    """Recorre perezosamente las tareas separadas por comas, saltos de línea, guiones o ';'."""
+    for match in _PATRON_TAREA.finditer(lista_tareas):
+        tarea = match.group().strip()
+        if tarea:
+            yield tarea
+
+def _formatear_ids(ids, max_rangos=10):
+    """Resume una lista de IDs como rangos compactos: [4, 5, 6, 9] -> '4-6, 9'."""
+    rangos = []
+    for task_id in ids:
+        if rangos and task_id == rangos[-1][1] + 1:
+            rangos[-1][1] = task_id
+        else:
+            rangos.append([task_id, task_id])
+    partes = [f"{a}-{b}" if a != b else str(a) for a, b in rangos[:max_rangos]]
+    if len(rangos) > max_rangos:
+        partes.append("…")
+    return ", ".join(partes)
 
 @tool(
     name="crear_proyecto_y_tareas",
     description="Crea un proyecto y un conjunto de tareas iniciales. La lista de tareas debe ser una cadena separada por comas, saltos de línea o guiones.",
-    pydantic_class=CrearProyectoYTareasInput
+    pydantic_class=CrearProyectoYTareasInput,
+    writes=("projects", "tasks"),
+    direct_return=True
 )
 async def crear_proyecto_y_tareas(nombre_proyecto: str, lista_tareas: str) -> str:
     """Crea un proyecto principal y luego inserta múltiples tareas asociadas."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    inicio = time.perf_counter()
     try:
-        # 1. Crear el proyecto principal y obtener su ID
-        cursor.execute("INSERT INTO projects (name) VALUES (%s) RETURNING id", (nombre_proyecto,))
-        project_id = cursor.fetchone()[0]
-        
-        # 2. Procesar la lista de tareas del texto
-        tareas_raw = lista_tareas.replace('\n', ',').replace('-', ',').replace(';', ',')
-        tareas = [t.strip() for t in tareas_raw.split(',') if t.strip()]
-        
-        if not tareas:
-            conn.commit()
-            return f"Proyecto '{nombre_proyecto}' creado (ID: {project_id}), pero no se encontraron tareas válidas en la lista."
-
-        # 3. Insertar cada tarea (solo project_id, description, status)
-        tareas_creadas = 0
-        for tarea_description in tareas:
-            cursor.execute(
-                "INSERT INTO tasks (project_id, description, status) VALUES (%s, %s, %s)",
-                (project_id, tarea_description, 'Pendiente')
-            )
-            tareas_creadas += 1
-            
-        conn.commit()
-        return f"✅ Proyecto '{nombre_proyecto}' creado (ID: {project_id}) con {tareas_creadas} tareas iniciales."
+        # Las tareas se leen de la cadena a medida que se insertan
+        project_id, task_ids = await get_repository().crear_proyecto_y_tareas(
+            nombre_proyecto, _iter_tareas(lista_tareas)
+        )
+    except DuplicateNameError:
+        return f"❌ Error: El proyecto '{nombre_proyecto}' ya existe. Por favor, usa un nombre diferente."
     except Exception as e:
-        conn.rollback()
-        if "unique constraint" in str(e):
-                return f"❌ Error: El proyecto '{nombre_proyecto}' ya existe. Por favor, usa un nombre diferente."
         return f"❌ Error al crear el proyecto y las tareas. Error: {e}"
-    finally:
-        conn.close()
+    get_project_index().add(project_id, nombre_proyecto)
+    duracion_ms = (time.perf_counter() - inicio) * 1000
+
+    if not task_ids:
+        return f"Proyecto '{nombre_proyecto}' creado (ID: {project_id}), pero no se encontraron tareas válidas en la lista."
+    return (
+        f"✅ Proyecto '{nombre_proyecto}' creado (ID: {project_id}) con {len(task_ids)} tareas iniciales "
+        f"(IDs: {_formatear_ids(task_ids)}) en {duracion_ms:.1f} ms."
+    )
+
+# Límite superior de filas por página en los listados
+MAX_PAGE_SIZE = 100
+
+def _normalizar_page_size(page_size, default):
+    if not page_size or page_size < 1:
+        return default
+    return min(page_size, MAX_PAGE_SIZE)
+
+def _pagina_siguiente(next_after_id):
+    return {"after_id": next_after_id} if next_after_id is not None else None
+
+def _fecha(valor):
+    try:
+        return valor.strftime('%Y-%m-%d %H:%M:%S')
+    except AttributeError:
+        return str(valor) if valor is not None else None # Fallback si no es un datetime object
 
 @tool(
     name="listar_tareas",
-    description="Busca y lista tareas filtradas por nombre de proyecto o estado. Devuelve un resumen formateado de las tareas encontradas (no incluye asignado ni vencimiento).",
-    pydantic_class=ListarTareasInput
+    description="Busca y lista tareas filtradas por nombre de proyecto o estado, paginadas por ID (after_id, page_size). Devuelve un resumen formateado de las tareas encontradas (no incluye asignado ni vencimiento).",
+    pydantic_class=ListarTareasInput,
+    reads=("tasks", "projects"),
+    direct_return=True
 )
-async def listar_tareas(project_name: str = None, status: str = None) -> str:
+async def listar_tareas(project_name: str = None, status: str = None, after_id: int = None, page_size: int = 10) -> dict:
     """Busca tareas en la base de datos aplicando filtros opcionales (esquema simplificado)."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    page_size = _normalizar_page_size(page_size, 10)
     try:
-        # Consulta SQL simplificada: solo selecciona id, description, status, project_name
-        sql_query = """
-            SELECT
-                t.id, t.description, t.status, p.name AS project_name
-            FROM 
-                tasks t
-            JOIN 
-                projects p ON t.project_id = p.id
-            WHERE 
-                1 = 1
-        """
-        params = []
-        if project_name:
-            sql_query += " AND p.name ILIKE %s"
-            params.append(f'%{project_name}%')
-        if status:
-            sql_query += " AND t.status ILIKE %s"
-            params.append(f'%{status}%')
-        
-        # Se omite el ORDER BY due_date
-        sql_query += " ORDER BY t.id ASC LIMIT 10" 
-        
-        cursor.execute(sql_query, params)
-        resultados = cursor.fetchall()
-        
-        if not resultados:
-            return "✅ No se encontraron tareas que coincidan con los filtros especificados."
-
-        output = [f"--- {len(resultados)} Tareas Encontradas ---"]
-        
-        for row in resultados:
-            # Orden de los resultados (solo las columnas existentes): id, description, status, project_name
-            task_id, description, task_status, project = row
-            output.append(
-                f"ID: {task_id} | Proyecto: {project} | Título: {description} | Estado: {task_status}"
-            )
-            
-        return "\n".join(output)
+        resultados, next_after_id = await get_repository().listar_tareas(
+            project_name, status, after_id, page_size
+        )
+    except Exception as e:
+        return error(f"Error al listar tareas: {e}")
+
+    # Orden de los resultados (solo las columnas existentes): id, description, status, project_name
+    return tabla(
+        "Tareas Encontradas", ("ID", "Proyecto", "Título", "Estado"),
+        [(task_id, project, description, task_status) for task_id, description, task_status, project in resultados],
+        _pagina_siguiente(next_after_id),
+        vacio="No se encontraron tareas que coincidan con los filtros especificados.",
+    )
 
+def _parsear_cursor(cursor):
+    """'relevancia:id' -> (relevancia, id); lanza ValueError si el cursor no es válido."""
+    relevancia, _, task_id = cursor.rpartition(":")
+    return float(relevancia), int(task_id)
+
+@tool(
+    name="buscar_tareas",
+    description="Busca tareas por palabras de su descripción (texto completo en español, insensible a plurales y conjugaciones), ordenadas por relevancia y con los términos resaltados. Filtros opcionales por proyecto y estado; paginada con cursor.",
+    pydantic_class=BuscarTareasInput,
+    reads=("tasks", "projects"),
+    direct_return=True
+)
+async def buscar_tareas(consulta: str, project_name: str = None, status: str = None, cursor: str = None, page_size: int = 10) -> dict:
+    """Busca tareas por su descripción, de más a menos relevante."""
+    page_size = _normalizar_page_size(page_size, 10)
+    try:
+        posicion = _parsear_cursor(cursor) if cursor else None
+    except ValueError:
+        return error(f"Error: El cursor '{cursor}' no es válido. Usa el valor indicado al final de la página anterior.")
+    try:
+        resultados, siguiente = await get_repository().buscar_tareas(
+            consulta, project_name, status, posicion, page_size
+        )
     except Exception as e:
-        return f"❌ Error al listar tareas: {e}"
-    finally:
-        conn.close()
+        return error(f"Error al buscar tareas: {e}")
+
+    return tabla(
+        f"Tareas Encontradas para '{consulta}'", ("ID", "Proyecto", "Título", "Estado", "Relevancia"),
+        [(task_id, project, fragmento, task_status, round(relevancia, 3))
+         for task_id, description, task_status, project, relevancia, fragmento in resultados],
+        {"cursor": f"{siguiente[0]!r}:{siguiente[1]}"} if siguiente is not None else None,
+        vacio=f"No se encontraron tareas que coincidan con '{consulta}'.",
+    )
 
 @tool(
     name="listar_proyectos",
-    description="Lista todos los proyectos existentes o filtra por nombre para obtener sus IDs y nombres.",
-    pydantic_class=ListarProyectosInput
+    description="Lista todos los proyectos existentes o filtra por nombre para obtener sus IDs y nombres, paginados por ID (after_id, page_size).",
+    pydantic_class=ListarProyectosInput,
+    reads=("projects",),
+    direct_return=True
 )
-async def listar_proyectos(nombre: str = None) -> str:
+async def listar_proyectos(nombre: str = None, after_id: int = None, page_size: int = 50) -> dict:
     
-    """Lista todos los proyectos en la tabla 'projects'."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    """Lista los proyectos de la tabla 'projects', una página cada vez."""
+    page_size = _normalizar_page_size(page_size, 50)
     try:
-        sql_query = "SELECT id, name, created_at FROM projects WHERE 1=1"
-        params = []
-        if nombre:
-            sql_query += " AND name ILIKE %s"
-            params.append(f'%{nombre}%')
-        
-        sql_query += " ORDER BY id ASC" 
-        
-        cursor.execute(sql_query, params)
-        resultados = cursor.fetchall()
-        
-        if not resultados:
-            return "✅ No se encontraron proyectos."
-
-        output = [f"--- {len(resultados)} Proyectos Encontrados ---"]
-        
-        for row in resultados:
-            # Asumiendo created_at es un objeto datetime. datetime.strftime()
-            project_id, name, created_at = row
-            # La conversión a string puede ser necesaria si el tipo de columna es TIMESTAMP
-            try:
-                created_at_str = created_at.strftime('%Y-%m-%d %H:%M:%S')
-            except AttributeError:
-                created_at_str = str(created_at) # Fallback si no es un datetime object
-                
-            output.append(
-                f"ID: {project_id} | Nombre: {name} | Creado: {created_at_str}"
-            )
-            
-        return "\n".join(output)
+        resultados, next_after_id = await get_repository().listar_proyectos(nombre, after_id, page_size)
+    except Exception as e:
+        return error(f"Error al listar proyectos: {e}")
 
+    # created_at es TIMESTAMP: se envía como texto
+    return tabla(
+        "Proyectos Encontrados", ("ID", "Nombre", "Creado"),
+        [(project_id, name, _fecha(created_at)) for project_id, name, created_at in resultados],
+        _pagina_siguiente(next_after_id),
+        vacio="No se encontraron proyectos.",
+    )
+
+# Estados que cuentan como terminados para el porcentaje de avance (sin distinguir mayúsculas)
+ESTADOS_COMPLETADOS = ("hecha", "completada", "terminada", "cerrada")
+
+@tool(
+    name="resumen_proyectos",
+    description="Resumen del avance de los proyectos: número de tareas por estado, porcentaje completado y última actividad. Usar para preguntas como '¿cómo va el proyecto X?' o '¿qué proyectos tienen tareas bloqueadas?' (estado='Bloqueada') en lugar de contar con listar_tareas.",
+    pydantic_class=ResumenProyectosInput,
+    reads=("projects", "tasks"),
+    direct_return=True
+)
+async def resumen_proyectos(nombre: str = None, estado: str = None, after_id: int = None, page_size: int = 50) -> dict:
+    """Resume cada proyecto a partir de los contadores por estado que mantiene la base de datos."""
+    page_size = _normalizar_page_size(page_size, 50)
+    try:
+        resultados, next_after_id = await get_repository().resumen_proyectos(nombre, estado, after_id, page_size)
     except Exception as e:
-        return f"❌ Error al listar proyectos: {e}"
-    finally:
-        conn.close()
+        return error(f"Error al resumir proyectos: {e}")
+
+    filas = []
+    for project_id, name, conteos, ultima_actividad in resultados:
+        total = sum(conteos.values())
+        hechas = sum(n for status, n in conteos.items() if status.lower() in ESTADOS_COMPLETADOS)
+        # Estados de más a menos tareas
+        por_estado = {status or 'Sin estado': n
+                      for status, n in sorted(conteos.items(), key=lambda item: (-item[1], item[0]))}
+        # Porcentaje completado (None si el proyecto no tiene tareas)
+        avance = hechas * 100 // total if total else None
+        filas.append((project_id, name, total, por_estado, avance, _fecha(ultima_actividad)))
+
+    return tabla(
+        "Proyectos (resumen)", ("ID", "Proyecto", "Tareas", "Por estado", "Completado %", "Última actividad"),
+        filas, _pagina_siguiente(next_after_id), vacio="No se encontraron proyectos.",
+    )
 
 @tool(
     name="eliminar_tarea",
     description="Elimina una tarea individual con un título en un proyecto específico. Requiere el ID del proyecto.",
-    pydantic_class=EliminarTareaInput
+    pydantic_class=EliminarTareaInput,
+    writes=("tasks",),
+    direct_return=True
 )
 async def eliminar_tarea(tarea_id: int) -> str:
     """Elimina una tarea en la tabla 'tasks' por su ID."""
-    conn = get_db_connection()
-    if conn is None: return "❌ Error de Conexión: No se pudo conectar a la base de datos."
-    cursor = conn.cursor()
     try:
-        # 1. Obtener la descripción para el mensaje de respuesta (opcional, pero útil)
-        cursor.execute("SELECT description FROM tasks WHERE id = %s", (tarea_id,))
-        task_info = cursor.fetchone()
-        
-        if task_info is None:
-            conn.close()
-            return f"❌ Error: No se encontró la tarea con ID {tarea_id} para eliminar."
-            
-        description = task_info[0]
-        
-        # 2. Eliminar la tarea
-        cursor.execute(
-            "DELETE FROM tasks WHERE id = %s",
-            (tarea_id,)
-        )
-        conn.commit()
-        return f"✅ Tarea ID {tarea_id} ('{description}') eliminada exitosamente."
-        
+        description = await get_repository().borrar_tarea(tarea_id)
     except Exception as e:
-        conn.rollback()
         return f"❌ Error al eliminar la tarea {tarea_id}. Error: {e}"
-    finally:
-        cursor.close()
-        conn.close()
+
+    if description is None:
+        return f"❌ Error: No se encontró la tarea con ID {tarea_id} para eliminar."
+    return f"✅ Tarea ID {tarea_id} ('{description}') eliminada exitosamente."
+
+# --- Operaciones por lotes ---
+# Una sola sentencia set-based dentro de una transacción, en lugar de una llamada
+# a herramienta por tarea.
+
+# Máximo de resultados individuales que se enumeran en la respuesta
+MAX_DETALLE_LOTE = 20
+
+def _resumen_lote(accion, filas, detalle, tarea_ids):
+    """Resumen de una operación por lotes: total, resultado por ID y los IDs pedidos que no se tocaron."""
+    lineas = [f"✅ {len(filas)} tareas {accion} (IDs: {_formatear_ids([fila[0] for fila in filas])})."]
+    for fila in filas[:MAX_DETALLE_LOTE]:
+        lineas.append(f"- ID {fila[0]}: {detalle(fila)}")
+    if len(filas) > MAX_DETALLE_LOTE:
+        lineas.append(f"- … y {len(filas) - MAX_DETALLE_LOTE} más.")
+    if tarea_ids:
+        afectados = {fila[0] for fila in filas}
+        omitidos = sorted(set(tarea_ids) - afectados)
+        if omitidos:
+            lineas.append(f"⚠️ {len(omitidos)} IDs no encontrados o fuera del filtro: {_formatear_ids(omitidos)}.")
+    return "\n".join(lineas)
+
+@tool(
+    name="actualizar_estado_tareas",
+    description="Actualiza el estado de muchas tareas a la vez, en una sola operación. Selecciona las tareas por lista de IDs (tarea_ids) y/o por filtro (project_id, que admite el ID o el nombre del proyecto, y estado_actual). Úsala en lugar de llamar varias veces a actualizar_estado_tarea.",
+    pydantic_class=ActualizarEstadoTareasInput,
+    writes=("tasks",),
+    direct_return=True
+)
+async def actualizar_estado_tareas(nuevo_estado: str, tarea_ids: list[int] = None, project_id: int | str = None, estado_actual: str = None) -> str:
+    """Actualiza el campo 'status' de todas las tareas seleccionadas en una única transacción."""
+    try:
+        if project_id is not None:
+            project_id, _ = await get_project_index().resolve(project_id)
+    except LookupError as e:
+        return _error_proyecto(e)
+    try:
+        filas = await get_repository().actualizar_estados(nuevo_estado, tarea_ids, project_id, estado_actual)
+    except Exception as e:
+        return f"❌ Error al actualizar el estado de las tareas. Error: {e}"
+
+    if not filas:
+        return "❌ Error: Ninguna tarea coincide con la selección indicada."
+    return _resumen_lote(f"actualizadas a '{nuevo_estado}'", filas, lambda fila: f"{fila[1]} → {nuevo_estado}", tarea_ids)
+
+@tool(
+    name="eliminar_tareas",
+    description="Elimina muchas tareas a la vez, en una sola operación. Selecciona las tareas por lista de IDs (tarea_ids) y/o por filtro (project_id, que admite el ID o el nombre del proyecto, y estado_actual). Úsala en lugar de llamar varias veces a eliminar_tarea.",
+    pydantic_class=EliminarTareasInput,
+    writes=("tasks",),
+    direct_return=True
+)
+async def eliminar_tareas(tarea_ids: list[int] = None, project_id: int | str = None, estado_actual: str = None) -> str:
+    """Elimina todas las tareas seleccionadas en una única transacción."""
+    try:
+        if project_id is not None:
+            # Borrado: solo coincidencias exactas del nombre
+            project_id, _ = await get_project_index().resolve(project_id, approximate=False)
+    except LookupError as e:
+        return _error_proyecto(e)
+    try:
+        filas = await get_repository().borrar_tareas(tarea_ids, project_id, estado_actual)
+    except Exception as e:
+        return f"❌ Error al eliminar las tareas. Error: {e}"
+
+    if not filas:
+        return "❌ Error: Ninguna tarea coincide con la selección indicada."
+    return _resumen_lote("eliminadas", filas, lambda fila: f"'{fila[1]}' eliminada", tarea_ids)
 
 @tool(
     name="eliminar_proyecto",
-    description="Elimina un proyecto específico usando su ID. **ADVERTENCIA:** Esto también elimina TODAS las tareas asociadas a ese proyecto.",
-    pydantic_class=EliminarProyectoInput
+    description="Elimina un proyecto específico usando su ID o su nombre exacto. **ADVERTENCIA:** Esto también elimina TODAS las tareas asociadas a ese proyecto.",
+    pydantic_class=EliminarProyectoInput,
+    writes=("projects", "tasks"),
+    direct_return=True
 )
-async def eliminar_proyecto(proyecto_id: int) -> str:
+async def eliminar_proyecto(proyecto_id: int | str) -> str:
     """Elimina un proyecto de la tabla 'projects' por su ID, eliminando automáticamente sus tareas."""
-    conn = get_db_connection()
-    if conn is None: return "❌ Error de Conexión: No se pudo conectar a la base de datos."
-    cursor = conn.cursor()
     try:
-        # 1. Obtener el nombre del proyecto para el mensaje de respuesta (opcional, pero útil)
-        cursor.execute("SELECT name FROM projects WHERE id = %s", (proyecto_id,))
-        project_info = cursor.fetchone()
-        
-        if project_info is None:
-            conn.close()
-            return f"❌ Error: No se encontró el proyecto con ID {proyecto_id} para eliminar."
-            
-        project_name = project_info[0]
-        
-        # 2. Eliminar el proyecto (y las tareas se eliminan en cascada gracias al FOREIGN KEY ON DELETE CASCADE)
-        cursor.execute(
-            "DELETE FROM projects WHERE id = %s",
-            (proyecto_id,)
-        )
-        
-        if cursor.rowcount == 0:
-            conn.rollback() # Aunque no hubo cambios, mejor asegurar
-            return f"❌ Error: No se encontró el proyecto con ID {proyecto_id} para eliminar."
-
-        conn.commit()
-        return f"✅ Proyecto ID {proyecto_id} ('{project_name}') eliminado exitosamente. Sus tareas también fueron eliminadas."
-        
+        # Borrado irreversible: el nombre debe coincidir exactamente (salvo mayúsculas y tildes)
+        proyecto_id, _ = await get_project_index().resolve(proyecto_id, approximate=False)
+    except LookupError as e:
+        return _error_proyecto(e)
+    try:
+        project_name = await get_repository().borrar_proyecto(proyecto_id)
     except Exception as e:
-        conn.rollback()
         return f"❌ Error al eliminar el proyecto {proyecto_id}. Error: {e}"
-    finally:
-        cursor.close()
-        conn.close()
\ No newline at end of file
+
+    get_project_index().remove(proyecto_id)
+    if project_name is None:
+        return f"❌ Error: No se encontró el proyecto con ID {proyecto_id} para eliminar."
+    return f"✅ Proyecto ID {proyecto_id} ('{project_name}') eliminado exitosamente. Sus tareas también fueron eliminadas."
+
+@tool(
+    name="mover_tareas",
+    description="Mueve una o varias tareas (tarea_ids) a otro proyecto, indicado por su ID o su nombre, en una sola operación.",
+    pydantic_class=MoverTareasInput,
+    writes=("tasks",),
+    direct_return=True
+)
+async def mover_tareas(tarea_ids: list[int], project_id: int | str) -> str:
+    """Cambia el proyecto de las tareas indicadas en una única transacción."""
+    try:
+        project_id, project_name = await get_project_index().resolve(project_id)
+    except LookupError as e:
+        return _error_proyecto(e)
+    try:
+        filas = await get_repository().mover_tareas(tarea_ids, project_id)
+    except Exception as e:
+        return f"❌ Error al mover las tareas. Asegúrate de que el Project ID {project_id} existe. Error: {e}"
+
+    if not filas:
+        return "❌ Error: Ninguna de las tareas indicadas existe."
+    destino = _describir_proyecto(project_id, project_name)
+    return _resumen_lote(f"movidas al proyecto {destino}", filas, lambda fila: f"proyecto {fila[1]} → {project_id}", tarea_ids)
+
+
+# --- Planes de varias operaciones ---
+# ejecutar_plan encadena operaciones de las herramientas anteriores en una sola
+# llamada, con una sola conexión y en una sola transacción: o se aplican todas o
+# ninguna. Cada paso se valida con el modelo de su herramienta antes de empezar.
+
+def _ids(resultado):
+    return f"(IDs: {_formatear_ids(resultado['tareas'])})" if resultado["tareas"] else ""
+
+# Herramienta -> (método del repositorio, conversión de los argumentos validados,
+# ¿admite nombres de proyecto aproximados?, descripción del resultado del paso)
+OPERACIONES_PLAN = {
+    "crear_tarea": ("crear_tarea", dict, True,
+                    lambda r: f"tarea {r['id']} creada en el proyecto {r['project_id']}"),
+    "actualizar_estado_tarea": ("actualizar_estado", dict, True,
+                                lambda r: f"tarea {r['id']} → '{r['estado']}'"),
+    "crear_recordatorio": ("crear_recordatorio", dict, True,
+                           lambda r: f"recordatorio {r['id']} creado"),
+    "crear_proyecto_y_tareas": ("crear_proyecto_y_tareas",
+                                lambda a: {"nombre_proyecto": a["nombre_proyecto"], "tareas": list(_iter_tareas(a["lista_tareas"]))},
+                                True,
+                                lambda r: f"proyecto '{r['nombre']}' creado (ID {r['id']}) con {len(r['tareas'])} tareas {_ids(r)}".rstrip()),
+    "eliminar_tarea": ("borrar_tarea", dict, False,
+                       lambda r: f"tarea {r['id']} ('{r['descripcion']}') eliminada"),
+    "actualizar_estado_tareas": ("actualizar_estados", dict, True,
+                                 lambda r: f"{len(r['tareas'])} tareas {_ids(r)} → '{r['estado']}'"),
+    "eliminar_tareas": ("borrar_tareas", dict, False,
+                        lambda r: f"{len(r['tareas'])} tareas eliminadas {_ids(r)}"),
+    "mover_tareas": ("mover_tareas", dict, True,
+                     lambda r: f"{len(r['tareas'])} tareas {_ids(r)} movidas al proyecto {r['project_id']}"),
+    "eliminar_proyecto": ("borrar_proyecto", dict, False,
+                          lambda r: f"proyecto {r['id']} ('{r['nombre']}') eliminado con sus tareas"),
+}
+
+# Argumentos que identifican un proyecto (ID, nombre o referencia a un paso anterior)
+CAMPOS_PROYECTO = ("project_id", "proyecto_id")
+
+def _numero_referencia(referencia: str) -> int:
+    return int(referencia.strip()[1:].split(".")[0])
+
+async def _preparar_paso(numero, paso, creados):
+    """
+    Valida un paso con el modelo de su herramienta y lo traduce a (método, argumentos).
+    Las referencias '$N' se conservan (se resuelven dentro de la transacción) y los
+    nombres de proyecto se resuelven ya: primero entre los proyectos que crea el
+    propio plan (`creados`: nombre normalizado -> nº de paso), luego con el índice.
+    """
+    operacion = paso["operacion"]
+    metodo, convertir, aproximado, _ = OPERACIONES_PLAN[operacion]
+    argumentos = dict(paso.get("argumentos") or {})
+
+    referencias = {}
+    for nombre, valor in argumentos.items():
+        items = valor if isinstance(valor, list) else [valor]
+        ref = [item for item in items if es_referencia(item)]
+        if not ref:
+            continue
+        posteriores = [item for item in ref if _numero_referencia(item) >= numero]
+        if posteriores:
+            raise ValueError(f"paso {numero} ({operacion}): '{posteriores[0]}' no se refiere a un paso anterior")
+        referencias[nombre] = valor
+    # Para validar, cada referencia se sustituye por un ID cualquiera
+    marcadores = {nombre: [0] if isinstance(valor, list) else 0 for nombre, valor in referencias.items()}
+    try:
+        modelo = TOOL_REGISTRY[operacion].input_model.model_validate({**argumentos, **marcadores})
+    except ValidationError as e:
+        raise ValueError(f"paso {numero} ({operacion}): {_detalles_validacion(e)}") from None
+    argumentos = {**modelo.model_dump(), **referencias}
+
+    for campo in CAMPOS_PROYECTO:
+        valor = argumentos.get(campo)
+        if valor is None or campo in referencias:
+            continue
+        if isinstance(valor, str) and normalizar_nombre(valor) in creados:
+            argumentos[campo] = f"${creados[normalizar_nombre(valor)]}"
+            continue
+        try:
+            argumentos[campo], _ = await get_project_index().resolve(valor, approximate=aproximado)
+        except LookupError as e:
+            raise ValueError(f"paso {numero} ({operacion}): {_error_proyecto(e).removeprefix('❌ Error: ')}") from None
+
+    if operacion == "crear_proyecto_y_tareas":
+        creados[normalizar_nombre(argumentos["nombre_proyecto"])] = numero
+    return metodo, convertir(argumentos)
+
+@tool(
+    name="ejecutar_plan",
+    description="Ejecuta varias operaciones de escritura en una sola llamada y en una sola transacción (o se aplican todas o ninguna). Úsala para peticiones compuestas, p. ej. 'crea el proyecto Y, mueve las tareas 3 y 8 a él, marca la 8 como hecha y borra la 9'. Cada paso indica la herramienta (operacion) y sus argumentos; '$N' se refiere al ID creado por el paso N.",
+    pydantic_class=EjecutarPlanInput,
+    writes=("projects", "tasks"),
+    direct_return=True
+)
+async def ejecutar_plan(pasos: list[dict]) -> str:
+    """Valida todos los pasos y los ejecuta en orden en una única transacción."""
+    inicio = time.perf_counter()
+    creados = {}
+    try:
+        plan = [await _preparar_paso(numero, paso, creados) for numero, paso in enumerate(pasos, 1)]
+    except ValueError as e:
+        detalle = str(e).rstrip(".")
+        return f"❌ Error en el plan, {detalle}{'' if detalle.endswith('?') else '.'} No se ejecutó ningún paso."
+    try:
+        resultados = await get_repository().ejecutar_plan(plan)
+    except PlanStepError as e:
+        return f"❌ Error en el paso {e.paso} ({pasos[e.paso - 1]['operacion']}): {e.detalle}. No se aplicó ningún cambio del plan."
+    except Exception as e:
+        return f"❌ Error al ejecutar el plan. No se aplicó ningún cambio. Error: {e}"
+    duracion_ms = (time.perf_counter() - inicio) * 1000
+
+    index = get_project_index()
+    lineas = [f"✅ Plan de {len(pasos)} pasos aplicado en una sola transacción ({duracion_ms:.1f} ms):"]
+    for numero, (paso, (metodo, _), resultado) in enumerate(zip(pasos, plan, resultados), 1):
+        if metodo == "crear_proyecto_y_tareas":
+            index.add(resultado["id"], resultado["nombre"])
+        elif metodo == "crear_recordatorio":
+            index.add(resultado["project_id"], PROYECTO_RECORDATORIOS)
+        elif metodo == "borrar_proyecto":
+            index.remove(resultado["id"])
+        lineas.append(f"{numero}. {paso['operacion']}: {OPERACIONES_PLAN[paso['operacion']][3](resultado)}")
+    return "\n".join(lineas)
@@ -0,0 +1,125 @@
+# ATLAS/atlas_server/tracing.py
+
+"""
+Trazado ligero de extremo a extremo (cliente -> Servidor MCP -> SQL), sin dependencias.
+
+Cada operación se mide con un span (`with span("llm.completion"): ...`). Los spans se
+anidan mediante contextvars y comparten un trace_id por turno; el cliente envía el
+contexto al servidor en el campo "trace" de cada petición con el formato W3C
+traceparent ("00-<trace_id>-<span_id>-01"), así que los spans del servidor cuelgan
+del span de la llamada a herramienta del cliente.
+
+Si ATLAS_TRACE_FILE está definida, cada span terminado se añade como una línea JSON
+a ese fichero (cliente y servidor escriben en el mismo). La duración de cada span
+alimenta además el histograma atlas_span_duration_seconds (ver metrics.py).
+"""
+
+import os
+import json
+import time
+import secrets
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from atlas_server import metrics
+
+TRACE_FILE = os.getenv("ATLAS_TRACE_FILE")
+
+_current: ContextVar["Span | None"] = ContextVar("atlas_current_span", default=None)
+_service = "atlas"
+_export_lock = threading.Lock()
+
+
+def set_service(name: str):
+    """Nombre del proceso que aparece en los spans exportados ('client' o 'server')."""
+    global _service
+    _service = name
+
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "attributes", "status", "start", "_t0", "duration_ms")
+
+    def __init__(self, name: str, trace_id: str, parent_id: str | None, attributes: dict):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.status = "ok"
+        self.start = time.time()
+        self._t0 = time.perf_counter()
+        self.duration_ms = 0.0
+
+    def set(self, key: str, value):
+        self.attributes[key] = value
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "service": _service,
+            "start": self.start,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+def _parse_traceparent(value: str | None) -> tuple[str, str] | None:
+    parts = value.split("-") if isinstance(value, str) else []
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    return parts[1], parts[2]
+
+
+@contextmanager
+def span(name: str, traceparent: str | None = None, **attributes):
+    """
+    Abre un span hijo del span actual (o del `traceparent` recibido de otro proceso;
+    si no hay ninguno, empieza una traza nueva). Una excepción marca el span como error.
+    """
+    parent = _current.get()
+    remote = _parse_traceparent(traceparent)
+    if remote:
+        trace_id, parent_id = remote
+    elif parent is not None:
+        trace_id, parent_id = parent.trace_id, parent.span_id
+    else:
+        trace_id, parent_id = secrets.token_hex(16), None
+
+    current = Span(name, trace_id, parent_id, attributes)
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.status = "error"
+        current.attributes["error"] = f"{type(e).__name__}: {e}"[:200]
+        raise
+    finally:
+        _current.reset(token)
+        current.duration_ms = (time.perf_counter() - current._t0) * 1000
+        metrics.SPAN_DURATION.observe(current.duration_ms / 1000, span=name)
+        _export(current)
+
+
+def current_traceparent() -> str | None:
+    """Contexto del span actual para propagarlo a otro proceso (None si no hay span)."""
+    current = _current.get()
+    return current.traceparent if current is not None else None
+
+
+def _export(finished: Span):
+    if not TRACE_FILE:
+        return
+    line = json.dumps(finished.to_dict(), ensure_ascii=False, default=str) + "\n"
+    with _export_lock:
+        # Una sola escritura en modo 'append' por span: las líneas de cliente y servidor no se mezclan
+        with open(TRACE_FILE, "a", encoding="utf-8") as f:
+            f.write(line)
@@ -0,0 +1,204 @@
+# ATLAS/atlas_server/transfer.py
+
+"""
+Exportación e importación masivas de proyectos y tareas, fuera del chat.
+
+Las herramientas de tools.py están pensadas para el LLM (páginas de 10 filas, un
+proyecto por llamada); este módulo mueve conjuntos completos, de millones de filas,
+con memoria constante:
+
+  - Exportación: el repositorio recorre proyectos y tareas con cursores de servidor
+    y escribe por bloques en JSON Lines o CSV.
+  - Importación: las filas se validan según se leen y el repositorio las carga en una
+    tabla temporal de staging (COPY en PostgreSQL) y las fusiona con sentencias
+    set-based en una sola transacción: si una línea es inválida no se importa nada.
+
+Formato (el mismo en ambos sentidos): una fila por tarea con los datos de su proyecto,
+columnas project, project_created_at, description, status y created_at. Un proyecto sin
+tareas es una fila sin description. Los IDs no se exportan: al importar, los proyectos
+se identifican por nombre y las tareas por proyecto y descripción (las que ya existen
+solo actualizan su estado), así que repetir una importación no duplica nada.
+
+Uso (desde el directorio raíz; '-' es la salida o la entrada estándar):
+    python -m atlas_server.transfer export atlas.jsonl [--format jsonl|csv] [--project Web]
+    python -m atlas_server.transfer import atlas.csv [--format jsonl|csv]
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import asyncio
+import argparse
+import datetime
+import functools
+import contextlib
+
+from atlas_server.repository import get_repository
+
+FORMATOS = ("jsonl", "csv")
+COLUMNAS = ("project", "project_created_at", "description", "status", "created_at")
+# Longitudes máximas de las columnas de texto (las del esquema)
+LONGITUDES = {"project": 255, "description": 255, "status": 50}
+EXTENSIONES = {".jsonl": "jsonl", ".ndjson": "jsonl", ".json": "jsonl", ".csv": "csv"}
+
+
+class ImportFormatError(ValueError):
+    """Una línea del fichero de importación no es válida; no se importa nada."""
+
+    def __init__(self, linea: int, detalle: str):
+        self.linea = linea
+        self.detalle = detalle
+        super().__init__(f"línea {linea}: {detalle}")
+
+
+def formato_de(ruta: str, formato: str | None = None) -> str:
+    """Formato indicado o, si no, el de la extensión del fichero."""
+    if formato:
+        return formato
+    formato = EXTENSIONES.get(os.path.splitext(ruta)[1].lower())
+    if formato is None:
+        raise ValueError(f"no se reconoce el formato de '{ruta}': usa --format {'|'.join(FORMATOS)}")
+    return formato
+
+
+# --- 1. Escritura ---
+
+def _valor(valor):
+    return valor.isoformat(sep=" ") if isinstance(valor, datetime.datetime) else valor
+
+def escritor(f, formato: str):
+    """Función que escribe en `f` un bloque de filas del repositorio en el formato indicado."""
+    if formato == "csv":
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(COLUMNAS)
+        return lambda filas: writer.writerows([_valor(valor) for valor in fila] for fila in filas)
+
+    def escribir_jsonl(filas):
+        f.write("".join(json.dumps(dict(zip(COLUMNAS, map(_valor, fila))), ensure_ascii=False) + "\n"
+                        for fila in filas))
+    return escribir_jsonl
+
+
+# --- 2. Lectura y validación ---
+
+def _registros(f, formato: str):
+    """(número de línea, dict) de cada registro del fichero."""
+    if formato == "csv":
+        reader = csv.DictReader(f)
+        if reader.fieldnames is None or "project" not in reader.fieldnames:
+            raise ImportFormatError(1, f"la cabecera CSV debe incluir las columnas {', '.join(COLUMNAS)}")
+        for registro in reader:
+            yield reader.line_num, registro
+        return
+    for numero, linea in enumerate(f, 1):
+        if not linea.strip():
+            continue
+        try:
+            registro = json.loads(linea)
+        except json.JSONDecodeError as e:
+            raise ImportFormatError(numero, f"JSON inválido ({e.msg})") from None
+        if not isinstance(registro, dict):
+            raise ImportFormatError(numero, "cada línea debe ser un objeto JSON")
+        yield numero, registro
+
+def _texto(numero: int, registro: dict, columna: str) -> str | None:
+    valor = registro.get(columna)
+    if valor is None:
+        return None
+    valor = str(valor).strip()
+    if len(valor) > LONGITUDES[columna]:
+        raise ImportFormatError(numero, f"'{columna}' supera los {LONGITUDES[columna]} caracteres")
+    return valor or None
+
+# Las fechas se repiten mucho (la del proyecto, en cada una de sus tareas): se normaliza cada texto una vez
+@functools.lru_cache(maxsize=4096)
+def _normalizar_fecha(texto: str) -> str:
+    """Fecha ISO 8601 -> 'AAAA-MM-DD HH:MM:SS[.ffffff]' (sin zona, como TIMESTAMP)."""
+    return datetime.datetime.fromisoformat(texto.strip()).replace(tzinfo=None).isoformat(sep=" ")
+
+def _fecha(numero: int, registro: dict, columna: str) -> str | None:
+    valor = registro.get(columna)
+    if valor in (None, ""):
+        return None
+    try:
+        return _normalizar_fecha(str(valor))
+    except ValueError:
+        raise ImportFormatError(numero, f"'{columna}' no es una fecha ISO 8601: {valor!r}") from None
+
+def leer_filas(f, formato: str):
+    """Filas validadas (project, project_created_at, description, status, created_at), según se leen."""
+    for numero, registro in _registros(f, formato):
+        proyecto = _texto(numero, registro, "project")
+        if proyecto is None:
+            raise ImportFormatError(numero, "falta el nombre del proyecto ('project')")
+        descripcion = _texto(numero, registro, "description")
+        yield (proyecto, _fecha(numero, registro, "project_created_at"), descripcion,
+               _texto(numero, registro, "status") if descripcion else None,
+               _fecha(numero, registro, "created_at") if descripcion else None)
+
+
+# --- 3. Operaciones ---
+
+def _abrir(ruta: str, modo: str):
+    if ruta == "-":
+        return open((sys.stdout if "w" in modo else sys.stdin).fileno(), modo, encoding="utf-8",
+                    newline="", closefd=False)
+    return open(ruta, modo, encoding="utf-8", newline="")
+
+async def exportar(repo, destino: str, formato: str, project_name: str | None = None) -> dict:
+    """Exporta al fichero `destino`; devuelve {"filas", "segundos"}."""
+    start = time.perf_counter()
+    with _abrir(destino, "w") as f:
+        filas = await repo.exportar(escritor(f, formato), project_name)
+    return {"filas": filas, "segundos": time.perf_counter() - start}
+
+async def importar(repo, origen: str, formato: str) -> dict:
+    """Importa el fichero `origen`; devuelve el resultado de repo.importar más "segundos"."""
+    start = time.perf_counter()
+    with _abrir(origen, "r") as f:
+        resultado = await repo.importar(leer_filas(f, formato))
+    return {**resultado, "segundos": time.perf_counter() - start}
+
+def _ritmo(filas: int, segundos: float) -> str:
+    return f"{segundos:.2f} s ({filas / segundos:,.0f} filas/s)" if segundos > 0 else f"{segundos:.2f} s"
+
+
+def main(args) -> int:
+    repo = get_repository()
+    # Con la exportación en la salida estándar, los mensajes van a stderr
+    salida = sys.stderr if args.ruta == "-" else sys.stdout
+    try:
+        formato = formato_de(args.ruta, args.format)
+        # Los avisos de las migraciones tampoco pueden mezclarse con los datos exportados
+        with contextlib.redirect_stdout(salida):
+            repo.initialize()
+        if args.operacion == "export":
+            r = asyncio.run(exportar(repo, args.ruta, formato, args.project))
+            print(f"✅ {r['filas']:,} filas exportadas a {args.ruta} ({formato}) en {_ritmo(r['filas'], r['segundos'])}.",
+                  file=salida)
+        else:
+            r = asyncio.run(importar(repo, args.ruta, formato))
+            print(f"✅ {r['filas']:,} filas importadas de {args.ruta} en {_ritmo(r['filas'], r['segundos'])}: "
+                  f"{r['proyectos']:,} proyectos nuevos, {r['tareas_creadas']:,} tareas nuevas y "
+                  f"{r['tareas_actualizadas']:,} con el estado actualizado.", file=salida)
+    except ImportFormatError as e:
+        print(f"❌ Error de formato en la {e}. No se importó nada.", file=salida)
+        return 1
+    except Exception as e:
+        # Errores de fichero, de formato o de la base de datos (la transacción ya se revirtió)
+        print(f"❌ Error: {e}", file=salida)
+        return 1
+    finally:
+        repo.close()
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("operacion", choices=("export", "import"))
+    parser.add_argument("ruta", help="fichero de destino o de origen ('-' para stdout/stdin)")
+    parser.add_argument("--format", choices=FORMATOS, help="por defecto, el de la extensión del fichero")
+    parser.add_argument("--project", help="exportar solo los proyectos cuyo nombre contiene este texto")
+    raise SystemExit(main(parser.parse_args()))
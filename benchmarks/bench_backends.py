@@ -0,0 +1,101 @@
+# ATLAS/benchmarks/bench_backends.py
+"""
+Comparación de latencia entre los backends de almacenamiento (PostgreSQL y SQLite).
+
+Puebla cada backend con el mismo volumen de datos a través del propio repositorio y
+mide, operación a operación y de forma secuencial (una transacción cada vez, como
+una conversación), los percentiles p50/p95 en milisegundos de:
+
+  - crear_tarea, actualizar_estado, borrar_tarea
+  - listar_tareas (por proyecto y por estado) y listar_proyectos
+  - actualizar_estados sobre 100 IDs
+  - crear_proyecto_y_tareas con 100 tareas
+
+Uso (desde el directorio raíz, con las variables DB_* configuradas para PostgreSQL):
+    python -m benchmarks.bench_backends [--projects 200] [--tasks-per-project 100] [--repeat 200]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from benchmarks.bench_e2e import _percentile
+from benchmarks.repository_conformance import open_repository, BACKENDS
+
+
+async def _seed(repo, n_projects, tasks_per_project) -> tuple[list[int], list[int]]:
+    project_ids, task_ids = [], []
+    for i in range(n_projects):
+        project_id, ids = await repo.crear_proyecto_y_tareas(
+            f"proyecto-{i:06d}", (f"tarea {i}-{j}" for j in range(tasks_per_project)))
+        project_ids.append(project_id)
+        task_ids.extend(ids)
+    return project_ids, task_ids
+
+
+async def _measure(repo, n_projects, tasks_per_project, repeat) -> dict[str, list[float]]:
+    start = time.perf_counter()
+    project_ids, task_ids = await _seed(repo, n_projects, tasks_per_project)
+    print(f"  datos generados en {time.perf_counter() - start:.1f}s")
+    rng = random.Random(42)
+    estados = ("Pendiente", "En Progreso", "Hecha")
+    created = []
+
+    # (operación, fábrica de la corrutina para la iteración i)
+    cases = [
+        ("crear_tarea", lambda i: repo.crear_tarea(rng.choice(project_ids), f"nueva {i}")),
+        ("actualizar_estado", lambda i: repo.actualizar_estado(rng.choice(task_ids), rng.choice(estados))),
+        ("listar_tareas proyecto", lambda i: repo.listar_tareas(f"proyecto-{rng.randrange(n_projects):06d}", None)),
+        ("listar_tareas estado", lambda i: repo.listar_tareas(None, "Hecha", rng.choice(task_ids))),
+        ("listar_proyectos", lambda i: repo.listar_proyectos(None, rng.choice(project_ids))),
+        ("actualizar_estados x100", lambda i: repo.actualizar_estados(
+            rng.choice(estados), rng.sample(task_ids, 100), None, None)),
+        ("crear_proyecto_y_tareas x100", lambda i: repo.crear_proyecto_y_tareas(
+            f"bench-{i}", (f"t{j}" for j in range(100)))),
+        ("borrar_tarea", lambda i: repo.borrar_tarea(created.pop())),
+    ]
+
+    samples = {}
+    for label, factory in cases:
+        if label == "borrar_tarea":
+            # Se borran tareas creadas para la ocasión para no alterar el resto de casos
+            created.extend([await repo.crear_tarea(project_ids[0], f"borrar {i}") for i in range(repeat)])
+        timings = samples[label] = []
+        for i in range(repeat):
+            operation = factory(i)
+            start = time.perf_counter()
+            await operation
+            timings.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main(args):
+    results = {}
+    for backend in args.backends:
+        print(f"\n=== {backend} ===")
+        with open_repository(backend, schema="atlas_bench_backends") as repository:
+            results[backend] = asyncio.run(
+                _measure(repository, args.projects, args.tasks_per_project, args.repeat))
+
+    backends = list(results)
+    labels = list(next(iter(results.values())))
+    print(f"\n{args.projects:,} proyectos x {args.tasks_per_project} tareas, {args.repeat} repeticiones (ms)\n")
+    header = " | ".join(f"{backend + ' p50/p95':>18}" for backend in backends)
+    print(f"{'operación':<30} | {header}")
+    print("-" * (33 + 21 * len(backends)))
+    for label in labels:
+        cells = []
+        for backend in backends:
+            timings = results[backend][label]
+            cells.append(f"{_percentile(timings, 50):>8.3f} {_percentile(timings, 95):>9.3f}")
+        print(f"{label:<30} | " + " | ".join(cells))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, default=200)
+    parser.add_argument("--tasks-per-project", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    main(parser.parse_args())
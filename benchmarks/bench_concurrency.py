@@ -0,0 +1,75 @@
+# ATLAS/benchmarks/bench_concurrency.py
+"""
+Benchmark de concurrencia de la ruta asíncrona de base de datos.
+
+Lanza N llamadas simultáneas a una operación de BD con distintos niveles de
+concurrencia y compara dos estrategias:
+
+  - bloqueante: la función psycopg2 se ejecuta directamente dentro de la corrutina
+    (comportamiento anterior: las llamadas concurrentes se serializan).
+  - pool de hilos: la misma función se ejecuta con run_in_transaction.
+
+Cada operación hace un SELECT pg_sleep(...) para simular la latencia de una
+consulta real, y además se mide la herramienta listar_proyectos tal cual.
+
+Uso (desde el directorio raíz, con las variables DB_* configuradas):
+    python -m benchmarks.bench_concurrency [--calls 64] [--latency-ms 20]
+"""
+
+import argparse
+import asyncio
+import time
+
+from atlas_server.db_connector import get_pool, run_in_transaction, DB_EXECUTOR_WORKERS
+from atlas_server.tools import listar_proyectos
+
+LEVELS = [1, 2, 4, 8, 16]
+
+
+def _consulta_lenta(conn, latency_s):
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT pg_sleep(%s)", (latency_s,))
+
+
+async def _run(calls: int, concurrency: int, make_call) -> float:
+    """Ejecuta `calls` llamadas con como máximo `concurrency` simultáneas; devuelve segundos."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            await make_call()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(calls)))
+    return time.perf_counter() - start
+
+
+async def main(calls: int, latency_ms: float):
+    latency_s = latency_ms / 1000
+    get_pool().warm()
+
+    async def bloqueante():
+        # Misma conexión del pool, pero la consulta bloquea el bucle de eventos
+        with get_pool().connection() as conn:
+            _consulta_lenta(conn, latency_s)
+            conn.commit()
+
+    async def en_hilos():
+        await run_in_transaction(_consulta_lenta, latency_s)
+
+    print(f"{calls} llamadas, latencia simulada {latency_ms:g} ms, {DB_EXECUTOR_WORKERS} hilos de BD\n")
+    print(f"{'concurrencia':>12} | {'bloqueante (llam/s)':>20} | {'pool de hilos (llam/s)':>23} | {'listar_proyectos (llam/s)':>26}")
+    print("-" * 92)
+    for level in LEVELS:
+        t_block = await _run(calls, level, bloqueante)
+        t_async = await _run(calls, level, en_hilos)
+        t_tool = await _run(calls, level, listar_proyectos)
+        print(f"{level:>12} | {calls / t_block:>20.1f} | {calls / t_async:>23.1f} | {calls / t_tool:>26.1f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=64, help="Número total de llamadas por nivel.")
+    parser.add_argument("--latency-ms", type=float, default=20, help="Latencia simulada de cada consulta.")
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.latency_ms))
@@ -0,0 +1,228 @@
+# ATLAS/benchmarks/bench_e2e.py
+"""
+Benchmark de extremo a extremo sin red: el cliente real (atlas_client/client.py) habla
+con un LLM simulado local (benchmarks/fake_llm.py) y con el Servidor MCP persistente
+sobre un esquema de PostgreSQL aislado y poblado con el volumen de datos indicado.
+
+Reproduce las conversaciones de benchmarks/conversations.json (los marcadores {run},
+{p}, {p6} y {t} varían en cada repetición para no repetir exactamente las mismas
+escrituras) e informa, por turno y en total, de los percentiles p50/p95/p99 de:
+
+  - total: latencia del turno completo vista por el usuario.
+  - llm: tiempo en las llamadas al LLM (simulado, con --ttft-ms y --chunk-ms).
+  - mcp: ida y vuelta de las llamadas a herramientas al Servidor MCP.
+  - db: tiempo en transacciones de base de datos dentro del servidor.
+
+Las llamadas a herramientas se solapan con el streaming del LLM, así que las partes
+no tienen por qué sumar el total. Los resultados se guardan en JSON para compararlos
+entre versiones (--compare resultados_anteriores.json).
+
+Uso (desde el directorio raíz, con las variables DB_* configuradas):
+    python -m benchmarks.bench_e2e [--runs 20] [--projects 1000] [--tasks 100000] [--compare base.json]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import datetime
+import io
+import json
+import os
+import re
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+CONVERSATIONS_PATH = os.path.join(os.path.dirname(__file__), 'conversations.json')
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+METRICS = ("total_ms", "llm_ms", "mcp_ms", "db_ms")
+
+# Umbral a partir del cual --compare señala una regresión
+REGRESSION_THRESHOLD = 0.10
+
+
+def _render(value, variables: dict):
+    """Sustituye los marcadores {x}; un marcador solo ("{t}") conserva el tipo de la variable."""
+    if isinstance(value, str):
+        whole = re.fullmatch(r"\{(\w+)\}", value)
+        if whole:
+            return variables[whole.group(1)]
+        return value.format(**variables)
+    if isinstance(value, list):
+        return [_render(item, variables) for item in value]
+    if isinstance(value, dict):
+        return {key: _render(item, variables) for key, item in value.items()}
+    return value
+
+
+def _percentile(samples: list[float], p: float) -> float:
+    """Percentil por rango más cercano (sin interpolar)."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(p / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def _summarize(turns: list[dict]) -> dict:
+    summary = {"count": len(turns)}
+    for metric in METRICS:
+        samples = [turn[metric] for turn in turns]
+        summary[metric.removesuffix("_ms")] = {
+            "p50": round(_percentile(samples, 50), 2),
+            "p95": round(_percentile(samples, 95), 2),
+            "p99": round(_percentile(samples, 99), 2),
+            "mean": round(sum(samples) / len(samples), 2),
+        }
+    return summary
+
+
+def _seed(schema: str, n_projects: int, n_tasks: int):
+    from atlas_server.db_connector import get_db_connection
+    from atlas_server.migrations import apply_migrations
+    from benchmarks.bench_listing import _seed as seed_tables
+
+    conn = get_db_connection()
+    if conn is None:
+        raise SystemExit("❌ No se pudo conectar a la base de datos (revisa las variables DB_*).")
+    try:
+        # Esquema base + datos, y luego el resto de migraciones (índices, triggers...)
+        seed_tables(conn, schema, n_projects, n_tasks)
+        apply_migrations(conn)
+    finally:
+        conn.close()
+
+
+def _drop_schema(schema: str):
+    from atlas_server.db_connector import get_db_connection
+
+    conn = get_db_connection()
+    if conn is None:
+        return
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+async def _run(conversations: list[dict], runs: int, warmup: int, llm) -> list[dict]:
+    # Importar después de configurar el entorno: el cliente lee el endpoint al importarse
+    from atlas_client import client
+    from atlas_client.history import ConversationHistory
+
+    client.get_session().start()
+    results = []
+    for run in range(1, warmup + runs + 1):
+        variables = {"run": run, "p": 10 + run, "p6": f"{10 + run:06d}", "t": 10 * run + 7}
+        for conversation in conversations:
+            turns = _render(conversation["turns"], variables)
+            llm.script.update({turn["user"]: turn for turn in turns})
+            history = ConversationHistory(client.SYSTEM_PROMPT)
+            for index, turn in enumerate(turns):
+                with contextlib.redirect_stdout(io.StringIO()):
+                    timing = await client.process_turn(turn["user"], history)
+                if run > warmup:
+                    timing["turn"] = f"{conversation['name']}[{index}]"
+                    timing["run"] = run - warmup
+                    results.append(timing)
+    client.get_session().close()
+    return results
+
+
+def _compare(current: dict, baseline_path: str):
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    print(f"\nComparación con {baseline_path} (p50 / p95 del total, ms):")
+    for name, summary in [("TOTAL", current["summary"])] + sorted(current["by_turn"].items()):
+        before = baseline["summary"] if name == "TOTAL" else baseline.get("by_turn", {}).get(name)
+        if before is None:
+            continue
+        changes = []
+        flag = ""
+        for p in ("p50", "p95"):
+            old, new = before["total"][p], summary["total"][p]
+            delta = (new - old) / old if old else 0.0
+            changes.append(f"{p} {old:.1f} → {new:.1f} ({delta:+.0%})")
+            if delta > REGRESSION_THRESHOLD:
+                flag = "  ⚠️ regresión"
+        print(f"  {name:<28} {' | '.join(changes)}{flag}")
+
+
+def main(args):
+    schema = args.schema
+    print(f"Poblando el esquema '{schema}'...")
+    _seed(schema, args.projects, args.tasks)
+
+    from benchmarks.fake_llm import FakeLLMServer
+    llm = FakeLLMServer({}, ttft_ms=args.ttft_ms, chunk_ms=args.chunk_ms).start()
+
+    # El cliente y el Servidor MCP (subproceso) heredan esta configuración
+    os.environ.update({
+        "ATLAS_LLM_ENDPOINT": llm.base_url,
+        "GIT_TOKEN": os.environ.get("GIT_TOKEN") or "benchmark",
+        "PGOPTIONS": f"-c search_path={schema},public",
+        "ATLAS_ROUTER": "1" if args.router else "0",
+    })
+
+    with open(args.conversations, encoding='utf-8') as f:
+        conversations = json.load(f)
+
+    try:
+        start = time.perf_counter()
+        turns = asyncio.run(_run(conversations, args.runs, args.warmup, llm))
+        elapsed = time.perf_counter() - start
+    finally:
+        llm.shutdown()
+        if not args.keep:
+            _drop_schema(schema)
+
+    by_turn: dict[str, list[dict]] = {}
+    for turn in turns:
+        by_turn.setdefault(turn["turn"], []).append(turn)
+
+    report = {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "config": {
+            "runs": args.runs, "warmup": args.warmup, "projects": args.projects, "tasks": args.tasks,
+            "ttft_ms": args.ttft_ms, "chunk_ms": args.chunk_ms, "router": args.router,
+            "conversations": os.path.relpath(args.conversations, ROOT),
+        },
+        "summary": _summarize(turns),
+        "by_turn": {name: _summarize(samples) for name, samples in sorted(by_turn.items())},
+        "llm_requests": llm.requests,
+        "turns": turns,
+    }
+
+    print(f"\n{len(turns)} turnos en {elapsed:.1f}s ({llm.requests} peticiones al LLM simulado)\n")
+    print(f"{'turno':<28} | {'total p50/p95/p99':>22} | {'llm p50':>8} | {'mcp p50':>8} | {'db p50':>8}")
+    print("-" * 86)
+    for name, summary in [("TOTAL", report["summary"])] + list(report["by_turn"].items()):
+        total = summary["total"]
+        print(f"{name:<28} | {total['p50']:>6.1f} {total['p95']:>7.1f} {total['p99']:>7.1f} | "
+              f"{summary['llm']['p50']:>8.1f} | {summary['mcp']['p50']:>8.1f} | {summary['db']['p50']:>8.1f}")
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"e2e-{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Resultados guardados en {output}")
+
+    if args.compare:
+        _compare(report, args.compare)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20, help="Repeticiones de cada conversación")
+    parser.add_argument("--warmup", type=int, default=1, help="Repeticiones iniciales que no se miden")
+    parser.add_argument("--projects", type=int, default=1000)
+    parser.add_argument("--tasks", type=int, default=100000)
+    parser.add_argument("--ttft-ms", type=float, default=300.0, help="Latencia simulada hasta el primer fragmento")
+    parser.add_argument("--chunk-ms", type=float, default=10.0, help="Latencia simulada entre fragmentos")
+    parser.add_argument("--router", action="store_true", help="Activar el enrutador local (por defecto, todo va al LLM)")
+    parser.add_argument("--conversations", default=CONVERSATIONS_PATH)
+    parser.add_argument("--schema", default="atlas_bench_e2e")
+    parser.add_argument("--output", help="Ruta del JSON de resultados (por defecto benchmarks/results/e2e-<fecha>.json)")
+    parser.add_argument("--compare", help="JSON de una ejecución anterior con el que comparar")
+    parser.add_argument("--keep", action="store_true", help="No borrar el esquema al terminar")
+    main(parser.parse_args())
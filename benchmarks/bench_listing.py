@@ -0,0 +1,111 @@
+# ATLAS/benchmarks/bench_listing.py
+"""
+Benchmark de las consultas de listado (listar_tareas / listar_proyectos) sobre
+tablas grandes, antes y después de los índices de las migraciones.
+
+Crea un esquema aislado ('atlas_bench' por defecto) en la base de datos configurada
+con las variables DB_*, lo puebla con generate_series y mide cada consulta con el
+esquema base (migración 1) y con todas las migraciones aplicadas.
+
+Uso (desde el directorio raíz):
+    python -m benchmarks.bench_listing [--tasks 1000000] [--projects 10000] [--repeat 5]
+"""
+
+import argparse
+import statistics
+import time
+
+from atlas_server.db_connector import get_db_connection
+from atlas_server.migrations import apply_migrations, LATEST_VERSION
+from atlas_server.repository_postgres import _consultar_tareas, _consultar_proyectos
+
+# (descripción, función de consulta, argumentos)
+CASES = [
+    ("listar_tareas proyecto parcial", _consultar_tareas, ("proyecto-000042", None)),
+    ("listar_tareas proyecto + estado", _consultar_tareas, ("proyecto-000042", "Bloqueada")),
+    ("listar_tareas estado poco frecuente", _consultar_tareas, (None, "Bloqueada")),
+    ("listar_proyectos nombre parcial", _consultar_proyectos, ("000042",)),
+]
+
+
+def _seed(conn, schema, n_projects, n_tasks):
+    with conn.cursor() as cursor:
+        cursor.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+        cursor.execute(f"CREATE SCHEMA {schema}")
+        cursor.execute(f"SET search_path TO {schema}, public")
+        # El SET debe confirmarse: apply_migrations hace rollback de la transacción en curso
+        conn.commit()
+        apply_migrations(conn, target=1)
+
+        print(f"Poblando {n_projects:,} proyectos y {n_tasks:,} tareas...")
+        start = time.perf_counter()
+        cursor.execute(
+            "INSERT INTO projects (name) SELECT 'proyecto-' || lpad(g::text, 6, '0') FROM generate_series(1, %s) g",
+            (n_projects,)
+        )
+        # El 1% de las tareas está 'Bloqueada'; el resto se reparte entre los estados habituales
+        cursor.execute("""
+            INSERT INTO tasks (project_id, description, status)
+            SELECT 1 + (g %% %s), 'tarea ' || g,
+                   CASE WHEN g %% 100 = 0 THEN 'Bloqueada'
+                        WHEN g %% 3 = 0 THEN 'Hecha'
+                        WHEN g %% 3 = 1 THEN 'En Progreso'
+                        ELSE 'Pendiente' END
+            FROM generate_series(1, %s) g
+        """, (n_projects, n_tasks))
+        conn.commit()
+        cursor.execute("ANALYZE projects; ANALYZE tasks;")
+        conn.commit()
+        print(f"Datos generados en {time.perf_counter() - start:.1f}s\n")
+
+
+def _measure(conn, repeat):
+    results = {}
+    for label, query, args in CASES:
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            query(conn, *args)
+            samples.append((time.perf_counter() - start) * 1000)
+            conn.rollback()
+        results[label] = statistics.median(samples)
+    return results
+
+
+def main(n_tasks, n_projects, repeat, schema, keep):
+    conn = get_db_connection()
+    if conn is None:
+        return
+    try:
+        _seed(conn, schema, n_projects, n_tasks)
+        before = _measure(conn, repeat)
+        start = time.perf_counter()
+        apply_migrations(conn)
+        with conn.cursor() as cursor:
+            cursor.execute("ANALYZE projects; ANALYZE tasks;")
+        conn.commit()
+        print(f"Migraciones 2..{LATEST_VERSION} aplicadas en {time.perf_counter() - start:.1f}s\n")
+        after = _measure(conn, repeat)
+
+        print(f"{'consulta':<38} | {'sin índices (ms)':>16} | {'con índices (ms)':>16}")
+        print("-" * 76)
+        for label, _, _ in CASES:
+            print(f"{label:<38} | {before[label]:>16.2f} | {after[label]:>16.2f}")
+    finally:
+        conn.rollback()
+        if not keep:
+            with conn.cursor() as cursor:
+                cursor.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+            conn.commit()
+        conn.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--projects", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--schema", default="atlas_bench")
+    parser.add_argument("--keep", action="store_true", help="No borrar el esquema de prueba al terminar.")
+    args = parser.parse_args()
+    main(args.tasks, args.projects, args.repeat, args.schema, args.keep)
@@ -0,0 +1,73 @@
+# ATLAS/benchmarks/bench_plan.py
+"""
+Benchmark de ejecutar_plan: una petición compuesta ("crea el proyecto Y, mueve las
+tareas 3 y 8 a él, marca la 8 como hecha, borra la 9 y añade una tarea nueva")
+ejecutada como cinco operaciones del repositorio, cada una con su conexión y su
+commit, frente a un único plan en una sola transacción.
+
+Mide la mediana en ms de cada forma (sin contar los turnos del LLM, uno por
+herramienta en el primer caso) en cada backend.
+
+Uso (desde el directorio raíz; con las variables DB_* configuradas para PostgreSQL):
+    python -m benchmarks.bench_plan [--backends postgres sqlite] [--repeat 50]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.repository_conformance import open_repository, BACKENDS
+
+
+async def _por_separado(repo, i, ids):
+    project_id, _ = await repo.crear_proyecto_y_tareas(f"bench-plan-{i}", iter([]))
+    await repo.mover_tareas([ids[0], ids[1]], project_id)
+    await repo.actualizar_estado(ids[1], "Hecha")
+    await repo.borrar_tarea(ids[2])
+    await repo.crear_tarea(project_id, "nueva")
+
+
+async def _en_un_plan(repo, i, ids):
+    await repo.ejecutar_plan([
+        ("crear_proyecto_y_tareas", {"nombre_proyecto": f"bench-plan-{i}", "tareas": []}),
+        ("mover_tareas", {"tarea_ids": [ids[0], ids[1]], "project_id": "$1"}),
+        ("actualizar_estado", {"tarea_id": ids[1], "nuevo_estado": "Hecha"}),
+        ("borrar_tarea", {"tarea_id": ids[2]}),
+        ("crear_tarea", {"project_id": "$1", "description": "nueva"}),
+    ])
+
+
+async def _run(repo, repeat) -> dict[str, float]:
+    results = {}
+    for label, funcion in (("5 operaciones por separado", _por_separado), ("1 plan (una transacción)", _en_un_plan)):
+        muestras = []
+        for i in range(repeat):
+            _, ids = await repo.crear_proyecto_y_tareas(f"bench-plan-origen-{label[0]}-{i}", iter(["a", "b", "c"]))
+            start = time.perf_counter()
+            await funcion(repo, f"{label[0]}-{i}", ids)
+            muestras.append((time.perf_counter() - start) * 1000)
+        results[label] = statistics.median(muestras)
+    return results
+
+
+def main(args):
+    results = {}
+    for backend in args.backends:
+        print(f"\n=== {backend} ===")
+        with open_repository(backend, schema="atlas_bench_plan") as repository:
+            results[backend] = asyncio.run(_run(repository, args.repeat))
+
+    backends = list(results)
+    print(f"\nPetición compuesta de 5 pasos, mediana de {args.repeat} ejecuciones (ms)\n")
+    print(f"{'forma':<28} | " + " | ".join(f"{backend:>10}" for backend in backends))
+    print("-" * (31 + 13 * len(backends)))
+    for label in next(iter(results.values())):
+        print(f"{label:<28} | " + " | ".join(f"{results[backend][label]:>10.2f}" for backend in backends))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    main(parser.parse_args())
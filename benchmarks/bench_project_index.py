@@ -0,0 +1,89 @@
+# ATLAS/benchmarks/bench_project_index.py
+"""
+Benchmark del índice de proyectos (atlas_server/project_index.py): cuánto cuesta
+resolver un nombre de proyecto a su ID en el servidor, frente a la consulta
+listar_proyectos que el LLM tenía que hacer antes para averiguar el ID (sin contar
+el turno extra del LLM, que es el coste dominante).
+
+Puebla el backend con --projects proyectos con nombres del tipo "Marketing Web 123"
+y mide la mediana en microsegundos de cada forma de referencia: ID, nombre exacto,
+nombre sin mayúsculas ni tildes, nombre parcial, nombre con errata (recorre todos los
+trigramas en memoria) y nombre desconocido (consulta a la base de datos).
+
+Uso (desde el directorio raíz; con las variables DB_* configuradas para PostgreSQL):
+    python -m benchmarks.bench_project_index [--backends postgres sqlite] [--projects 5000] [--repeat 200]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from atlas_server.project_index import ProjectIndex
+from benchmarks.repository_conformance import open_repository, BACKENDS
+
+AREAS = ["Marketing", "Diseño", "Ventas", "Logística", "Finanzas", "Soporte", "Investigación", "Operaciones"]
+PRODUCTOS = ["Web", "Móvil", "Escritorio", "API", "Tienda", "Campaña", "Portal", "Informe"]
+
+
+def _nombre(i: int) -> str:
+    return f"{AREAS[i % len(AREAS)]} {PRODUCTOS[(i // len(AREAS)) % len(PRODUCTOS)]} {i}"
+
+
+async def _medir(funcion, repeat):
+    muestras = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            await funcion()
+        except LookupError:
+            pass
+        muestras.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(muestras)
+
+
+async def _run(repo, n_projects, repeat) -> dict[str, float]:
+    start = time.perf_counter()
+    ids = [(await repo.crear_proyecto_y_tareas(_nombre(i), iter([])))[0] for i in range(n_projects)]
+    print(f"  {n_projects:,} proyectos creados en {time.perf_counter() - start:.1f}s")
+
+    index = ProjectIndex(repo)
+    start = time.perf_counter()
+    await index.resolve(_nombre(0))
+    print(f"  índice cargado en {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    objetivo = n_projects // 2
+    nombre = _nombre(objetivo)
+    cases = [
+        ("ID", lambda: index.resolve(ids[objetivo])),
+        ("nombre exacto", lambda: index.resolve(nombre)),
+        ("sin mayúsculas ni tildes", lambda: index.resolve(nombre.upper().replace("Ñ", "N").replace("Í", "I"))),
+        ("nombre parcial", lambda: index.resolve(nombre.split(" ", 1)[1])),
+        ("nombre con errata", lambda: index.resolve(nombre[:-2] + nombre[-1] + nombre[-2] + "x")),
+        ("desconocido (consulta BD)", lambda: index.resolve("proyecto inexistente")),
+        ("listar_proyectos (antes)", lambda: repo.listar_proyectos(nombre)),
+    ]
+    return {label: await _medir(funcion, repeat) for label, funcion in cases}
+
+
+def main(args):
+    results = {}
+    for backend in args.backends:
+        print(f"\n=== {backend} ===")
+        with open_repository(backend, schema="atlas_bench_project_index") as repository:
+            results[backend] = asyncio.run(_run(repository, args.projects, args.repeat))
+
+    backends = list(results)
+    print(f"\n{args.projects:,} proyectos, mediana de {args.repeat} resoluciones (µs)\n")
+    print(f"{'referencia':<28} | " + " | ".join(f"{backend:>10}" for backend in backends))
+    print("-" * (31 + 13 * len(backends)))
+    for label in next(iter(results.values())):
+        print(f"{label:<28} | " + " | ".join(f"{results[backend][label]:>10.1f}" for backend in backends))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    main(parser.parse_args())
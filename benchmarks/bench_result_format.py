@@ -0,0 +1,123 @@
+# ATLAS/benchmarks/bench_result_format.py
+"""
+Comparación de tokens de los formatos de resultado de las herramientas de consulta
+(atlas_server/results.py) sobre resultados realistas.
+
+Puebla un fichero SQLite temporal con proyectos y tareas con descripciones en
+español (las de bench_search), ejecuta las herramientas de listado reales y cuenta
+los tokens de cada resultado en cada formato:
+
+  - prosa: el formato anterior ("ID: 5 | Proyecto: ... | Título: ... | Estado: ...").
+  - tsv: el que recibe el LLM (ATLAS_RESULT_FORMAT, por defecto).
+  - json: el resultado estructurado compacto.
+  - text: la tabla alineada del terminal.
+
+Con tiktoken instalado se usa el tokenizador o200k_base (familia GPT-4o/4.1); si no,
+la estimación del historial del cliente (~4 caracteres por token). Es lo que se
+reenvía al LLM en cada llamada posterior mientras el resultado siga en el historial.
+
+Uso (desde el directorio raíz):
+    python -m benchmarks.bench_result_format [--projects 200] [--tasks 5000]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+
+from benchmarks.bench_search import VERBOS, OBJETOS, COMPLEMENTOS
+
+ESTADOS = ["Pendiente", "Pendiente", "En Progreso", "Hecha", "Bloqueada"]
+FORMATOS = ("prosa", "tsv", "json", "text")
+
+
+def _contador():
+    try:
+        import tiktoken
+    except ImportError:
+        from atlas_client.history import estimate_tokens
+        return "estimación ~4 caracteres/token", lambda texto: estimate_tokens({"content": texto}) - 4
+    encoding = tiktoken.get_encoding("o200k_base")
+    return "tiktoken o200k_base", lambda texto: len(encoding.encode(texto))
+
+
+def _prosa(result) -> str:
+    """Formato anterior de las herramientas: una línea 'Columna: valor | ...' por fila."""
+    from atlas_server.results import render
+
+    if result["status"] != "ok":
+        return render(result)
+    lineas = [f"--- {len(result['rows'])} {result['title']} ---"]
+    for fila in result["rows"]:
+        celdas = [", ".join(f"{k}: {v}" for k, v in valor.items()) if isinstance(valor, dict) else valor for valor in fila]
+        lineas.append(" | ".join(f"{columna}: {valor}" for columna, valor in zip(result["columns"], celdas)))
+    if result["next"]:
+        lineas.append(f"➡️ Hay más resultados. Para la siguiente página usa "
+                      + ", ".join(f"{k}={v}" for k, v in result["next"].items()) + ".")
+    return "\n".join(lineas)
+
+
+async def _seed(repo, n_projects, n_tasks):
+    aleatorio = random.Random(7)
+    por_proyecto = max(1, n_tasks // n_projects)
+    for i in range(n_projects):
+        nombre = f"{aleatorio.choice(['Web', 'App', 'Ventas', 'Marketing', 'Finanzas', 'Soporte'])} {aleatorio.choice(['Q1', 'Q2', '2025', 'Interno', 'Cliente'])} {i}"
+        tareas = (f"{aleatorio.choice(VERBOS)} {aleatorio.choice(OBJETOS)} {aleatorio.choice(COMPLEMENTOS)}"
+                  for _ in range(por_proyecto))
+        _, task_ids = await repo.crear_proyecto_y_tareas(nombre, tareas)
+        for estado in set(ESTADOS) - {"Pendiente"}:
+            elegidas = [task_id for task_id in task_ids if aleatorio.choice(ESTADOS) == estado]
+            if elegidas:
+                await repo.actualizar_estados(estado, elegidas, None, None)
+
+
+async def _run(args):
+    from atlas_server import tools
+    from atlas_server.repository import get_repository
+    from atlas_server.results import render
+
+    repo = get_repository()
+    repo.initialize()
+    await _seed(repo, args.projects, args.tasks)
+
+    cases = [
+        ("listar_tareas (10 filas)", tools.listar_tareas(page_size=10)),
+        ("listar_tareas (100 filas)", tools.listar_tareas(page_size=100)),
+        ("listar_tareas filtro estado (50)", tools.listar_tareas(status="Bloqueada", page_size=50)),
+        ("buscar_tareas (10 filas)", tools.buscar_tareas("factura", page_size=10)),
+        ("listar_proyectos (50 filas)", tools.listar_proyectos(page_size=50)),
+        ("resumen_proyectos (50 filas)", tools.resumen_proyectos(page_size=50)),
+    ]
+    nombre_contador, contar = _contador()
+    print(f"\nTokens por resultado ({nombre_contador}); entre paréntesis, respecto a la prosa anterior\n")
+    print(f"{'resultado':<34} | " + " | ".join(f"{formato:>14}" for formato in FORMATOS))
+    print("-" * (37 + 17 * len(FORMATOS)))
+    totales = dict.fromkeys(FORMATOS, 0)
+    for label, coro in cases:
+        result = await coro
+        tokens = {"prosa": contar(_prosa(result))}
+        tokens.update({formato: contar(render(result, formato)) for formato in FORMATOS[1:]})
+        for formato in FORMATOS:
+            totales[formato] += tokens[formato]
+        print(f"{label:<34} | " + " | ".join(
+            f"{tokens[formato]:>6} ({tokens[formato] / tokens['prosa']:>4.0%})" for formato in FORMATOS))
+    print("-" * (37 + 17 * len(FORMATOS)))
+    print(f"{'total':<34} | " + " | ".join(
+        f"{totales[formato]:>6} ({totales[formato] / totales['prosa']:>4.0%})" for formato in FORMATOS))
+    repo.close()
+
+
+def main(args):
+    with tempfile.TemporaryDirectory(prefix="atlas-formatos-") as directory:
+        # El repositorio y las herramientas leen el backend al importarse
+        os.environ["ATLAS_DB_BACKEND"] = "sqlite"
+        os.environ["ATLAS_SQLITE_PATH"] = os.path.join(directory, "atlas.db")
+        asyncio.run(_run(args))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, default=200)
+    parser.add_argument("--tasks", type=int, default=5000)
+    main(parser.parse_args())
@@ -0,0 +1,76 @@
+# ATLAS/benchmarks/bench_router.py
+"""
+Precisión del enrutador local (atlas_client/router.py) sobre un corpus etiquetado.
+
+Cada entrada de benchmarks/router_corpus.json tiene la frase del usuario y la llamada
+esperada ({"function", "arguments"}), o null si la frase es ambigua y debe ir al LLM.
+
+  - precisión: de las frases que el enrutador resolvió, cuántas con la llamada correcta.
+  - cobertura: de las frases resolubles, cuántas resolvió sin LLM.
+  - falsos positivos: frases que debían ir al LLM y el enrutador resolvió (lo más grave).
+
+Uso (desde el directorio raíz):
+    python -m benchmarks.bench_router [--corpus benchmarks/router_corpus.json] [--verbose]
+"""
+
+import argparse
+import json
+import os
+import time
+
+from atlas_client.router import IntentRouter
+from atlas_server.manifest import load_tool_descriptions
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), 'router_corpus.json')
+
+
+def main(corpus_path: str, verbose: bool):
+    with open(corpus_path, encoding='utf-8') as f:
+        corpus = json.load(f)
+
+    tools_list = [
+        {"type": "function", "function": {"name": tool["name"], "description": tool["description"], "parameters": tool["parameters"]}}
+        for tool in load_tool_descriptions()
+    ]
+    router = IntentRouter(tools_list, enabled=True)
+
+    routed = correct = routable = false_positives = 0
+    failures = []
+    start = time.perf_counter()
+    for entry in corpus:
+        route = router.match(entry["text"])
+        expected = entry["expected"]
+        routable += expected is not None
+        if route is None:
+            if expected is not None:
+                failures.append(("no resuelta", entry["text"], expected, None))
+            continue
+        routed += 1
+        if expected is None:
+            false_positives += 1
+            failures.append(("falso positivo", entry["text"], None, route))
+        elif route == expected:
+            correct += 1
+        else:
+            failures.append(("incorrecta", entry["text"], expected, route))
+    elapsed_us = (time.perf_counter() - start) * 1e6 / len(corpus)
+
+    print(f"Frases: {len(corpus)} ({routable} resolubles, {len(corpus) - routable} para el LLM)")
+    print(f"Resueltas localmente: {routed}")
+    print(f"Precisión: {correct / routed:.1%}" if routed else "Precisión: n/a")
+    print(f"Cobertura: {correct / routable:.1%}" if routable else "Cobertura: n/a")
+    print(f"Falsos positivos: {false_positives}")
+    print(f"Tiempo medio de enrutado: {elapsed_us:.0f} µs por frase")
+
+    if verbose and failures:
+        print()
+        for kind, text, expected, got in failures:
+            print(f"[{kind}] {text!r}\n    esperada: {expected}\n    obtenida: {got}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=CORPUS_PATH)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+    main(args.corpus, args.verbose)
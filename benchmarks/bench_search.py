@@ -0,0 +1,199 @@
+# ATLAS/benchmarks/bench_search.py
+"""
+Benchmark de buscar_tareas (texto completo) frente a la búsqueda por subcadena
+(ILIKE '%...%' en PostgreSQL, LIKE en SQLite) sobre una tabla grande de tareas.
+
+Genera descripciones en español combinando verbos, objetos y complementos (una de
+cada 10.000 menciona 'criptografía') en un esquema de PostgreSQL aislado o en un
+fichero SQLite temporal, aplica las migraciones (tsvector + GIN o FTS5) e informa
+de la mediana en ms de la primera página (10 filas) de cada consulta, del tiempo de
+construcción del índice y de cuántas filas encuentra cada método.
+
+Uso (desde el directorio raíz; con las variables DB_* configuradas para PostgreSQL):
+    python -m benchmarks.bench_search [--backend postgres|sqlite] [--tasks 1000000] [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+VERBOS = ["Revisar", "Diseñar", "Implementar", "Probar", "Documentar", "Desplegar", "Optimizar",
+          "Migrar", "Corregir", "Preparar", "Actualizar", "Analizar"]
+OBJETOS = ["la portada", "el presupuesto", "la base de datos", "el informe trimestral", "la API de pagos",
+           "el formulario de registro", "la factura", "el servidor de correo", "la campaña de marketing",
+           "el contrato", "la copia de seguridad", "el panel de control", "la aplicación móvil",
+           "el manual de usuario", "la encuesta de satisfacción", "el inventario"]
+COMPLEMENTOS = ["para el cliente", "antes del lanzamiento", "de la versión móvil", "del equipo de ventas",
+                "con urgencia", "según la auditoría", "para el próximo trimestre", "del proveedor",
+                "en el entorno de pruebas", "tras la reunión semanal"]
+
+# (caso, consulta de texto completo, palabras que deben aparecer con ILIKE, filtro de proyecto)
+CASES = [
+    ("término poco frecuente", "criptografía", ["criptografía"], None),
+    ("término frecuente", "factura", ["factura"], None),
+    ("dos términos", "revisar presupuesto", ["revisar", "presupuesto"], None),
+    ("plural (lematización)", "facturas", ["facturas"], None),
+    ("frase + filtro de proyecto", "\"copia de seguridad\"", ["copia de seguridad"], "proyecto-000042"),
+]
+
+
+# --- 1. Datos ---
+
+def _descripcion_sql(g: str, placeholder: str, json_arrays: bool) -> str:
+    """Expresión SQL que genera la descripción de la tarea número `g` (misma fórmula en ambos motores)."""
+    nv, no, nc = len(VERBOS), len(OBJETOS), len(COMPLEMENTOS)
+    if json_arrays:
+        item = lambda indice: f"json_extract({placeholder}, '$[' || ({indice}) || ']')"
+    else:
+        item = lambda indice: f"({placeholder}::text[])[1 + ({indice})]"
+    return (
+        f"{item(f'{g} % {nv}')} || ' ' || {item(f'({g} / {nv}) % {no}')} || ' ' || "
+        f"{item(f'({g} / {nv * no}) % {nc}')} || "
+        f"CASE WHEN {g} % 10000 = 0 THEN ' con criptografía' ELSE '' END || ' #' || {g}"
+    )
+
+
+def _seed_postgres(schema, n_projects, n_tasks):
+    from atlas_server.db_connector import get_db_connection
+    from atlas_server.migrations import apply_migrations
+
+    conn = get_db_connection()
+    with conn.cursor() as cursor:
+        cursor.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+        cursor.execute(f"CREATE SCHEMA {schema}")
+        cursor.execute(f"SET search_path TO {schema}, public")
+        conn.commit()
+        apply_migrations(conn, target=1)
+        start = time.perf_counter()
+        cursor.execute(
+            "INSERT INTO projects (name) SELECT 'proyecto-' || lpad(g::text, 6, '0') FROM generate_series(1, %s) g",
+            (n_projects,))
+        descripcion = _descripcion_sql("g", "%s", json_arrays=False).replace("%", "%%").replace("%%s", "%s")
+        cursor.execute(
+            f"INSERT INTO tasks (project_id, description) SELECT 1 + (g %% %s), {descripcion} FROM generate_series(1, %s) g",
+            (n_projects, VERBOS, OBJETOS, COMPLEMENTOS, n_tasks))
+        conn.commit()
+        print(f"Datos generados en {time.perf_counter() - start:.1f}s")
+        start = time.perf_counter()
+        apply_migrations(conn)
+        print(f"Migraciones (incluida la columna tsvector y su índice GIN) en {time.perf_counter() - start:.1f}s")
+        cursor.execute("ANALYZE projects; ANALYZE tasks;")
+        conn.commit()
+    return conn
+
+
+def _seed_sqlite(path, n_projects, n_tasks):
+    from atlas_server.repository_sqlite import SqliteRepository, SQLITE_MIGRATIONS
+
+    repository = SqliteRepository(path)
+    conn = repository._connection()
+    # Solo el esquema base; el índice FTS se construye después, como en PostgreSQL
+    conn.execute("BEGIN")
+    for statement in SQLITE_MIGRATIONS[0][2]:
+        conn.execute(statement)
+    conn.execute("PRAGMA user_version = 1")
+    start = time.perf_counter()
+    conn.execute(
+        "INSERT INTO projects (name) WITH RECURSIVE s(g) AS (SELECT 1 UNION ALL SELECT g + 1 FROM s WHERE g < ?) "
+        "SELECT 'proyecto-' || printf('%06d', g) FROM s", (n_projects,))
+    descripcion = _descripcion_sql("g", "?", json_arrays=True)
+    conn.execute(
+        f"INSERT INTO tasks (project_id, description) WITH RECURSIVE s(g) AS (SELECT 1 UNION ALL SELECT g + 1 FROM s WHERE g < ?) "
+        f"SELECT 1 + (g % ?), {descripcion} FROM s",
+        (n_tasks, n_projects, json.dumps(VERBOS), json.dumps(OBJETOS), json.dumps(COMPLEMENTOS)))
+    conn.execute("COMMIT")
+    print(f"Datos generados en {time.perf_counter() - start:.1f}s")
+    start = time.perf_counter()
+    repository.initialize()
+    conn.execute("ANALYZE")
+    print(f"Migraciones (incluido el índice FTS5) en {time.perf_counter() - start:.1f}s")
+    return repository, conn
+
+
+# --- 2. Consultas ---
+
+def _subcadena(conn, palabras, project_name, placeholder, operador):
+    """Búsqueda de referencia: una condición ILIKE/LIKE por palabra, primera página por ID."""
+    condiciones = " AND ".join([f"t.description {operador} {placeholder}"] * len(palabras))
+    params = [f"%{palabra}%" for palabra in palabras]
+    if project_name:
+        condiciones += f" AND p.name {operador} {placeholder}"
+        params.append(f"%{project_name}%")
+    sql = (f"SELECT t.id, t.description FROM tasks t JOIN projects p ON t.project_id = p.id "
+           f"WHERE {condiciones} ORDER BY t.id LIMIT 10")
+    if placeholder == "?":
+        return conn.execute(sql, params).fetchall()
+    with conn.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def _contar(conn, sql, params, placeholder):
+    if placeholder == "?":
+        return conn.execute(sql, params).fetchone()[0]
+    with conn.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchone()[0]
+
+
+def _medir(funcion, repeat):
+    muestras = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        filas = funcion()
+        muestras.append((time.perf_counter() - start) * 1000)
+    return statistics.median(muestras), filas
+
+
+def main(args):
+    if args.backend == "postgres":
+        from atlas_server.repository_postgres import _buscar_tareas
+        conn = _seed_postgres(args.schema, args.projects, args.tasks)
+        placeholder, operador = "%s", "ILIKE"
+        finish = lambda: conn.rollback()
+        count_sql = ("SELECT count(*) FROM tasks t JOIN projects p ON t.project_id = p.id, "
+                     "websearch_to_tsquery('spanish', %s) q WHERE t.search_vector @@ q")
+    else:
+        from atlas_server.repository_sqlite import _buscar_tareas, _consulta_fts
+        directory = tempfile.TemporaryDirectory(prefix="atlas-search-")
+        repository, conn = _seed_sqlite(os.path.join(directory.name, "atlas.db"), args.projects, args.tasks)
+        placeholder, operador = "?", "LIKE"
+        finish = lambda: None
+        count_sql = "SELECT count(*) FROM tasks_fts WHERE tasks_fts MATCH ?"
+
+    print(f"\n{args.tasks:,} tareas, backend {args.backend}, mediana de {args.repeat} ejecuciones (ms)\n")
+    print(f"{'consulta':<28} | {'texto completo':>14} | {operador + ' %...%':>12} | {'coincidencias':>17} | {'filas ' + operador:>11}")
+    print("-" * 96)
+    try:
+        for label, consulta, palabras, proyecto in CASES:
+            fts_ms, (filas_fts, _) = _medir(lambda: _buscar_tareas(conn, consulta, proyecto, None, None, 10), args.repeat)
+            finish()
+            sub_ms, filas_sub = _medir(lambda: _subcadena(conn, palabras, proyecto, placeholder, operador), args.repeat)
+            finish()
+            total = _contar(conn, count_sql, [consulta if placeholder == "%s" else _consulta_fts(consulta)], placeholder)
+            finish()
+            print(f"{label:<28} | {fts_ms:>14.2f} | {sub_ms:>12.2f} | {total:>17,} | {len(filas_sub):>11}")
+    finally:
+        if args.backend == "postgres":
+            if not args.keep:
+                with conn.cursor() as cursor:
+                    cursor.execute(f"DROP SCHEMA IF EXISTS {args.schema} CASCADE")
+                conn.commit()
+            conn.close()
+        else:
+            repository.close()
+            directory.cleanup()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=("postgres", "sqlite"), default="postgres")
+    parser.add_argument("--tasks", type=int, default=1000000)
+    parser.add_argument("--projects", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--schema", default="atlas_bench_search")
+    parser.add_argument("--keep", action="store_true", help="No borrar el esquema al terminar (PostgreSQL)")
+    main(parser.parse_args())
@@ -0,0 +1,82 @@
+# ATLAS/benchmarks/bench_startup.py
+"""
+Benchmark del tiempo de arranque en frío de los dos puntos de entrada.
+
+Mide, en procesos de Python nuevos (mediana de varias repeticiones):
+
+  - servidor: importar server.py, y lo que costaba antes cargar 'mcp' al importarlo.
+  - cliente: construir TOOLS_LIST desde el manifiesto frente a importar atlas_server.tools
+    (pydantic + psycopg2 + generación de esquemas), y la importación completa de client.py.
+  - servidor persistente: desde lanzar el proceso hasta recibir la primera respuesta.
+
+Uso (desde el directorio raíz, con las variables DB_* configuradas):
+    python -m benchmarks.bench_startup [--repeat 7]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+CASES = [
+    ("servidor: import atlas_server.server", "import atlas_server.server"),
+    ("servidor: import mcp.server (antes, siempre)", "import mcp.server, mcp.types"),
+    ("cliente: TOOLS_LIST desde manifiesto", "from atlas_server.manifest import load_tool_descriptions; load_tool_descriptions()"),
+    ("cliente: TOOLS_LIST importando tools (antes)",
+     "from atlas_server.tools import TOOL_REGISTRY; [f.input_model.model_json_schema(by_alias=True) for f in TOOL_REGISTRY.values()]"),
+    ("cliente: import atlas_client.client", "import atlas_client.client"),
+]
+
+
+def _env():
+    env = os.environ.copy()
+    env['PYTHONPATH'] = os.pathsep.join([ROOT, env.get('PYTHONPATH', '')])
+    env.setdefault('GIT_TOKEN', 'benchmark')
+    return env
+
+
+def _time_python(code: str, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], check=True, env=_env(), cwd=ROOT)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def _time_first_response(repeat: int) -> float:
+    from atlas_client.mcp_session import MCPSession
+
+    samples = []
+    for _ in range(repeat):
+        session = MCPSession()
+        start = time.perf_counter()
+        session.stats()
+        samples.append((time.perf_counter() - start) * 1000)
+        session.close()
+    return statistics.median(samples)
+
+
+def main(repeat: int):
+    # Generamos el manifiesto para medir el caso habitual (no la primera ejecución)
+    from atlas_server.manifest import build_manifest
+    build_manifest()
+
+    baseline = _time_python("pass", repeat)
+    print(f"Intérprete vacío: {baseline:.0f} ms (incluido en cada medida)\n")
+    print(f"{'caso':<48} | {'mediana (ms)':>12}")
+    print("-" * 64)
+    for label, code in CASES:
+        print(f"{label:<48} | {_time_python(code, repeat):>12.0f}")
+    print(f"{'servidor persistente: primera respuesta':<48} | {_time_first_response(repeat):>12.0f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+    main(args.repeat)
@@ -0,0 +1,148 @@
+# ATLAS/benchmarks/bench_summary.py
+"""
+Benchmark de resumen_proyectos: tabla de resumen mantenida por triggers
+(project_task_summary, migración 6) frente a agregar las tareas en cada consulta.
+
+Puebla un esquema de PostgreSQL aislado (mismos datos que bench_listing), aplica las
+migraciones (incluida la carga inicial del resumen) y mide la mediana en ms de:
+
+  - una página de 50 proyectos con sus contadores por estado,
+  - un proyecto por nombre,
+  - los proyectos con tareas 'Bloqueada' (primera página),
+
+con las dos estrategias, comprobando que ambas devuelven los mismos contadores. Mide
+también el coste de los triggers en escritura: INSERT de una tarea y de 10.000 tareas
+en una sentencia, con y sin los triggers del resumen (cada medición se revierte).
+
+Uso (desde el directorio raíz, con las variables DB_* configuradas):
+    python -m benchmarks.bench_summary [--projects 10000] [--tasks 1000000] [--repeat 20]
+"""
+
+import argparse
+import statistics
+import time
+
+from benchmarks.bench_listing import _seed
+
+SUMMARY_TRIGGERS = ("tasks_summary_insert", "tasks_summary_update", "tasks_summary_delete", "tasks_summary_truncate")
+
+
+def _resumen_en_vivo(conn, nombre, estado, after_id=None, page_size=50):
+    """Misma salida que _resumen_proyectos, pero contando las tareas de cada proyecto de la página."""
+    condiciones, params = "", []
+    if nombre:
+        condiciones += " AND p.name ILIKE %s"
+        params.append(f'%{nombre}%')
+    if estado:
+        condiciones += " AND EXISTS (SELECT 1 FROM tasks f WHERE f.project_id = p.id AND f.status ILIKE %s)"
+        params.append(f'%{estado}%')
+    if after_id is not None:
+        condiciones += " AND p.id > %s"
+        params.append(after_id)
+    params.append(page_size + 1)
+    with conn.cursor() as cursor:
+        cursor.execute(f"""
+            WITH pagina AS (
+                SELECT p.id, p.name, p.created_at FROM projects p
+                WHERE 1 = 1{condiciones}
+                ORDER BY p.id ASC LIMIT %s
+            )
+            SELECT pagina.id, pagina.name,
+                   COALESCE(json_object_agg(c.status, c.n) FILTER (WHERE c.n IS NOT NULL), '{{}}'),
+                   COALESCE(max(c.ultima), pagina.created_at)
+            FROM pagina
+            LEFT JOIN LATERAL (
+                SELECT COALESCE(t.status, '') AS status, count(*) AS n, max(t.created_at) AS ultima
+                FROM tasks t WHERE t.project_id = pagina.id GROUP BY 1
+            ) c ON true
+            GROUP BY pagina.id, pagina.name, pagina.created_at
+            ORDER BY pagina.id ASC
+        """, params)
+        filas = cursor.fetchall()
+    return filas[:page_size], (filas[page_size - 1][0] if len(filas) > page_size else None)
+
+
+def _medir(conn, funcion, repeat):
+    muestras = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        resultado = funcion()
+        muestras.append((time.perf_counter() - start) * 1000)
+        conn.rollback()
+    return statistics.median(muestras), resultado
+
+
+def _con_triggers(conn, activos: bool):
+    with conn.cursor() as cursor:
+        for trigger in SUMMARY_TRIGGERS:
+            cursor.execute(f"ALTER TABLE tasks {'ENABLE' if activos else 'DISABLE'} TRIGGER {trigger}")
+
+
+def _insertar(conn, n_tasks, n_projects):
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO tasks (project_id, description) SELECT 1 + (g %% %s), 'nueva ' || g FROM generate_series(1, %s) g",
+            (n_projects, n_tasks))
+
+
+def main(args):
+    from atlas_server.db_connector import get_db_connection
+    from atlas_server.migrations import apply_migrations
+    from atlas_server.repository_postgres import _resumen_proyectos
+
+    conn = get_db_connection()
+    if conn is None:
+        raise SystemExit("❌ No se pudo conectar a la base de datos (revisa las variables DB_*).")
+    try:
+        _seed(conn, args.schema, args.projects, args.tasks)
+        start = time.perf_counter()
+        apply_migrations(conn)
+        print(f"Migraciones (incluida la carga inicial de project_task_summary) en {time.perf_counter() - start:.1f}s")
+        with conn.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        conn.commit()
+
+        cases = [
+            ("50 proyectos", (None, None, None, 50)),
+            ("un proyecto por nombre", ("proyecto-000042", None, None, 50)),
+            ("con tareas bloqueadas", (None, "Bloqueada", None, 50)),
+        ]
+        print(f"\n{args.tasks:,} tareas en {args.projects:,} proyectos, mediana de {args.repeat} ejecuciones (ms)\n")
+        print(f"{'consulta':<26} | {'tabla de resumen':>16} | {'agregado en vivo':>16} | {'aceleración':>11}")
+        print("-" * 78)
+        for label, case_args in cases:
+            resumen_ms, (resumen, _) = _medir(conn, lambda: _resumen_proyectos(conn, *case_args), args.repeat)
+            vivo_ms, (vivo, _) = _medir(conn, lambda: _resumen_en_vivo(conn, *case_args), args.repeat)
+            if [fila[:3] for fila in resumen] != [fila[:3] for fila in vivo]:
+                raise SystemExit(f"❌ Los contadores de '{label}' no coinciden con las tareas.")
+            print(f"{label:<26} | {resumen_ms:>16.2f} | {vivo_ms:>16.2f} | {vivo_ms / resumen_ms:>10.1f}x")
+
+        print(f"\n{'escritura':<26} | {'con triggers':>16} | {'sin triggers':>16} | {'sobrecoste':>11}")
+        print("-" * 78)
+        for label, n in (("INSERT de 1 tarea", 1), ("INSERT de 10.000 tareas", 10000)):
+            tiempos = []
+            for activos in (True, False):
+                _con_triggers(conn, activos)
+                conn.commit()
+                ms, _ = _medir(conn, lambda: _insertar(conn, n, args.projects), args.repeat)
+                tiempos.append(ms)
+            _con_triggers(conn, True)
+            conn.commit()
+            print(f"{label:<26} | {tiempos[0]:>16.2f} | {tiempos[1]:>16.2f} | {tiempos[0] / tiempos[1]:>10.2f}x")
+    finally:
+        conn.rollback()
+        if not args.keep:
+            with conn.cursor() as cursor:
+                cursor.execute(f"DROP SCHEMA IF EXISTS {args.schema} CASCADE")
+            conn.commit()
+        conn.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, default=10000)
+    parser.add_argument("--tasks", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--schema", default="atlas_bench_summary")
+    parser.add_argument("--keep", action="store_true", help="No borrar el esquema al terminar")
+    main(parser.parse_args())
@@ -0,0 +1,192 @@
+# ATLAS/benchmarks/bench_tcp.py
+"""
+Prueba de carga del transporte TCP del Servidor MCP (server.py --tcp).
+
+Lanza un único proceso del servidor sobre un esquema de PostgreSQL aislado y poblado,
+y abre N sesiones concurrentes (una conexión TCP por sesión). Cada sesión se comporta
+como un usuario de chat: envía una petición, espera su respuesta, "piensa" --think-ms
+(el tiempo que en una conversación real se pasa esperando al LLM) y envía la siguiente
+(listar_tareas de un proyecto al azar o, con probabilidad --write-ratio,
+actualizar_estado_tarea de una tarea al azar). Para cada número de sesiones informa
+del rendimiento (peticiones/s), la escalabilidad respecto a una sesión y la latencia
+p50/p95/p99. Con --think-ms 0 mide la capacidad máxima del servidor, que depende de
+los núcleos disponibles para el servidor y PostgreSQL.
+
+Al final comprueba el cierre ordenado: envía SIGTERM con peticiones en vuelo y verifica
+que todas reciben respuesta y que el proceso termina con código 0.
+
+Uso (desde el directorio raíz, con las variables DB_* configuradas):
+    python -m benchmarks.bench_tcp [--sessions 1 2 4 8 16 32 64] [--duration 5] [--think-ms 100] [--write-ratio 0.2]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+from atlas_server.results import es_error
+from benchmarks.bench_e2e import _seed, _drop_schema, _percentile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def _start_server(schema: str, max_sessions: int) -> tuple[subprocess.Popen, int]:
+    env = os.environ.copy()
+    env.update({
+        "PYTHONPATH": os.pathsep.join([ROOT, env.get("PYTHONPATH", "")]),
+        "PGOPTIONS": f"-c search_path={schema},public",
+        "ATLAS_MAX_SESSIONS": str(max_sessions),
+        "PYTHONUNBUFFERED": "1",
+    })
+    process = subprocess.Popen(
+        [sys.executable, "-m", "atlas_server.server", "--tcp", "127.0.0.1:0"],
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, env=env,
+    )
+    # El servidor anuncia el puerto asignado cuando ya acepta conexiones
+    for line in process.stdout:
+        match = re.search(r"escuchando en [\d.]+:(\d+)", line)
+        if match:
+            # El resto de la salida se consume en segundo plano para que el servidor no se bloquee al escribir
+            threading.Thread(target=process.stdout.read, daemon=True).start()
+            return process, int(match.group(1))
+    raise SystemExit("❌ El Servidor MCP terminó antes de empezar a escuchar.")
+
+
+class _Client:
+    """Sesión del protocolo NDJSON sobre una conexión TCP (una petición en vuelo cada vez)."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.ids = 0
+
+    @classmethod
+    async def connect(cls, port: int) -> "_Client":
+        return cls(*await asyncio.open_connection("127.0.0.1", port))
+
+    async def call(self, function: str, arguments: dict) -> dict:
+        self.ids += 1
+        self.writer.write((json.dumps({"id": self.ids, "function": function, "arguments": arguments}) + "\n").encode())
+        await self.writer.drain()
+        response = json.loads(await self.reader.readline())
+        if response.get("id") != self.ids:
+            raise RuntimeError(f"respuesta de otra petición: {response}")
+        return response
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+def _next_request(rng: random.Random, n_projects: int, n_tasks: int, write_ratio: float) -> tuple[str, dict]:
+    if rng.random() < write_ratio:
+        return "actualizar_estado_tarea", {"tarea_id": rng.randint(1, n_tasks),
+                                           "nuevo_estado": rng.choice(("Pendiente", "En Progreso", "Hecha"))}
+    return "listar_tareas", {"project_name": f"proyecto-{rng.randint(1, n_projects):06d}", "page_size": 10}
+
+
+async def _session(port, session_id, deadline, args, latencies, errors):
+    rng = random.Random(session_id)
+    client = await _Client.connect(port)
+    try:
+        while time.perf_counter() < deadline:
+            function, arguments = _next_request(rng, args.projects, args.tasks, args.write_ratio)
+            start = time.perf_counter()
+            response = await client.call(function, arguments)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if "error" in response or es_error(response.get("result")):
+                errors.append(response)
+            await asyncio.sleep(rng.uniform(0.5, 1.5) * args.think_ms / 1000)
+    finally:
+        await client.close()
+
+
+async def _load(port: int, sessions: int, args) -> dict:
+    latencies, errors = [], []
+    start = time.perf_counter()
+    deadline = start + args.duration
+    await asyncio.gather(*(_session(port, i, deadline, args, latencies, errors) for i in range(sessions)))
+    elapsed = time.perf_counter() - start
+    return {
+        "sessions": sessions,
+        "requests": len(latencies),
+        "throughput": len(latencies) / elapsed,
+        "p50": _percentile(latencies, 50),
+        "p95": _percentile(latencies, 95),
+        "p99": _percentile(latencies, 99),
+        "errors": len(errors),
+    }
+
+
+async def _check_shutdown(process: subprocess.Popen, port: int, args) -> tuple[int, int, int]:
+    """Envía SIGTERM con peticiones en vuelo; devuelve (enviadas, respondidas, código de salida)."""
+    # Filtro por estado inexistente: recorre toda la tabla, así que las peticiones siguen en curso al llegar la señal
+    clients = [await _Client.connect(port) for _ in range(8)]
+    sent = 0
+    for client in clients:
+        for _ in range(4):
+            sent += 1
+            client.ids += 1
+            client.writer.write((json.dumps({"id": client.ids, "function": "listar_tareas",
+                                             "arguments": {"status": f"sin-coincidencias-{sent}"}}) + "\n").encode())
+        await client.writer.drain()
+    # Margen para que el servidor lea las peticiones del socket antes de la señal
+    await asyncio.sleep(0.02)
+    process.send_signal(signal.SIGTERM)
+
+    answered = 0
+    for client in clients:
+        while line := await client.reader.readline():
+            answered += "result" in json.loads(line)
+        client.writer.close()
+    code = await asyncio.get_running_loop().run_in_executor(None, process.wait, 30)
+    return sent, answered, code
+
+
+def main(args):
+    schema = args.schema
+    print(f"Poblando el esquema '{schema}'...")
+    _seed(schema, args.projects, args.tasks)
+    process, port = _start_server(schema, max(args.sessions) + 8)
+    print(f"Servidor MCP en el puerto {port}; {args.duration:g}s por nivel de carga, {args.think_ms:g} ms entre peticiones\n")
+
+    try:
+        results = []
+        print(f"{'sesiones':>8} | {'peticiones':>10} | {'req/s':>8} | {'escala':>6} | {'p50 ms':>7} | {'p95 ms':>7} | {'p99 ms':>7} | {'errores':>7}")
+        print("-" * 84)
+        for sessions in args.sessions:
+            result = asyncio.run(_load(port, sessions, args))
+            results.append(result)
+            scale = result["throughput"] / results[0]["throughput"]
+            print(f"{sessions:>8} | {result['requests']:>10} | {result['throughput']:>8.0f} | {scale:>5.1f}x | "
+                  f"{result['p50']:>7.2f} | {result['p95']:>7.2f} | {result['p99']:>7.2f} | {result['errors']:>7}")
+
+        sent, answered, code = asyncio.run(_check_shutdown(process, port, args))
+        status = "✅" if answered == sent and code == 0 else "❌"
+        print(f"\n{status} Cierre ordenado con SIGTERM: {answered}/{sent} peticiones en vuelo respondidas, código de salida {code}.")
+    finally:
+        if process.poll() is None:
+            process.kill()
+        process.wait()
+        if not args.keep:
+            _drop_schema(schema)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64])
+    parser.add_argument("--duration", type=float, default=5.0, help="Segundos de carga por nivel")
+    parser.add_argument("--think-ms", type=float, default=100.0, help="Pausa media entre peticiones de una sesión")
+    parser.add_argument("--write-ratio", type=float, default=0.2, help="Fracción de peticiones que escriben")
+    parser.add_argument("--projects", type=int, default=1000)
+    parser.add_argument("--tasks", type=int, default=100000)
+    parser.add_argument("--schema", default="atlas_bench_tcp")
+    parser.add_argument("--keep", action="store_true", help="No borrar el esquema al terminar")
+    main(parser.parse_args())
@@ -0,0 +1,100 @@
+# ATLAS/benchmarks/bench_tool_selection.py
+"""
+Selección local de herramientas (atlas_client/tool_selector.py) sobre un corpus etiquetado.
+
+Cada entrada de benchmarks/tool_selection_corpus.json tiene la frase del usuario y las
+herramientas que necesita el LLM para resolverla ([] si es conversación sin herramientas).
+Se añaden las frases resolubles de benchmarks/router_corpus.json.
+
+  - recall: frases cuyas herramientas esperadas están todas en el subconjunto enviado.
+    Con la lista completa es siempre 100%; cada fallo es una frase en la que el LLM ya
+    no podría elegir la herramienta correcta (la precisión de la selección empeoraría).
+  - primera: frases en las que la herramienta mejor puntuada es una de las esperadas.
+  - lista completa: frases sin selección fiable, que se envían con todas las herramientas.
+  - tokens: definiciones de herramientas enviadas por llamada frente a la lista completa.
+
+Con tiktoken instalado se cuentan con el tokenizador o200k_base; si no, con la
+estimación del historial del cliente (~4 caracteres por token).
+
+Uso (desde el directorio raíz):
+    python -m benchmarks.bench_tool_selection [--corpus ...] [--max 4] [--verbose]
+"""
+
+import argparse
+import json
+import os
+import time
+
+from atlas_client.tool_selector import ToolSelector, TOOL_SELECTION_MAX
+from atlas_server.manifest import load_tool_descriptions
+from benchmarks.bench_result_format import _contador
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), 'tool_selection_corpus.json')
+ROUTER_CORPUS_PATH = os.path.join(os.path.dirname(__file__), 'router_corpus.json')
+
+
+def _load_corpus(corpus_path: str) -> list[dict]:
+    with open(corpus_path, encoding='utf-8') as f:
+        corpus = json.load(f)
+    with open(ROUTER_CORPUS_PATH, encoding='utf-8') as f:
+        corpus += [{"text": entry["text"], "tools": [entry["expected"]["function"]]}
+                   for entry in json.load(f) if entry["expected"] is not None]
+    return corpus
+
+
+def main(corpus_path: str, max_selected: int, verbose: bool):
+    corpus = _load_corpus(corpus_path)
+    tools_list = [
+        {"type": "function", "function": {"name": tool["name"], "description": tool["description"], "parameters": tool["parameters"]}}
+        for tool in load_tool_descriptions()
+    ]
+    selector = ToolSelector(tools_list, enabled=True, max_selected=max_selected)
+    nombre_contador, contar = _contador()
+    tokens = {tool["function"]["name"]: contar(json.dumps(tool, ensure_ascii=False)) for tool in tools_list}
+    full_tokens = sum(tokens.values())
+
+    labeled = recalled = top_hits = fallbacks = sent_tools = sent_tokens = 0
+    failures = []
+    start = time.perf_counter()
+    selections = [(entry, selector.select_names(entry["text"])) for entry in corpus]
+    elapsed_us = (time.perf_counter() - start) * 1e6 / len(corpus)
+
+    for entry, names in selections:
+        expected = set(entry["tools"])
+        if names is None:
+            fallbacks += 1
+            names = list(tokens)
+        sent_tools += len(names)
+        sent_tokens += sum(tokens[name] for name in names)
+        if not expected:
+            continue
+        labeled += 1
+        if expected <= set(names):
+            recalled += 1
+        else:
+            failures.append((entry["text"], sorted(expected - set(names)), names))
+        scores = selector.scores(entry["text"])
+        top_hits += max(scores, key=scores.get) in expected
+
+    print(f"Frases: {len(corpus)} ({labeled} con herramientas esperadas) · herramientas: {len(tools_list)}")
+    print(f"Recall (herramientas esperadas enviadas): {recalled / labeled:.1%}")
+    print(f"Mejor puntuada correcta: {top_hits / labeled:.1%}")
+    print(f"Lista completa (sin selección fiable): {fallbacks} ({fallbacks / len(corpus):.0%})")
+    print(f"Herramientas por llamada: {sent_tools / len(corpus):.1f} de {len(tools_list)}")
+    print(f"Tokens de herramientas por llamada ({nombre_contador}): {sent_tokens / len(corpus):.0f} "
+          f"de {full_tokens} ({1 - sent_tokens / (full_tokens * len(corpus)):.0%} menos)")
+    print(f"Tiempo medio de selección: {elapsed_us:.0f} µs por frase")
+
+    if verbose and failures:
+        print()
+        for text, missing, names in failures:
+            print(f"[falta {', '.join(missing)}] {text!r}\n    enviadas: {names}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=CORPUS_PATH)
+    parser.add_argument("--max", type=int, default=TOOL_SELECTION_MAX, help="máximo de herramientas elegidas por puntuación")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+    main(args.corpus, args.max, args.verbose)
@@ -0,0 +1,97 @@
+# ATLAS/benchmarks/bench_transfer.py
+"""
+Exportación e importación masivas (atlas_server/transfer.py) con millones de filas.
+
+Puebla un repositorio aislado (esquema 'atlas_bench_transfer' de PostgreSQL o fichero
+SQLite temporal) con --tasks tareas repartidas en --projects proyectos y mide, en
+filas por segundo:
+
+  - referencia: crear las tareas con crear_proyecto_y_tareas (INSERT multi-fila por lotes).
+  - export jsonl / csv: fichero temporal con cursores de servidor.
+  - import: el fichero JSONL en el repositorio vacío (staging con COPY + fusión set-based).
+  - reimport: el fichero CSV sobre los mismos datos (todas las tareas ya existen).
+
+La memoria máxima del proceso (ru_maxrss) se muestra tras cada fase: con memoria
+constante no crece con el número de filas.
+
+Uso (desde el directorio raíz, con las variables DB_* configuradas para PostgreSQL):
+    python -m benchmarks.bench_transfer [--backend postgres|sqlite] [--projects 1000] [--tasks 1000000]
+"""
+
+import argparse
+import asyncio
+import os
+import resource
+import tempfile
+import time
+
+from benchmarks.repository_conformance import open_repository, BACKENDS
+from benchmarks.bench_search import VERBOS, OBJETOS, COMPLEMENTOS
+
+
+def _memoria_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def _fila(fase: str, filas: int, segundos: float, extra: str = ""):
+    print(f"{fase:<30} | {filas:>10,} | {segundos:>8.2f} | {filas / segundos:>12,.0f} | {_memoria_mb():>8.0f}{extra}")
+
+
+async def _poblar(repo, n_projects, n_tasks):
+    por_proyecto = max(1, n_tasks // n_projects)
+    start = time.perf_counter()
+    for i in range(n_projects):
+        tareas = (f"{VERBOS[(i + j) % len(VERBOS)]} {OBJETOS[j % len(OBJETOS)]} {COMPLEMENTOS[(i * j) % len(COMPLEMENTOS)]} #{j}"
+                  for j in range(por_proyecto))
+        await repo.crear_proyecto_y_tareas(f"bench-transfer {i}", tareas)
+    return n_projects * por_proyecto, time.perf_counter() - start
+
+
+async def _vaciar(repo):
+    """Deja el repositorio sin proyectos ni tareas (TRUNCATE en PostgreSQL)."""
+    if repo.name == "postgres":
+        from atlas_server.db_connector import run_in_transaction
+
+        def truncar(conn):
+            with conn.cursor() as cursor:
+                cursor.execute("TRUNCATE projects, tasks RESTART IDENTITY CASCADE")
+        await run_in_transaction(truncar)
+    else:
+        await repo._run(lambda conn: conn.execute("DELETE FROM projects"))
+
+
+async def _run(repo, args, directory):
+    from atlas_server import transfer
+
+    print(f"\nBackend: {repo.name} · {args.tasks:,} tareas en {args.projects:,} proyectos\n")
+    print(f"{'fase':<30} | {'filas':>10} | {'segundos':>8} | {'filas/s':>12} | {'RSS MB':>8}")
+    print("-" * 82)
+    filas, segundos = await _poblar(repo, args.projects, args.tasks)
+    _fila("referencia (INSERT por lotes)", filas, segundos)
+
+    ficheros = {}
+    for formato in transfer.FORMATOS:
+        ruta = os.path.join(directory, f"atlas.{formato}")
+        r = await transfer.exportar(repo, ruta, formato)
+        ficheros[formato] = ruta
+        _fila(f"export {formato}", r["filas"], r["segundos"], f"  ({os.path.getsize(ruta) / 2**20:,.0f} MB)")
+
+    await _vaciar(repo)
+    r = await transfer.importar(repo, ficheros["jsonl"], "jsonl")
+    _fila("import jsonl (vacío)", r["filas"], r["segundos"], f"  ({r['tareas_creadas']:,} tareas nuevas)")
+    r = await transfer.importar(repo, ficheros["csv"], "csv")
+    _fila("reimport csv (ya existen)", r["filas"], r["segundos"],
+          f"  ({r['tareas_creadas']:,} nuevas, {r['tareas_actualizadas']:,} actualizadas)")
+
+
+def main(args):
+    with tempfile.TemporaryDirectory(prefix="atlas-transfer-") as directory:
+        with open_repository(args.backend, schema="atlas_bench_transfer") as repo:
+            asyncio.run(_run(repo, args, directory))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=BACKENDS, default="postgres")
+    parser.add_argument("--projects", type=int, default=1000)
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    main(parser.parse_args())
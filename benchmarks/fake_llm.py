@@ -0,0 +1,166 @@
+# ATLAS/benchmarks/fake_llm.py
+"""
+Servidor local compatible con la API de OpenAI (POST /chat/completions) que sustituye
+al LLM en los benchmarks. No genera nada: reproduce respuestas guionizadas.
+
+El guion asocia el texto de cada mensaje de usuario con lo que el "modelo" responde:
+
+    {"listar proyectos": {"tool_calls": [{"name": "listar_proyectos", "arguments": {}}],
+                          "final": "Estos son tus proyectos."}}
+
+  - Si el último mensaje es del usuario y el guion tiene 'tool_calls', se devuelven esas
+    llamadas a herramientas; si no, se devuelve 'final' como texto.
+  - Si el último mensaje es una respuesta 'tool', se devuelve 'final' del último usuario.
+
+Admite respuestas normales y en streaming (SSE, stream=True), troceando el texto y los
+argumentos como haría el servicio real, con una latencia simulada configurable.
+
+Uso independiente (desde el directorio raíz):
+    python -m benchmarks.fake_llm --script guion.json [--port 8765] [--ttft-ms 300]
+"""
+
+import argparse
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_REPLY = "De acuerdo."
+
+
+class FakeLLMServer(ThreadingHTTPServer):
+    """
+    `ttft_ms`: espera antes del primer fragmento (latencia de red + prefill).
+    `chunk_ms`: espera entre fragmentos (velocidad de generación).
+    """
+
+    daemon_threads = True
+
+    def __init__(self, script: dict, host: str = "127.0.0.1", port: int = 0,
+                 ttft_ms: float = 300.0, chunk_ms: float = 10.0):
+        super().__init__((host, port), _Handler)
+        self.script = script
+        self.ttft_ms = ttft_ms
+        self.chunk_ms = chunk_ms
+        self.requests = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "FakeLLMServer":
+        threading.Thread(target=self.serve_forever, name="fake-llm", daemon=True).start()
+        return self
+
+    def next_id(self) -> int:
+        with self._lock:
+            self.requests += 1
+            return next(self._ids)
+
+    def plan(self, messages: list[dict], tools_offered: bool) -> dict:
+        """Decide la respuesta: {"content": str} o {"tool_calls": [...]}."""
+        last_user = next((m for m in reversed(messages) if m.get("role") == "user"), None)
+        entry = self.script.get((last_user or {}).get("content", ""), {})
+        if messages and messages[-1].get("role") == "user" and tools_offered and entry.get("tool_calls"):
+            return {"tool_calls": entry["tool_calls"]}
+        return {"content": entry.get("final", DEFAULT_REPLY)}
+
+
+def _chunks(text: str, size: int = 16):
+    return [text[i:i + size] for i in range(0, len(text), size)] or [""]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: FakeLLMServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_error(404)
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        request_id = self.server.next_id()
+        plan = self.server.plan(body.get("messages", []), bool(body.get("tools")))
+        time.sleep(self.server.ttft_ms / 1000)
+        if body.get("stream"):
+            self._stream(body, request_id, plan)
+        else:
+            self._complete(body, request_id, plan)
+
+    def _base(self, body: dict, request_id: int, obj: str) -> dict:
+        return {"id": f"chatcmpl-{request_id}", "object": obj, "created": int(time.time()),
+                "model": body.get("model", "fake")}
+
+    def _tool_calls(self, request_id: int, plan: dict) -> list[dict]:
+        return [
+            {"id": f"call_{request_id}_{index}", "type": "function",
+             "function": {"name": call["name"], "arguments": json.dumps(call.get("arguments", {}), ensure_ascii=False)}}
+            for index, call in enumerate(plan["tool_calls"])
+        ]
+
+    def _complete(self, body: dict, request_id: int, plan: dict):
+        message = {"role": "assistant", "content": plan.get("content")}
+        if "tool_calls" in plan:
+            message["tool_calls"] = self._tool_calls(request_id, plan)
+        response = self._base(body, request_id, "chat.completion")
+        response["choices"] = [{"index": 0, "message": message,
+                                "finish_reason": "tool_calls" if "tool_calls" in plan else "stop"}]
+        response["usage"] = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+        data = json.dumps(response).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream(self, body: dict, request_id: int, plan: dict):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        def send(delta: dict, finish_reason=None):
+            chunk = self._base(body, request_id, "chat.completion.chunk")
+            chunk["choices"] = [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+            self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode())
+            self.wfile.flush()
+
+        send({"role": "assistant", "content": ""})
+        if "tool_calls" in plan:
+            for index, call in enumerate(self._tool_calls(request_id, plan)):
+                send({"tool_calls": [{"index": index, "id": call["id"], "type": "function",
+                                      "function": {"name": call["function"]["name"], "arguments": ""}}]})
+                for fragment in _chunks(call["function"]["arguments"]):
+                    time.sleep(self.server.chunk_ms / 1000)
+                    send({"tool_calls": [{"index": index, "function": {"arguments": fragment}}]})
+            send({}, "tool_calls")
+        else:
+            for fragment in _chunks(plan["content"]):
+                time.sleep(self.server.chunk_ms / 1000)
+                send({"content": fragment})
+            send({}, "stop")
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--script", required=True, help="JSON con el guion {texto del usuario: respuesta}")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--ttft-ms", type=float, default=300.0)
+    parser.add_argument("--chunk-ms", type=float, default=10.0)
+    args = parser.parse_args()
+    with open(args.script, encoding='utf-8') as f:
+        script = json.load(f)
+    server = FakeLLMServer(script, port=args.port, ttft_ms=args.ttft_ms, chunk_ms=args.chunk_ms)
+    print(f"🤖 LLM simulado escuchando en {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
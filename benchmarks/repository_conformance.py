@@ -0,0 +1,97 @@
+# ATLAS/benchmarks/repository_conformance.py
+"""
+Instancias aisladas y vacías de cada backend de almacenamiento, para los benchmarks
+y para las pruebas de conformidad (tests/test_repository.py).
+
+PostgreSQL usa un esquema propio en la base de datos de las variables DB_*; SQLite,
+un fichero temporal. Ambos se eliminan al terminar.
+
+Uso (desde el directorio raíz; equivale a python -m pytest tests/test_repository.py):
+    python -m benchmarks.repository_conformance [--backend postgres|sqlite|all]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+
+from atlas_server.repository import create_repository
+
+BACKENDS = ("postgres", "sqlite")
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+TESTS_PATH = os.path.join(ROOT, "tests", "test_repository.py")
+
+
+# --- 1. Instancias aisladas de cada backend ---
+
+def _reset_postgres_schema(schema: str, drop_only: bool = False):
+    from atlas_server.db_connector import get_db_connection
+
+    conn = get_db_connection()
+    if conn is None:
+        raise ConnectionError("no se pudo conectar a PostgreSQL (revisa las variables DB_*)")
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+            if not drop_only:
+                cursor.execute(f"CREATE SCHEMA {schema}")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+@contextmanager
+def open_repository(backend: str, schema: str = "atlas_conformance"):
+    """Repositorio vacío y ya inicializado del backend indicado; se borra al salir."""
+    if backend == "sqlite":
+        from atlas_server.repository_sqlite import SqliteRepository
+
+        directory = tempfile.TemporaryDirectory(prefix="atlas-sqlite-")
+        repository = SqliteRepository(os.path.join(directory.name, "atlas.db"))
+        try:
+            repository.initialize()
+            yield repository
+        finally:
+            repository.close()
+            directory.cleanup()
+        return
+
+    # Todas las conexiones del pool heredan el search_path del esquema aislado
+    pgoptions = os.environ.get("PGOPTIONS")
+    os.environ["PGOPTIONS"] = f"-c search_path={schema},public"
+    _reset_postgres_schema(schema)
+    repository = create_repository(backend)
+    try:
+        repository.initialize()
+        yield repository
+    finally:
+        # close() descarta el pool: el siguiente repositorio abre conexiones con sus PGOPTIONS
+        repository.close()
+        _reset_postgres_schema(schema, drop_only=True)
+        if pgoptions is None:
+            os.environ.pop("PGOPTIONS", None)
+        else:
+            os.environ["PGOPTIONS"] = pgoptions
+
+
+def postgres_disponible() -> bool:
+    """¿Hay un servidor PostgreSQL accesible con las variables DB_*?"""
+    from atlas_server.db_connector import get_db_connection
+
+    conn = get_db_connection()
+    if conn is None:
+        return False
+    conn.close()
+    return True
+
+
+if __name__ == '__main__':
+    import pytest
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=BACKENDS + ("all",), default="all")
+    args = parser.parse_args()
+    seleccion = [] if args.backend == "all" else ["-k", args.backend]
+    sys.exit(pytest.main(["-q", "--rootdir", ROOT, TESTS_PATH, *seleccion]))
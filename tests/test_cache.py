@@ -0,0 +1,170 @@
+# ATLAS/tests/test_cache.py
+"""
+Caché de resultados de las herramientas de solo lectura (ResultCache): invalidación
+por las tablas que declaran las herramientas (reads/writes en TOOL_REGISTRY),
+caducidad, expulsión LRU y filtrado de las notificaciones propias en ChangeListener.
+
+Uso (desde el directorio raíz):
+    python -m pytest tests/test_cache.py
+"""
+
+import time
+import types
+
+import pytest
+
+from atlas_server import cache as cache_module
+from atlas_server.cache import ResultCache, ChangeListener
+from atlas_server.tools import TOOL_REGISTRY
+
+ESCRITURAS = sorted(name for name, func in TOOL_REGISTRY.items() if func.writes)
+
+
+def _leer(cache, nombre, valor, **argumentos):
+    """Lectura como en server.execute_tool_call: generación antes de ejecutar y put después."""
+    func = TOOL_REGISTRY[nombre]
+    key = ResultCache.make_key(func, argumentos)
+    generation = cache.generation(func.reads)
+    cache.put(key, valor, func.reads, generation)
+    return key
+
+
+def _escribir(cache, nombre):
+    cache.invalidate(TOOL_REGISTRY[nombre].writes)
+
+
+# --- 1. Invalidación por tablas ---
+
+@pytest.mark.parametrize("lectura", ["listar_tareas", "resumen_proyectos"])
+@pytest.mark.parametrize("escritura", ESCRITURAS)
+def test_escritura_invalida_los_listados(escritura, lectura):
+    cache = ResultCache()
+    key = _leer(cache, lectura, "resultado")
+    assert cache.get(key) == "resultado"
+    _escribir(cache, escritura)
+    assert cache.get(key) is None
+
+
+def test_escritura_sobre_otra_tabla_conserva_la_entrada():
+    cache = ResultCache()
+    proyectos = _leer(cache, "listar_proyectos", "proyectos")
+    tareas = _leer(cache, "listar_tareas", "tareas", project_name="Web")
+    # actualizar_estado_tarea solo escribe en 'tasks'; listar_proyectos solo lee 'projects'
+    _escribir(cache, "actualizar_estado_tarea")
+    assert cache.get(proyectos) == "proyectos"
+    assert cache.get(tareas) is None
+
+
+def test_lectura_en_curso_durante_una_escritura_no_se_guarda():
+    cache = ResultCache()
+    func = TOOL_REGISTRY["listar_tareas"]
+    key = ResultCache.make_key(func, {})
+    generation = cache.generation(func.reads)
+    _escribir(cache, "eliminar_tarea")
+    cache.put(key, "obsoleto", func.reads, generation)
+    assert cache.get(key) is None
+
+
+def test_clear_descarta_las_lecturas_en_curso():
+    cache = ResultCache()
+    func = TOOL_REGISTRY["listar_proyectos"]
+    key = ResultCache.make_key(func, {})
+    generation = cache.generation(func.reads)
+    cache.clear()
+    cache.put(key, "obsoleto", func.reads, generation)
+    assert cache.get(key) is None
+
+
+def test_clave_normalizada():
+    func = TOOL_REGISTRY["listar_tareas"]
+    assert ResultCache.make_key(func, {"project_name": "  Web "}) == ResultCache.make_key(func, {"project_name": "web"})
+
+
+# --- 2. Caducidad y tamaño ---
+
+def test_entrada_caducada():
+    cache = ResultCache(ttl=0.01)
+    key = _leer(cache, "listar_proyectos", "proyectos")
+    time.sleep(0.02)
+    assert cache.get(key) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_expulsion_lru():
+    cache = ResultCache(max_entries=2)
+    web = _leer(cache, "listar_tareas", "web", project_name="Web")
+    app = _leer(cache, "listar_tareas", "app", project_name="App")
+    # Acceder a 'web' la hace la más reciente: la siguiente entrada expulsa a 'app'
+    assert cache.get(web) == "web"
+    api = _leer(cache, "listar_tareas", "api", project_name="API")
+    assert cache.get(app) is None
+    assert cache.get(web) == "web"
+    assert cache.get(api) == "api"
+    assert cache.stats()["entries"] == 2
+
+
+# --- 3. Notificaciones de otros procesos ---
+
+class _Notificacion:
+    def __init__(self, pid, payload):
+        self.pid = pid
+        self.payload = payload
+
+
+class _ConexionSimulada:
+    """Conexión LISTEN con notificaciones ya recibidas."""
+
+    def __init__(self, notifies):
+        self.notifies = list(notifies)
+        self.autocommit = False
+
+    def cursor(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, statement):
+        pass
+
+    def poll(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class _PoolSimulado:
+    def __init__(self, pids):
+        self.pids = set(pids)
+
+    def owns_backend(self, pid):
+        return pid in self.pids
+
+
+def test_listener_ignora_las_notificaciones_del_propio_pool(monkeypatch):
+    cache = ResultCache()
+    proyectos = _leer(cache, "listar_proyectos", "proyectos")
+    tareas = _leer(cache, "listar_tareas", "tareas")
+    listener = ChangeListener(cache, poll_interval=0)
+    conexion = _ConexionSimulada([_Notificacion(101, "projects"), _Notificacion(202, "tasks")])
+
+    def select(rlist, wlist, xlist, timeout):
+        # Una sola ronda de notificaciones; en la siguiente espera el hilo termina
+        if not conexion.notifies:
+            listener.stop()
+            return [], [], []
+        return rlist, [], []
+
+    monkeypatch.setattr(cache_module.psycopg2, "connect", lambda **config: conexion)
+    monkeypatch.setattr(cache_module, "select", types.SimpleNamespace(select=select))
+    monkeypatch.setattr(cache_module, "get_pool", lambda: _PoolSimulado({101}))
+
+    listener._listen()
+
+    # 'projects' lo cambió una conexión propia (101), ya invalidada al escribir; 'tasks', otro proceso
+    assert cache.get(proyectos) == "proyectos"
+    assert cache.get(tareas) is None
@@ -0,0 +1,93 @@
+# ATLAS/tests/test_client.py
+"""
+Orden de ejecución de las llamadas a herramientas de una misma respuesta del LLM
+(ToolCallDispatcher), con call_mcp_tool sustituido por un servidor simulado, y
+contabilidad del enrutador en los turnos del LLM que fallan.
+
+Uso (desde el directorio raíz):
+    python -m pytest tests/test_client.py
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("openai")
+# El cliente crea el cliente de OpenAI al importarse: basta con una credencial cualquiera
+os.environ.setdefault("GIT_TOKEN", "test")
+
+from atlas_client import client
+
+
+@pytest.fixture
+def registro(monkeypatch):
+    """Sustituye el servidor MCP: cada llamada anota su inicio y su fin y tarda `duracion`."""
+    eventos, lock = [], threading.Lock()
+    duracion = {"listar_tareas": 0.05, "listar_proyectos": 0.05}
+
+    def call_mcp_tool(command, timeout=None, timings=None):
+        nombre = json.loads(command)["function"]
+        with lock:
+            eventos.append(("inicio", nombre))
+        time.sleep(duracion.get(nombre, 0.01))
+        with lock:
+            eventos.append(("fin", nombre))
+        return f"✅ {nombre}"
+
+    monkeypatch.setattr(client, "call_mcp_tool", call_mcp_tool)
+    return eventos
+
+
+def _ejecutar(*nombres):
+    llamadas = [{"id": str(i), "type": "function", "function": {"name": nombre, "arguments": "{}"}}
+                for i, nombre in enumerate(nombres)]
+    return asyncio.run(client.execute_tool_calls(llamadas))
+
+
+def _posicion(eventos, evento, nombre):
+    return eventos.index((evento, nombre))
+
+
+def test_escritura_espera_a_la_lectura_anterior(registro):
+    # "lista las tareas del proyecto X y elimina la tarea 4": el listado no ve el borrado
+    _ejecutar("listar_tareas", "eliminar_tarea")
+    assert _posicion(registro, "fin", "listar_tareas") < _posicion(registro, "inicio", "eliminar_tarea"), registro
+
+
+def test_lectura_espera_a_la_escritura_anterior(registro):
+    _ejecutar("eliminar_tarea", "listar_tareas")
+    assert _posicion(registro, "fin", "eliminar_tarea") < _posicion(registro, "inicio", "listar_tareas"), registro
+
+
+def test_escrituras_en_orden(registro):
+    _ejecutar("actualizar_estado_tarea", "eliminar_tarea")
+    assert registro == [("inicio", "actualizar_estado_tarea"), ("fin", "actualizar_estado_tarea"),
+                        ("inicio", "eliminar_tarea"), ("fin", "eliminar_tarea")], registro
+
+
+def test_lecturas_consecutivas_en_paralelo(registro):
+    mensajes = _ejecutar("listar_tareas", "listar_proyectos", "eliminar_tarea")
+    # Las dos lecturas empiezan antes de que termine ninguna; la escritura espera a ambas
+    assert {evento for evento, _ in registro[:2]} == {"inicio"}, registro
+    assert registro[-2:] == [("inicio", "eliminar_tarea"), ("fin", "eliminar_tarea")], registro
+    # Los mensajes 'tool' conservan el orden de envío
+    assert [mensaje["name"] for mensaje in mensajes] == ["listar_tareas", "listar_proyectos", "eliminar_tarea"]
+
+
+def test_turno_fallido_cuenta_como_fallo_del_enrutador(monkeypatch):
+    async def stream_completion(*args, **kwargs):
+        raise RuntimeError("API no disponible")
+
+    monkeypatch.setattr(client, "stream_completion", stream_completion)
+    monkeypatch.setattr(client, "router", client.IntentRouter(client.TOOLS_LIST, enabled=True))
+    history = client.ConversationHistory("sistema")
+
+    turn = asyncio.run(client.process_turn("¿qué tareas vencen esta semana?", history))
+
+    assert turn["route"] == "error"
+    assert history.turns == []
+    assert (client.router.attempts, client.router.llm_turns) == (1, 1)
@@ -0,0 +1,101 @@
+# ATLAS/tests/test_history.py
+"""
+Compactación del historial de la conversación (ConversationHistory): resumen de las
+salidas de herramientas antiguas, descarte de turnos completos sin separar un
+tool_call de su respuesta y descarte del último turno tras un fallo.
+
+Uso (desde el directorio raíz):
+    python -m pytest tests/test_history.py
+"""
+
+from atlas_client.history import ConversationHistory, estimate_tokens, summarize_tool_output, TOOL_SUMMARY_CHARS
+
+SALIDA = "\n".join(["📋 Tareas del proyecto Web:"] + [f"- [{i}] Tarea {i} (Pendiente)" for i in range(40)])
+
+
+def _turno(history, numero, salida=SALIDA):
+    """Un turno con una llamada a herramienta: user, assistant(tool_calls), tool y respuesta final."""
+    history.add({"role": "user", "content": f"lista las tareas ({numero})"})
+    history.add_tool_exchange(f"call_{numero}", "listar_tareas", {"project_name": "Web"}, salida)
+
+
+def _comprobar_pares(history):
+    """Cada tool_call del asistente tiene su respuesta 'tool' en el historial, y viceversa."""
+    llamadas, respuestas = set(), set()
+    for message in history.messages:
+        llamadas.update(tool_call["id"] for tool_call in message.get("tool_calls") or [])
+        if message["role"] == "tool":
+            respuestas.add(message["tool_call_id"])
+    assert llamadas == respuestas
+
+
+def test_resumen_de_salida():
+    assert summarize_tool_output(SALIDA) == "📋 Tareas del proyecto Web: (… 40 líneas omitidas)"
+    assert summarize_tool_output("✅ Tarea creada") == "✅ Tarea creada"
+    assert summarize_tool_output("") == ""
+    assert len(summarize_tool_output("x" * 1000)) == TOOL_SUMMARY_CHARS
+
+
+def test_sin_superar_el_presupuesto_no_se_compacta():
+    history = ConversationHistory("sistema", token_budget=100_000, keep_turns=1)
+    for numero in range(3):
+        _turno(history, numero)
+    assert history.compact() == 0
+    assert len(history.turns) == 3
+
+
+def test_resume_las_salidas_de_los_turnos_antiguos():
+    history = ConversationHistory("sistema", keep_turns=2)
+    for numero in range(3):
+        _turno(history, numero)
+    # Basta con resumir la salida del turno más antiguo: no se descarta ninguno
+    history.token_budget = history.token_count() - 1
+    ahorrado = history.compact()
+
+    assert ahorrado > 0
+    assert len(history.turns) == 3
+    salidas = [message["content"] for message in history.messages if message["role"] == "tool"]
+    assert salidas == ["📋 Tareas del proyecto Web: (… 40 líneas omitidas)", SALIDA, SALIDA]
+    assert history.dropped_turns == 0
+
+
+def test_descarta_turnos_completos():
+    history = ConversationHistory("sistema", token_budget=1, keep_turns=2)
+    for numero in range(5):
+        _turno(history, numero)
+    ahorrado = history.compact()
+
+    assert ahorrado > 0
+    assert history.dropped_turns == 3
+    assert len(history.turns) == 2
+    assert history.messages[0] == {"role": "system", "content": "sistema"}
+    # Los turnos conservados empiezan por su mensaje 'user' y mantienen juntas llamada y respuesta
+    assert [turn[0]["content"] for turn in history.turns] == ["lista las tareas (3)", "lista las tareas (4)"]
+    _comprobar_pares(history)
+
+
+def test_descarte_hasta_caber_en_el_presupuesto():
+    history = ConversationHistory("sistema", token_budget=1, keep_turns=1)
+    for numero in range(4):
+        _turno(history, numero, salida="✅ una línea")
+    # Presupuesto para todo salvo el turno más antiguo
+    history.token_budget = history.token_count() - sum(map(estimate_tokens, history.turns[0]))
+    history.compact()
+
+    assert history.token_count() <= history.token_budget
+    assert history.dropped_turns == 1
+    assert history.turns[0][0]["content"] == "lista las tareas (1)"
+    _comprobar_pares(history)
+
+
+def test_descartar_el_ultimo_turno():
+    history = ConversationHistory("sistema")
+    _turno(history, 0)
+    history.add({"role": "user", "content": "¿y las del proyecto App?"})
+    history.discard_last_turn()
+
+    assert len(history.turns) == 1
+    assert history.messages[-1] == {"role": "assistant", "content": SALIDA}
+    history.discard_last_turn()
+    history.discard_last_turn()
+    assert history.messages == [{"role": "system", "content": "sistema"}]
@@ -0,0 +1,46 @@
+# ATLAS/tests/test_mcp_session.py
+"""
+Sesión TCP con el Servidor MCP ante una conexión reiniciada por el servidor
+(ECONNRESET): las peticiones en vuelo deben fallar en el acto, no por tiempo de espera.
+
+Uso (desde el directorio raíz):
+    python -m pytest tests/test_mcp_session.py
+"""
+
+import socket
+import struct
+import threading
+import time
+
+import pytest
+
+from atlas_client.mcp_session import TCPSession
+
+
+@pytest.fixture
+def servidor_que_reinicia():
+    """Servidor TCP que lee una petición y cierra con RST (SO_LINGER a 0) sin responder."""
+    servidor = socket.create_server(("127.0.0.1", 0))
+
+    def atender():
+        conexion, _ = servidor.accept()
+        with conexion:
+            conexion.makefile("r").readline()
+            conexion.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+
+    hilo = threading.Thread(target=atender, daemon=True)
+    hilo.start()
+    yield f"127.0.0.1:{servidor.getsockname()[1]}"
+    hilo.join(timeout=1)
+    servidor.close()
+
+
+def test_conexion_reiniciada_falla_las_peticiones_pendientes(servidor_que_reinicia):
+    session = TCPSession(servidor_que_reinicia, request_timeout=5)
+    inicio = time.perf_counter()
+    try:
+        with pytest.raises(ConnectionError):
+            session.request({"control": "stats"})
+    finally:
+        session.close()
+    assert time.perf_counter() - inicio < 1
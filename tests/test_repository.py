@@ -0,0 +1,433 @@
+# ATLAS/tests/test_repository.py
+"""
+Conformidad de los backends de almacenamiento: el mismo conjunto de casos se ejecuta
+contra PostgreSQL y contra SQLite, y ambos deben dar los mismos resultados (IDs,
+filtros, paginación, cascadas, errores y atomicidad).
+
+PostgreSQL usa un esquema aislado ('atlas_test') en la base de datos de las variables
+DB_*, y se omite si no hay servidor; SQLite, un fichero temporal. Ambos se eliminan
+al terminar.
+
+Uso (desde el directorio raíz):
+    python -m pytest [-k sqlite]
+"""
+
+import asyncio
+import datetime
+import functools
+
+import pytest
+
+from atlas_server.repository import DuplicateNameError, PlanStepError
+from atlas_server.project_index import ProjectIndex, ProjectNotFoundError, AmbiguousProjectError
+from benchmarks.repository_conformance import open_repository, postgres_disponible, BACKENDS
+
+
+# --- 1. Repositorio de cada backend ---
+
+@pytest.fixture(scope="module", params=BACKENDS)
+def repo(request):
+    """Un repositorio vacío por backend, compartido por todos los casos del módulo."""
+    if request.param == "postgres" and not postgres_disponible():
+        pytest.skip("PostgreSQL no disponible (revisa las variables DB_*)")
+    with open_repository(request.param, schema="atlas_test") as repository:
+        yield repository
+
+
+def caso(func):
+    """Los casos son corrutinas: cada test ejecuta el suyo en un bucle de eventos propio."""
+    @functools.wraps(func)
+    def test(repo):
+        asyncio.run(func(repo))
+    return test
+
+
+# --- 2. Casos ---
+# Cada caso usa nombres de proyecto propios, así que son independientes entre sí.
+
+async def _raises(coro, exc_type=Exception) -> bool:
+    try:
+        await coro
+    except exc_type:
+        return True
+    return False
+
+
+@caso
+async def test_crear_proyecto_con_tareas(repo):
+    project_id, task_ids = await repo.crear_proyecto_y_tareas("conf-alta", iter(["a", "b", "c"]))
+    assert len(task_ids) == 3 and task_ids == sorted(task_ids), task_ids
+    filas, siguiente = await repo.listar_tareas("conf-alta", None)
+    assert filas == [(task_ids[0], "a", "Pendiente", "conf-alta"),
+                     (task_ids[1], "b", "Pendiente", "conf-alta"),
+                     (task_ids[2], "c", "Pendiente", "conf-alta")], filas
+    assert siguiente is None
+
+
+@caso
+async def test_crear_proyecto_sin_tareas(repo):
+    project_id, task_ids = await repo.crear_proyecto_y_tareas("conf-vacio", iter([]))
+    assert isinstance(project_id, int) and task_ids == []
+
+
+@caso
+async def test_nombre_duplicado(repo):
+    await repo.crear_proyecto_y_tareas("conf-dup", iter(["x"]))
+    assert await _raises(repo.crear_proyecto_y_tareas("conf-dup", iter(["y"])), DuplicateNameError)
+    filas, _ = await repo.listar_tareas("conf-dup", None)
+    assert [fila[1] for fila in filas] == ["x"], filas
+
+
+@caso
+async def test_insercion_por_lotes(repo):
+    # Más de un lote de BULK_INSERT_BATCH_SIZE
+    _, task_ids = await repo.crear_proyecto_y_tareas("conf-lotes", (f"t{i}" for i in range(2500)))
+    assert len(task_ids) == 2500
+    assert task_ids == list(range(task_ids[0], task_ids[0] + 2500)), "IDs no consecutivos"
+
+
+@caso
+async def test_crear_tarea_y_proyecto_inexistente(repo):
+    project_id, _ = await repo.crear_proyecto_y_tareas("conf-crear", iter([]))
+    task_id = await repo.crear_tarea(project_id, "nueva")
+    filas, _ = await repo.listar_tareas("conf-crear", None)
+    assert filas == [(task_id, "nueva", "Pendiente", "conf-crear")], filas
+    assert await _raises(repo.crear_tarea(10**9, "huérfana"))
+
+
+@caso
+async def test_longitud_maxima(repo):
+    project_id, _ = await repo.crear_proyecto_y_tareas("conf-longitud", iter([]))
+    assert await _raises(repo.crear_tarea(project_id, "x" * 256))
+    assert await repo.crear_tarea(project_id, "x" * 255)
+
+
+@caso
+async def test_atomicidad(repo):
+    # Una tarea inválida revierte también el proyecto y las tareas anteriores
+    assert await _raises(repo.crear_proyecto_y_tareas("conf-atomico", iter(["ok", "x" * 300])))
+    filas, _ = await repo.listar_proyectos("conf-atomico")
+    assert filas == [], filas
+
+
+@caso
+async def test_actualizar_estado(repo):
+    _, (task_id,) = await repo.crear_proyecto_y_tareas("conf-estado", iter(["t"]))
+    assert await repo.actualizar_estado(task_id, "Hecha") is True
+    assert await repo.actualizar_estado(10**9, "Hecha") is False
+    filas, _ = await repo.listar_tareas("conf-estado", "hecha")
+    assert [fila[2] for fila in filas] == ["Hecha"], filas
+
+
+@caso
+async def test_recordatorios(repo):
+    primero, project_id = await repo.crear_recordatorio("llamar")
+    segundo, mismo_proyecto = await repo.crear_recordatorio("escribir")
+    assert mismo_proyecto == project_id
+    filas, _ = await repo.listar_tareas("Recordatorios", "Recordatorio")
+    assert [(fila[0], fila[1]) for fila in filas] == [(primero, "llamar"), (segundo, "escribir")], filas
+    proyectos, _ = await repo.listar_proyectos("Recordatorios")
+    assert [fila[0] for fila in proyectos] == [project_id], proyectos
+
+
+@caso
+async def test_paginacion(repo):
+    _, task_ids = await repo.crear_proyecto_y_tareas("conf-paginas", iter(["1", "2", "3", "4", "5"]))
+    vistos, after_id = [], None
+    while True:
+        filas, after_id = await repo.listar_tareas("conf-paginas", None, after_id, 2)
+        assert len(filas) <= 2
+        vistos.extend(fila[0] for fila in filas)
+        if after_id is None:
+            break
+    assert vistos == task_ids, vistos
+
+
+@caso
+async def test_filtros_parciales_sin_mayusculas(repo):
+    _, task_ids = await repo.crear_proyecto_y_tareas("Conf-Filtros-Web", iter(["a", "b"]))
+    await repo.actualizar_estado(task_ids[0], "En Progreso")
+    filas, _ = await repo.listar_tareas("FILTROS-web", "progre")
+    assert [fila[0] for fila in filas] == [task_ids[0]], filas
+
+
+@caso
+async def test_listar_proyectos(repo):
+    ids = [(await repo.crear_proyecto_y_tareas(f"conf-lista-{i}", iter([])))[0] for i in range(3)]
+    filas, siguiente = await repo.listar_proyectos("conf-lista-", None, 2)
+    assert [fila[0] for fila in filas] == ids[:2] and siguiente == ids[1], (filas, siguiente)
+    filas, siguiente = await repo.listar_proyectos("CONF-LISTA-", siguiente, 2)
+    assert [fila[1] for fila in filas] == ["conf-lista-2"] and siguiente is None, filas
+    assert isinstance(filas[0][2], datetime.datetime), type(filas[0][2])
+
+
+@caso
+async def test_actualizar_estados_por_ids(repo):
+    _, task_ids = await repo.crear_proyecto_y_tareas("conf-lote-ids", iter(["a", "b", "c"]))
+    await repo.actualizar_estado(task_ids[1], "Bloqueada")
+    filas = await repo.actualizar_estados("Hecha", [task_ids[1], task_ids[0], 10**9], None, None)
+    assert filas == [(task_ids[0], "Pendiente"), (task_ids[1], "Bloqueada")], filas
+    filas, _ = await repo.listar_tareas("conf-lote-ids", "Hecha")
+    assert [fila[0] for fila in filas] == task_ids[:2], filas
+
+
+@caso
+async def test_actualizar_estados_por_filtro(repo):
+    project_id, task_ids = await repo.crear_proyecto_y_tareas("conf-lote-filtro", iter(["a", "b", "c"]))
+    await repo.actualizar_estado(task_ids[2], "Hecha")
+    # estado_actual es exacto salvo mayúsculas
+    filas = await repo.actualizar_estados("En Progreso", None, project_id, "pendiente")
+    assert filas == [(task_ids[0], "Pendiente"), (task_ids[1], "Pendiente")], filas
+    assert await repo.actualizar_estados("Hecha", None, project_id, "Pendi") == []
+
+
+@caso
+async def test_borrar_tareas(repo):
+    project_id, task_ids = await repo.crear_proyecto_y_tareas("conf-borrar-lote", iter(["a", "b", "c"]))
+    filas = await repo.borrar_tareas([task_ids[2], task_ids[0]], project_id, None)
+    assert filas == [(task_ids[0], "a"), (task_ids[2], "c")], filas
+    assert await repo.borrar_tarea(task_ids[1]) == "b"
+    assert await repo.borrar_tarea(task_ids[1]) is None
+    filas, _ = await repo.listar_tareas("conf-borrar-lote", None)
+    assert filas == [], filas
+
+
+@caso
+async def test_borrar_proyecto_en_cascada(repo):
+    project_id, task_ids = await repo.crear_proyecto_y_tareas("conf-cascada", iter(["a", "b"]))
+    assert await repo.borrar_proyecto(project_id) == "conf-cascada"
+    assert await repo.borrar_proyecto(project_id) is None
+    assert await repo.borrar_tareas(task_ids, None, None) == []
+
+
+@caso
+async def test_ids_no_reutilizados(repo):
+    project_id, (task_id,) = await repo.crear_proyecto_y_tareas("conf-ids", iter(["a"]))
+    await repo.borrar_proyecto(project_id)
+    nuevo_proyecto, (nueva_tarea,) = await repo.crear_proyecto_y_tareas("conf-ids", iter(["a"]))
+    assert nuevo_proyecto > project_id and nueva_tarea > task_id
+
+
+@caso
+async def test_transacciones_concurrentes(repo):
+    project_id, _ = await repo.crear_proyecto_y_tareas("conf-concurrencia", iter([]))
+    ids = await asyncio.gather(*(repo.crear_tarea(project_id, f"c{i}") for i in range(20)))
+    assert len(set(ids)) == 20
+    filas, _ = await repo.listar_tareas("conf-concurrencia", None, None, 100)
+    assert sorted(fila[0] for fila in filas) == sorted(ids)
+
+
+@caso
+async def test_busqueda_texto_completo(repo):
+    project_id, task_ids = await repo.crear_proyecto_y_tareas("conf-busqueda", iter([
+        "Revisar la factura de marzo", "Enviar facturas pendientes al cliente", "Diseñar la portada",
+        "Factura rectificativa: revisar factura original",
+    ]))
+    filas, siguiente = await repo.buscar_tareas("factura", "conf-busqueda")
+    # Plurales incluidos; más apariciones del término = más relevante
+    assert filas[0][0] == task_ids[3] and sorted(fila[0] for fila in filas) == sorted(task_ids[:2] + task_ids[3:]), filas
+    assert siguiente is None and all("«" in fila[5] for fila in filas), filas
+    assert [fila[0] for fila in (await repo.buscar_tareas("portada diseñar", "conf-busqueda"))[0]] == [task_ids[2]]
+    assert (await repo.buscar_tareas("de la", "conf-busqueda"))[0] == []
+    filas, _ = await repo.buscar_tareas("factura", "conf-busqueda", "hecha")
+    assert filas == [], filas
+
+
+@caso
+async def test_busqueda_paginada(repo):
+    _, task_ids = await repo.crear_proyecto_y_tareas("conf-busqueda-paginas", (f"informe semanal {i}" for i in range(5)))
+    vistos, cursor = [], None
+    while True:
+        filas, cursor = await repo.buscar_tareas("informe", "conf-busqueda-paginas", None, cursor, 2)
+        vistos.extend(fila[0] for fila in filas)
+        if cursor is None:
+            break
+    assert sorted(vistos) == task_ids and len(vistos) == 5, vistos
+
+
+@caso
+async def test_busqueda_tras_borrado(repo):
+    project_id, task_ids = await repo.crear_proyecto_y_tareas("conf-busqueda-borrado", iter(["auditoría anual", "auditoría interna"]))
+    await repo.borrar_tarea(task_ids[0])
+    filas, _ = await repo.buscar_tareas("auditoría", "conf-busqueda-borrado")
+    assert [fila[0] for fila in filas] == [task_ids[1]], filas
+    await repo.borrar_proyecto(project_id)
+    assert (await repo.buscar_tareas("auditoría", "conf-busqueda-borrado"))[0] == []
+
+
+@caso
+async def test_resumen_proyectos(repo):
+    project_id, task_ids = await repo.crear_proyecto_y_tareas("conf-resumen", (f"t{i}" for i in range(6)))
+    vacio, _ = await repo.crear_proyecto_y_tareas("conf-resumen-vacio", iter([]))
+    await repo.actualizar_estados("Hecha", task_ids[:3], None, None)
+    await repo.actualizar_estado(task_ids[3], "Bloqueada")
+    await repo.borrar_tarea(task_ids[4])
+    await repo.crear_tarea(project_id, "nueva")
+    filas, siguiente = await repo.resumen_proyectos("conf-resumen")
+    assert [(fila[0], fila[2]) for fila in filas] == [
+        (project_id, {"Hecha": 3, "Bloqueada": 1, "Pendiente": 2}), (vacio, {})], filas
+    assert siguiente is None and all(isinstance(fila[3], datetime.datetime) for fila in filas), filas
+    # Filtro por estado y paginación por ID
+    filas, _ = await repo.resumen_proyectos(None, "bloquead")
+    assert [fila[0] for fila in filas] == [project_id], filas
+    filas, siguiente = await repo.resumen_proyectos("conf-resumen", None, None, 1)
+    assert [fila[0] for fila in filas] == [project_id] and siguiente == project_id, (filas, siguiente)
+
+
+@caso
+async def test_resumen_coincide_con_tareas(repo):
+    # Los contadores mantenidos por triggers coinciden con recontar las tareas
+    project_id, task_ids = await repo.crear_proyecto_y_tareas("conf-resumen-recuento", (f"t{i}" for i in range(2500)))
+    await repo.actualizar_estados("En Progreso", task_ids[::3], None, None)
+    await repo.borrar_tareas(task_ids[::7], None, None)
+    await asyncio.gather(*(repo.actualizar_estado(task_id, "Hecha") for task_id in task_ids[1:40:2]))
+    esperado, after_id = {}, None
+    while True:
+        filas, after_id = await repo.listar_tareas("conf-resumen-recuento", None, after_id, 100)
+        for fila in filas:
+            esperado[fila[2]] = esperado.get(fila[2], 0) + 1
+        if after_id is None:
+            break
+    filas, _ = await repo.resumen_proyectos("conf-resumen-recuento")
+    assert filas[0][2] == esperado, (filas[0][2], esperado)
+    await repo.borrar_proyecto(project_id)
+    assert (await repo.resumen_proyectos("conf-resumen-recuento"))[0] == []
+
+
+@caso
+async def test_proyectos_similares(repo):
+    ids = [(await repo.crear_proyecto_y_tareas(nombre, iter([])))[0]
+           for nombre in ("conf-similar Marketing", "conf-similar Marketing Digital")]
+    filas = await repo.proyectos_similares("similar marketing")
+    assert [fila[0] for fila in filas][:2] == ids, filas
+    assert await repo.proyectos_similares("conf-similar-inexistente") == []
+
+
+@caso
+async def test_indice_de_proyectos(repo):
+    index = ProjectIndex(repo)
+    web, _ = await repo.crear_proyecto_y_tareas("conf-índice Diseño Web", iter([]))
+    movil, _ = await repo.crear_proyecto_y_tareas("conf-índice App Móvil", iter([]))
+    otra, _ = await repo.crear_proyecto_y_tareas("conf-índice App Escritorio", iter([]))
+    assert (await index.resolve(str(web)))[0] == web
+    # Sin mayúsculas, tildes ni separadores; referencia parcial única; errata
+    assert (await index.resolve("CONF-INDICE diseno-web"))[0] == web
+    assert (await index.resolve("app movil"))[0] == movil
+    assert (await index.resolve("conf-indice App Movli"))[0] == movil
+    assert await _raises(index.resolve("conf-índice app"), AmbiguousProjectError)
+    assert await _raises(index.resolve("app movil", approximate=False), ProjectNotFoundError)
+    assert await _raises(index.resolve("conf-índice-sin-proyecto"), ProjectNotFoundError)
+    # Un proyecto que el índice no conoce (creado por otro proceso) se encuentra en la BD
+    nuevo, _ = await repo.crear_proyecto_y_tareas("conf-índice Finanzas", iter([]))
+    fallbacks = index.fallbacks
+    assert (await index.resolve("conf-índice finanzas"))[0] == nuevo and index.fallbacks == fallbacks + 1
+    # Con el índice desactualizado, el nombre exacto en la BD gana al parecido en memoria
+    personales, _ = await repo.crear_proyecto_y_tareas("conf-índice Recordatorios Personales", iter([]))
+    assert (await index.resolve("conf-índice Recordatorios"))[0] == personales
+    exacto, _ = await repo.crear_proyecto_y_tareas("conf-índice Recordatorios", iter([]))
+    assert (await index.resolve("conf-índice Recordatorios"))[0] == exacto
+    await repo.borrar_proyecto(otra)
+    index.remove(otra)
+    assert (await index.resolve("conf-índice app"))[0] == movil
+
+
+@caso
+async def test_mover_tareas(repo):
+    origen, task_ids = await repo.crear_proyecto_y_tareas("conf-mover-origen", iter(["a", "b", "c"]))
+    destino, _ = await repo.crear_proyecto_y_tareas("conf-mover-destino", iter([]))
+    filas = await repo.mover_tareas([task_ids[2], task_ids[0], 10**9], destino)
+    assert filas == [(task_ids[0], origen), (task_ids[2], origen)], filas
+    filas, _ = await repo.listar_tareas("conf-mover-destino", None)
+    assert [fila[0] for fila in filas] == [task_ids[0], task_ids[2]], filas
+    filas, _ = await repo.resumen_proyectos("conf-mover")
+    assert [fila[2] for fila in filas] == [{"Pendiente": 1}, {"Pendiente": 2}], filas
+    assert await _raises(repo.mover_tareas([task_ids[1]], 10**9))
+
+
+@caso
+async def test_plan_con_referencias(repo):
+    _, task_ids = await repo.crear_proyecto_y_tareas("conf-plan-origen", iter(["a", "b", "c"]))
+    resultados = await repo.ejecutar_plan([
+        ("crear_proyecto_y_tareas", {"nombre_proyecto": "conf-plan", "tareas": ["x", "y"]}),
+        ("crear_tarea", {"project_id": "$1", "description": "z"}),
+        ("mover_tareas", {"tarea_ids": [task_ids[0], task_ids[1]], "project_id": "$1"}),
+        ("actualizar_estado", {"tarea_id": task_ids[1], "nuevo_estado": "Hecha"}),
+        ("actualizar_estados", {"nuevo_estado": "En Progreso", "tarea_ids": ["$1.tareas", "$2"],
+                                "project_id": None, "estado_actual": None}),
+        ("borrar_tarea", {"tarea_id": task_ids[2]}),
+    ])
+    project_id, creadas = resultados[0]["id"], resultados[0]["tareas"]
+    assert resultados[1] == {"id": resultados[1]["id"], "project_id": project_id}, resultados
+    assert resultados[4]["tareas"] == creadas + [resultados[1]["id"]], resultados
+    filas, _ = await repo.listar_tareas("conf-plan", None)
+    assert [(fila[1], fila[2], fila[3]) for fila in filas] == [
+        ("a", "Pendiente", "conf-plan"), ("b", "Hecha", "conf-plan"), ("x", "En Progreso", "conf-plan"),
+        ("y", "En Progreso", "conf-plan"), ("z", "En Progreso", "conf-plan")], filas
+
+
+@caso
+async def test_plan_revierte(repo):
+    # Un paso que falla deshace todos los anteriores, también la creación del proyecto
+    _, (task_id,) = await repo.crear_proyecto_y_tareas("conf-plan-revierte", iter(["a"]))
+    for paso in (("borrar_tarea", {"tarea_id": 10**9}),
+                 ("crear_proyecto_y_tareas", {"nombre_proyecto": "conf-plan-revierte", "tareas": []}),
+                 ("crear_tarea", {"project_id": "$5", "description": "x"})):
+        try:
+            await repo.ejecutar_plan([
+                ("crear_proyecto_y_tareas", {"nombre_proyecto": "conf-plan-nuevo", "tareas": ["x"]}),
+                ("actualizar_estado", {"tarea_id": task_id, "nuevo_estado": "Hecha"}),
+                paso,
+            ])
+        except PlanStepError as e:
+            assert e.paso == 3 and e.operacion == paso[0], e
+        else:
+            raise AssertionError(f"{paso} debería fallar")
+    assert (await repo.listar_proyectos("conf-plan-nuevo"))[0] == []
+    filas, _ = await repo.listar_tareas("conf-plan-revierte", None)
+    assert [fila[2] for fila in filas] == ["Pendiente"], filas
+
+
+@caso
+async def test_exportar_importar(repo):
+    project_id, task_ids = await repo.crear_proyecto_y_tareas("conf-exportar", iter(["a", "b", "c"]))
+    await repo.crear_proyecto_y_tareas("conf-exportar-vacio", iter([]))
+    await repo.actualizar_estado(task_ids[1], "Hecha")
+    bloques = []
+    total = await repo.exportar(bloques.append, "conf-exportar", lote=2)
+    filas = [fila for bloque in bloques for fila in bloque]
+    assert total == 4 and [len(bloque) for bloque in bloques] == [1, 2, 1], bloques
+    assert [(fila[0], fila[2], fila[3]) for fila in filas] == [
+        ("conf-exportar-vacio", None, None), ("conf-exportar", "a", "Pendiente"),
+        ("conf-exportar", "b", "Hecha"), ("conf-exportar", "c", "Pendiente")], filas
+    assert all(isinstance(fila[1], datetime.datetime) and (fila[2] is None or isinstance(fila[4], datetime.datetime))
+               for fila in filas), filas
+
+    # Reimportar lo exportado no cambia nada; las tareas se identifican por proyecto y descripción
+    assert await repo.importar(iter(filas)) == {"filas": 4, "proyectos": 0, "tareas_creadas": 0, "tareas_actualizadas": 0}
+    nuevas = [("conf-exportar", None, "a", "Bloqueada", None), ("conf-exportar", None, "d", None, None),
+              ("conf-importar", "2024-05-01 09:30:00", "x", "Hecha", "2024-05-02 10:00:00"),
+              ("conf-importar", None, "y", None, None), ("conf-importar-vacio", None, None, None, None)]
+    assert await repo.importar(iter(nuevas)) == {"filas": 5, "proyectos": 2, "tareas_creadas": 3, "tareas_actualizadas": 1}
+    filas, _ = await repo.listar_tareas("conf-exportar", None)
+    assert [(fila[1], fila[2]) for fila in filas] == [
+        ("a", "Bloqueada"), ("b", "Hecha"), ("c", "Pendiente"), ("d", "Pendiente")], filas
+    bloques = []
+    await repo.exportar(bloques.append, "conf-importar")
+    filas = [fila for bloque in bloques for fila in bloque]
+    assert filas == [
+        ("conf-importar-vacio", filas[0][1], None, None, None),
+        ("conf-importar", datetime.datetime(2024, 5, 1, 9, 30), "x", "Hecha", datetime.datetime(2024, 5, 2, 10, 0)),
+        ("conf-importar", datetime.datetime(2024, 5, 1, 9, 30), "y", "Pendiente", filas[2][4])], filas
+    filas, _ = await repo.resumen_proyectos("conf-importar")
+    assert [fila[2] for fila in filas] == [{"Hecha": 1, "Pendiente": 1}, {}], filas
+
+
+@caso
+async def test_importar_revierte(repo):
+    # Un error a mitad de la lectura (p. ej. una línea inválida) no deja nada importado
+    def filas():
+        yield ("conf-importar-revierte", None, "a", None, None)
+        raise ValueError("línea 2: inválida")
+    assert await _raises(repo.importar(filas()), ValueError)
+    assert (await repo.listar_proyectos("conf-importar-revierte"))[0] == []
+    assert (await repo.importar(iter([("conf-importar-revierte", None, "a", None, None)])))["tareas_creadas"] == 1
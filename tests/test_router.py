@@ -0,0 +1,54 @@
+# ATLAS/tests/test_router.py
+"""
+Enrutador local (IntentRouter): frases que se resuelven sin el LLM y frases ambiguas
+que deben seguir al LLM. La precisión sobre el corpus completo se mide con
+python -m benchmarks.bench_router.
+
+Uso (desde el directorio raíz):
+    python -m pytest tests/test_router.py
+"""
+
+import pytest
+
+from atlas_client.router import IntentRouter
+from atlas_server.manifest import load_tool_descriptions
+
+
+@pytest.fixture(scope="module")
+def router():
+    tools_list = [
+        {"type": "function", "function": {"name": tool["name"], "description": tool["description"], "parameters": tool["parameters"]}}
+        for tool in load_tool_descriptions()
+    ]
+    return IntentRouter(tools_list, enabled=True)
+
+
+@pytest.mark.parametrize("texto, esperado", [
+    ("ver tareas en progreso", {"function": "listar_tareas", "arguments": {"status": "En Progreso"}}),
+    ("Lista las tareas pendiente.", {"function": "listar_tareas", "arguments": {"status": "Pendiente"}}),
+    ("ver tareas del proyecto Web en progreso",
+     {"function": "listar_tareas", "arguments": {"project_name": "Web", "status": "En Progreso"}}),
+    ("muestra las tareas del proyecto 'App Móvil' en estado bloqueada",
+     {"function": "listar_tareas", "arguments": {"project_name": "App Móvil", "status": "Bloqueada"}}),
+    ("listar proyectos", {"function": "listar_proyectos", "arguments": {}}),
+    ("marca la tarea 3 como hecha", {"function": "actualizar_estado_tarea", "arguments": {"tarea_id": 3, "nuevo_estado": "Hecha"}}),
+])
+def test_frases_resueltas_localmente(router, texto, esperado):
+    assert router.match(texto) == esperado
+
+
+@pytest.mark.parametrize("texto", [
+    "lista los proyectos y luego marca la tarea 3 como hecha",
+    "ver tareas en progreso y luego elimina la tarea 4",
+    "marca la tarea 3 como hecha y luego lista las tareas",
+    "ver tareas en progreso desde ayer",
+    "ver tareas en revisión",
+    "elimina la tarea cuatro",
+])
+def test_frases_ambiguas_van_al_llm(router, texto):
+    assert router.match(texto) is None
+
+
+def test_desactivado():
+    desactivado = IntentRouter([], enabled=False)
+    assert desactivado.match("listar proyectos") is None